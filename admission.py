@@ -0,0 +1,178 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from metrics import SINGLEFLIGHT_SHARED, UPSTREAM_REJECTED
+
+
+class UpstreamSaturated(Exception):
+    """An upstream's concurrency limit, rate limit or queue is full; try again shortly"""
+
+    def __init__(self, upstream, reason):
+        super().__init__(f"{upstream} is saturated ({reason})")
+        self.upstream = upstream
+        self.reason = reason
+
+
+class SingleFlight:
+    """Concurrent calls with the same key share one execution.
+
+    The first caller runs fn; everyone who arrives while it is in flight waits
+    for (and gets) the same result or exception. Nothing is remembered after
+    the call returns - that's the caches' job.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            SINGLEFLIGHT_SHARED.inc(upstream=self.name)
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class TokenBucket:
+    """rate tokens per second, up to burst saved up; rate <= 0 means unlimited"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout):
+        """Take a token, sleeping until it's available if that's within timeout"""
+        if self.rate <= 0:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            if wait > timeout:
+                return False
+            # Reserve the token now (the balance may go negative) and sleep outside the lock
+            self._tokens -= 1
+        if wait:
+            time.sleep(wait)
+        return True
+
+
+class UpstreamLimiter:
+    """Admission control for one upstream: in-flight cap, token bucket and a bounded queue.
+
+        with LIMITERS['gemini']:
+            model.generate_content(prompt)
+
+    A caller waits at most queue_timeout for a slot and a token, and at most
+    max_queue callers wait at once; anyone else gets UpstreamSaturated right
+    away, so a slow upstream can't tie up every request thread.
+    """
+
+    def __init__(self, name, max_concurrency, rate=0, burst=None, max_queue=None, queue_timeout=2.0):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.rate = rate
+        self.burst = burst or max(int(rate * 2), 1)
+        self.max_queue = max_queue if max_queue is not None else max_concurrency * 2
+        self.queue_timeout = queue_timeout
+        self._reset()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._bucket = TokenBucket(self.rate, self.burst)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._in_flight = 0
+        self._rejected = 0
+
+    def _reject(self, reason):
+        with self._lock:
+            self._rejected += 1
+        UPSTREAM_REJECTED.inc(upstream=self.name)
+        raise UpstreamSaturated(self.name, reason)
+
+    def acquire(self):
+        with self._lock:
+            if self._waiting >= self.max_queue:
+                queue_full = True
+            else:
+                queue_full = False
+                self._waiting += 1
+        if queue_full:
+            self._reject("queue full")
+
+        try:
+            deadline = time.monotonic() + self.queue_timeout
+            if not self._slots.acquire(timeout=self.queue_timeout):
+                self._reject("too many calls in flight")
+            if not self._bucket.acquire(max(deadline - time.monotonic(), 0)):
+                self._slots.release()
+                self._reject("rate limited")
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        with self._lock:
+            self._in_flight += 1
+
+    def release(self):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'in_flight': self._in_flight,
+                'waiting': self._waiting,
+                'rejected': self._rejected,
+                'max_concurrency': self.max_concurrency,
+                'rate_per_sec': self.rate,
+                'max_queue': self.max_queue,
+            }
+
+
+def limiter_from_env(name, max_concurrency, rate, queue_timeout=2.0):
+    """UpstreamLimiter configured by <NAME>_MAX_CONCURRENCY, _RATE, _BURST, _MAX_QUEUE, _QUEUE_TIMEOUT"""
+    prefix = name.upper()
+    burst = os.environ.get(f"{prefix}_BURST")
+    max_queue = os.environ.get(f"{prefix}_MAX_QUEUE")
+    return UpstreamLimiter(
+        name,
+        max_concurrency=int(os.environ.get(f"{prefix}_MAX_CONCURRENCY", max_concurrency)),
+        rate=float(os.environ.get(f"{prefix}_RATE", rate)),
+        burst=int(burst) if burst else None,
+        max_queue=int(max_queue) if max_queue else None,
+        queue_timeout=float(os.environ.get(f"{prefix}_QUEUE_TIMEOUT", queue_timeout)),
+    )
@@ -0,0 +1,178 @@
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+
+# Bundles served to the browser, built from files under static/. Order within
+# a bundle is the order the blocks used to appear inline in the page.
+BUNDLES = {
+    'base.css': ['css/base.css'],
+    # After the page stylesheet, as when these were inline at the end of <body>
+    'widgets.css': ['css/chatbot.css', 'css/notifications.css'],
+    'app.js': ['js/chatbot.js', 'js/base.js'],
+}
+for page in ('glucose', 'landing', 'reminders', 'settings', 'symptomReport', 'upload', 'welcome'):
+    BUNDLES[f'{page}.css'] = [f'css/{page}.css']
+    BUNDLES[f'{page}.js'] = [f'js/{page}.js']
+BUNDLES['treatment_info.css'] = ['css/treatment_info.css']
+
+# WebP images at the sizes they're displayed (1x and 2x): name -> (source, width)
+IMAGES = {
+    'logo-120.webp': ('realnewlogo.png', 120),
+    'logo-240.webp': ('realnewlogo.png', 240),
+}
+
+# Variants written next to each text asset, in the order they're preferred
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+MANIFEST = 'manifest.json'
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+
+def _write(path, data):
+    """Write atomically; content-hashed files that already exist are left alone"""
+    if os.path.exists(path):
+        return
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _compress(data, encoding):
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli.compress(data, quality=11)
+
+
+class AssetPipeline:
+    """Builds fingerprinted, precompressed static assets into static/dist.
+
+    Each bundle is concatenated from its sources and written as
+    name.<hash>.ext together with .gz and .br copies (.br only when the
+    brotli package is installed); images are resized and re-encoded as WebP.
+    A manifest maps logical names ('app.js') to the hashed files. The hash
+    changes whenever the content does, so the files can be cached forever.
+
+    load() rebuilds when the sources no longer match the manifest, so a
+    fresh checkout or an edited stylesheet just works; `flask --app main
+    build-assets` builds ahead of time.
+    """
+
+    def __init__(self, static_dir=STATIC_DIR, output_dir=None, bundles=BUNDLES, images=IMAGES):
+        self.static_dir = static_dir
+        self.output_dir = output_dir or os.path.join(static_dir, 'dist')
+        self.bundles = bundles
+        self.images = images
+        self.files = {}
+        self.encodings = {}
+        self._lock = threading.Lock()
+
+    def _sources(self):
+        names = {source for sources in self.bundles.values() for source in sources}
+        names.update(source for source, _ in self.images.values())
+        return sorted(names)
+
+    def sources_digest(self):
+        """Hash of the build inputs: source contents plus bundle and image definitions"""
+        digest = hashlib.sha256(json.dumps([self.bundles, self.images], sort_keys=True).encode())
+        for name in self._sources():
+            digest.update(name.encode())
+            with open(os.path.join(self.static_dir, name), 'rb') as f:
+                digest.update(f.read())
+        return digest.hexdigest()
+
+    def _fingerprint(self, name, data):
+        stem, ext = os.path.splitext(name)
+        return f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+
+    def _render_image(self, source, width):
+        from PIL import Image
+
+        with Image.open(os.path.join(self.static_dir, source)) as image:
+            image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+            if image.width > width:
+                height = round(image.height * width / image.width)
+                image = image.resize((width, height), Image.LANCZOS)
+            out = io.BytesIO()
+            image.save(out, 'WEBP', quality=82, method=6)
+            return out.getvalue()
+
+    def build(self):
+        """Write every bundle, its compressed variants and the images; returns the manifest"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        files = {}
+        encodings = {}
+
+        for name, sources in self.bundles.items():
+            parts = []
+            for source in sources:
+                with open(os.path.join(self.static_dir, source), 'rb') as f:
+                    parts.append(f.read())
+            data = b"\n".join(parts)
+            filename = self._fingerprint(name, data)
+            _write(os.path.join(self.output_dir, filename), data)
+            available = []
+            for encoding, suffix in ENCODINGS:
+                path = os.path.join(self.output_dir, filename + suffix)
+                if not os.path.exists(path):
+                    compressed = _compress(data, encoding)
+                    # Not worth a variant if it doesn't save anything
+                    if compressed is None or len(compressed) >= len(data):
+                        continue
+                    _write(path, compressed)
+                available.append(encoding)
+            files[name] = filename
+            encodings[filename] = available
+
+        for name, (source, width) in self.images.items():
+            data = self._render_image(source, width)
+            filename = self._fingerprint(name, data)
+            _write(os.path.join(self.output_dir, filename), data)
+            files[name] = filename
+            encodings[filename] = []
+
+        manifest = {'digest': self.sources_digest(), 'files': files, 'encodings': encodings}
+        tmp_path = os.path.join(self.output_dir, f"{MANIFEST}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, os.path.join(self.output_dir, MANIFEST))
+        self.files = files
+        self.encodings = encodings
+        return manifest
+
+    def load(self):
+        """Read the manifest, rebuilding first if it's missing or out of date"""
+        try:
+            with open(os.path.join(self.output_dir, MANIFEST)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = None
+        if manifest is None or manifest.get('digest') != self.sources_digest():
+            manifest = self.build()
+        self.files = manifest['files']
+        self.encodings = manifest['encodings']
+        return manifest
+
+    def _ensure_loaded(self):
+        if not self.files:
+            with self._lock:
+                if not self.files:
+                    self.load()
+
+    def filename(self, name):
+        """Hashed file for a logical asset name"""
+        self._ensure_loaded()
+        return self.files[name]
+
+    def available_encodings(self, filename):
+        """Precompressed variants of a built file, or None if it isn't one"""
+        self._ensure_loaded()
+        return self.encodings.get(filename)
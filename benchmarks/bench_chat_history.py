@@ -0,0 +1,91 @@
+"""Compare chatbot request size and prompt tokens: client-sent history vs server sessions.
+
+Replays a synthetic conversation turn by turn. The old scheme posts the whole
+history every turn and prompts Gemini with the last 10 messages; the session
+scheme posts only the new message and prompts with the rolling summary plus
+the verbatim turns left after compaction. Also times the store's per-turn
+SQLite work.
+
+Usage:
+    python benchmarks/bench_chat_history.py
+    python benchmarks/bench_chat_history.py --turns 100 --history-tokens 2000
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chat_sessions import ChatSessionStore, estimate_tokens
+
+QUESTION = "My fasting glucose was {n} mg/dL this morning after pasta last night, is that a problem and what should I eat?"
+ANSWER = ("A fasting reading of {n} mg/dL is worth watching. " * 6
+          + "Try pairing carbohydrates with protein and fiber, keep portions moderate, and "
+          + "check with your care team before changing medication. " * 4)
+
+
+def old_turn(history, message):
+    """(request bytes, prompt tokens) when the client sends its whole history"""
+    body = json.dumps({'message': message, 'history': history})
+    recent = history[-10:]
+    return len(body), sum(estimate_tokens(m['content']) for m in recent) + estimate_tokens(message)
+
+
+def session_turn(store, session_id, message):
+    body = json.dumps({'message': message, 'session_id': session_id})
+    history = store.history(store.get(session_id))
+    tokens = sum(estimate_tokens(part) for m in history for part in m['parts'])
+    return len(body), tokens + estimate_tokens(message)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--history-tokens", type=int, default=1000)
+    parser.add_argument("--summary-tokens", type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ChatSessionStore(os.path.join(tmp, "chat.sqlite3"), history_tokens=args.history_tokens,
+                                 summary_tokens=args.summary_tokens)
+        session_id, _ = store.get_or_create()
+        history = []
+        rows = []
+        store_seconds = []
+        totals = [0, 0, 0, 0]
+        report_at = {1, 5, 10, 20, 50, 100, args.turns}
+
+        for turn in range(1, args.turns + 1):
+            message = QUESTION.format(n=90 + turn)
+            reply = ANSWER.format(n=90 + turn)
+            old_bytes, old_tokens = old_turn(history, message)
+
+            start = time.perf_counter()
+            new_bytes, new_tokens = session_turn(store, session_id, message)
+            if store.append(session_id, message, reply):
+                store.compact(session_id)
+            store_seconds.append(time.perf_counter() - start)
+
+            for i, value in enumerate((old_bytes, new_bytes, old_tokens, new_tokens)):
+                totals[i] += value
+            history += [{'role': 'user', 'content': message}, {'role': 'assistant', 'content': reply}]
+            if turn in report_at:
+                rows.append((turn, old_bytes, new_bytes, old_tokens, new_tokens))
+
+    print(f"{args.turns} turns, history budget {args.history_tokens} tokens, summary {args.summary_tokens}")
+    print(f"{'turn':>5} {'old req B':>10} {'new req B':>10} {'old prompt tok':>15} {'new prompt tok':>15}")
+    for turn, old_bytes, new_bytes, old_tokens, new_tokens in rows:
+        print(f"{turn:>5} {old_bytes:>10} {new_bytes:>10} {old_tokens:>15} {new_tokens:>15}")
+    means = [total / args.turns for total in totals]
+    print(f"{'mean':>5} {means[0]:>10.0f} {means[1]:>10.0f} {means[2]:>15.0f} {means[3]:>15.0f}")
+    store_ms = sorted(s * 1000 for s in store_seconds)
+    print(f"store per turn: p50 {statistics.median(store_ms):.2f} ms, max {store_ms[-1]:.2f} ms "
+          f"(extractive summaries; a Gemini summary runs in the background)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Load test: concurrent requests one gunicorn worker (one core) can serve.
+
+Starts gunicorn on benchmarks/stub_app.py once per worker class, with every
+upstream replaced by a fixed-latency stub, and drives /api/override-food and
+/api/chatbot with a pool of concurrent clients.
+
+Usage:
+    python benchmarks/bench_concurrency.py
+    python benchmarks/bench_concurrency.py --concurrency 64 --requests 640 --latency-ms 300
+    python benchmarks/bench_concurrency.py --worker-class gthread --worker-class gevent
+"""
+import argparse
+import importlib.util
+
+from loadtest import free_port, run_load, start_app, stop_app
+
+ENDPOINTS = {
+    # Unique food names so every request misses the nutrition and advice caches
+    'override-food': lambda i: ('/api/override-food', {'food_name': f'bench food {i}'}),
+    'chatbot': lambda i: ('/api/chatbot', {'message': f'What should my blood sugar be after lunch? ({i})'}),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--worker-class', action='append', help="sync, gthread, gevent (default: all available)")
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=320)
+    parser.add_argument('--latency-ms', type=int, default=200, help="latency of each stubbed upstream call")
+    args = parser.parse_args()
+
+    worker_classes = args.worker_class or ['sync', 'gthread', 'gevent']
+    if 'gevent' in worker_classes and importlib.util.find_spec('gevent') is None:
+        print("gevent not installed, skipping it")
+        worker_classes.remove('gevent')
+
+    print(f"1 worker, {args.concurrency} concurrent clients, {args.requests} requests, "
+          f"{args.latency_ms} ms per upstream call")
+    print(f"{'worker':<8} {'endpoint':<14} {'req/s/core':>10} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    for worker_class in worker_classes:
+        port = free_port()
+        proc = start_app(port, env={
+            'GUNICORN_WORKER_CLASS': worker_class,
+            'WEB_CONCURRENCY': '1',
+            'STUB_LATENCY_MS': str(args.latency_ms),
+        })
+        base_url = f'http://127.0.0.1:{port}'
+        try:
+            for endpoint, build in ENDPOINTS.items():
+                def send(session, i):
+                    path, body = build(i)
+                    return session.post(base_url + path, json=body, timeout=120).status_code == 200
+
+                result = run_load(send, args.requests, args.concurrency)
+                print(f"{worker_class:<8} {endpoint:<14} {result['rps']:>10.1f} {result['p50']:>8.0f} "
+                      f"{result['p95']:>8.0f} {result['errors']:>7}")
+        finally:
+            stop_app(proc)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""Benchmark streaming export and import of a large glucose history.
+
+Writes --rows synthetic readings as a gzipped NDJSON file, then:
+
+  * imports it into an empty store through import_records (batched inserts)
+  * imports it again, when every id is a duplicate
+  * exports it as gzipped NDJSON and gzipped CSV through encode_chunks
+  * builds the whole export as one JSON string, the way the pages used to
+
+Each step reports rows/s and how much the process's peak RSS grew, so the
+streaming steps can be compared with the all-in-memory one (run last, since
+peak RSS only goes up).
+
+Usage:
+    python benchmarks/bench_export_import.py
+    python benchmarks/bench_export_import.py --rows 100000 --batch-size 2000
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_transfer import CHUNK_BYTES, encode_chunks, export_csv, export_ndjson, import_records
+from glucose_store import GlucoseStore
+from reminders import ReminderStore
+
+USER_ID = "bench_user"
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def synthetic_lines(rows, seed=7):
+    rng = random.Random(seed)
+    start = datetime(2016, 1, 1)
+    for i in range(rows):
+        logged = start + timedelta(minutes=5 * i)
+        yield json.dumps({
+            'kind': 'glucose',
+            'id': f"glucose_{i}",
+            'date': logged.strftime('%Y-%m-%d'),
+            'time': logged.strftime('%H:%M'),
+            'currentGlucose': str(rng.randint(50, 300)),
+            'insulinDose': str(rng.choice([0, 2, 4, 6])) if i % 4 == 0 else None,
+            'insulinType': 'rapid' if i % 4 == 0 else None,
+            'carbsConsumed': str(rng.randint(10, 80)) if i % 6 == 0 else None,
+            'recentActivity': rng.choice(['none', 'light', 'moderate']),
+            'factors': ['stress'] if i % 10 == 0 else [],
+            'notes': 'after lunch' if i % 12 == 0 else '',
+        }) + "\n"
+
+
+def file_chunks(path):
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_BYTES)
+            if not chunk:
+                return
+            yield chunk
+
+
+def timed(label, rows, func):
+    rss_before = peak_rss_mb()
+    began = time.perf_counter()
+    detail = func()
+    seconds = time.perf_counter() - began
+    print(f"{label:<22} {rows / seconds:>10,.0f} rows/s {seconds:>7.1f}s "
+          f"{peak_rss_mb() - rss_before:>+8.0f} MB peak RSS  {detail}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per insert transaction")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "history.ndjson.gz")
+        with gzip.open(source, 'wt', compresslevel=6) as f:
+            f.writelines(synthetic_lines(args.rows))
+        print(f"{args.rows:,} readings, {os.path.getsize(source) / 1e6:.1f} MB gzipped NDJSON, "
+              f"batches of {args.batch_size}")
+
+        glucose_store = GlucoseStore(os.path.join(tmp, "glucose.sqlite3"))
+        reminder_store = ReminderStore(os.path.join(tmp, "reminders.sqlite3"))
+
+        def run_import():
+            result = import_records(file_chunks(source), glucose_store, reminder_store, USER_ID,
+                                    batch_size=args.batch_size)
+            return f"inserted {result['glucose_inserted']:,}, duplicates {result['duplicates']:,}"
+
+        timed("import", args.rows, run_import)
+        timed("re-import (all dupes)", args.rows, run_import)
+
+        def run_export(lines):
+            size = sum(len(chunk) for chunk in encode_chunks(lines))
+            return f"{size / 1e6:.1f} MB out"
+
+        timed("export ndjson.gz", args.rows,
+              lambda: run_export(export_ndjson(glucose_store, reminder_store, USER_ID)))
+        timed("export csv.gz", args.rows,
+              lambda: run_export(export_csv(glucose_store, USER_ID)))
+
+        def one_string():
+            entries = list(glucose_store.iter_entries(USER_ID))
+            return f"{len(json.dumps(entries, indent=2)) / 1e6:.1f} MB string"
+
+        timed("one JSON string", args.rows, one_string)
+
+
+if __name__ == "__main__":
+    main()
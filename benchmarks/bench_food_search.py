@@ -0,0 +1,73 @@
+"""Benchmark the override picker's food search index.
+
+Reports index build time and per-lookup latency (p50/p99) for prefix and
+misspelled queries, next to the substring filter the page used to run.
+
+Usage:
+    python benchmarks/bench_food_search.py
+    python benchmarks/bench_food_search.py --synthetic 10000   # pad the list with generated names
+"""
+import argparse
+import itertools
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("WARM_UP", "0")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from food_search import FoodIndex
+from main import food_search_names
+
+QUERIES = [
+    "a", "ap", "apple", "aple", "pie", "chick", "chiken", "chicken soup", "brocoli", "bannana",
+    "sweet pot", "chese cake", "ice", "yogrt", "salmn", "spagetti", "xyz", "hot", "pean", "tortila",
+]
+
+
+def synthetic_names(names, count):
+    words = sorted({word for name in names for word in name.split()})
+    pairs = (f"{a} {b}" for a, b in itertools.permutations(words, 2))
+    return list(itertools.islice(pairs, count))
+
+
+def time_lookups(fn, rounds):
+    samples = []
+    for _ in range(rounds):
+        for query in QUERIES:
+            start = time.perf_counter()
+            fn(query)
+            samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--synthetic', type=int, default=0, help="extra generated names to index")
+    parser.add_argument('--rounds', type=int, default=200)
+    args = parser.parse_args()
+
+    names = food_search_names()
+    names += synthetic_names(names, args.synthetic)
+
+    start = time.perf_counter()
+    index = FoodIndex(names)
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"{len(index)} names, index built in {build_ms:.1f} ms")
+
+    p50, p99 = time_lookups(lambda q: index.search(q, 10), args.rounds)
+    print(f"FoodIndex.search     p50 {p50:7.1f} µs   p99 {p99:7.1f} µs")
+    lowered = [name.lower() for name in index.names]
+    p50, p99 = time_lookups(lambda q: [n for n in lowered if q in n][:20], args.rounds)
+    print(f"substring filter     p50 {p50:7.1f} µs   p99 {p99:7.1f} µs   (no typo tolerance)")
+
+    print()
+    for query in ("aple", "chiken", "brocoli", "chese cake", "yogrt"):
+        print(f"{query!r:14} -> {', '.join(name for name, _ in index.search(query, 3))}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""Parity check and throughput benchmark for glucose_predict.
+
+Usage:
+    python benchmarks/bench_glucose_forecast.py [--cases 2000] [--users 10000]
+
+The parity check runs the original JavaScript model functions from
+static/js/glucose.js under node (skipped if node isn't installed) and
+compares them with glucose_predict on random readings and profiles. The
+benchmark then times full 0-8h forecast curves at 5 minute steps.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from glucose_predict import build_inputs, forecast, horizons_hours
+
+JS_FUNCTIONS = [
+    'getInsulinParams', 'calculateInsulinActivity', 'calculatePersonalizedISF',
+    'calculateCarbImpact', 'calculateActivityImpact', 'calculateFactorImpacts',
+    'calculateBasalGlucoseChange',
+]
+
+# Same arithmetic as predictGlucose() in glucose.js, minus the DOM
+JS_HARNESS = """
+let FIXED_HOUR = 0;
+const RealDate = Date;
+Date = class extends RealDate { getHours() { return FIXED_HOUR; } };
+
+const cases = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+const results = cases.map(c => {
+  FIXED_HOUR = c.hour;
+  const latest = c.entry, profile = c.profile, hours = c.hours;
+  const totalHours = c.elapsed + hours;
+  const params = getInsulinParams(latest.insulinType);
+  const currentGlucose = parseFloat(latest.currentGlucose);
+  const insulinDose = parseFloat(latest.insulinDose);
+  const isf = calculatePersonalizedISF(profile, currentGlucose);
+  const glucoseDrop = insulinDose * isf * calculateInsulinActivity(totalHours, params);
+  const basalChange = calculateBasalGlucoseChange(hours, profile, currentGlucose);
+  const carbImpact = calculateCarbImpact(latest.carbsConsumed ? parseFloat(latest.carbsConsumed) : 0, hours, profile);
+  const activityImpact = calculateActivityImpact(latest.recentActivity || 'none', hours);
+  const factorImpact = calculateFactorImpacts(latest.factors || []);
+  let predicted = currentGlucose - glucoseDrop + basalChange + carbImpact - activityImpact + factorImpact;
+  return Math.max(40, Math.round(predicted));
+});
+console.log(JSON.stringify(results));
+"""
+
+
+def extract_js():
+    with open(os.path.join(ROOT, 'static', 'js', 'glucose.js')) as f:
+        source = f.read()
+    sources = []
+    for name in JS_FUNCTIONS:
+        match = re.search(r"^function %s\(.*?^}\n" % name, source, re.S | re.M)
+        if not match:
+            raise SystemExit(f"Could not find {name}() in glucose.js")
+        sources.append(match.group(0))
+    return "\n".join(sources)
+
+
+def random_case(rng, base_now):
+    now = base_now + timedelta(minutes=rng.randrange(24 * 60))
+    entry_time = now - timedelta(minutes=rng.randrange(0, 12 * 60))
+    entry = {
+        'id': 'x',
+        'date': entry_time.strftime('%Y-%m-%d'),
+        'time': entry_time.strftime('%H:%M'),
+        'currentGlucose': str(rng.randrange(40, 400)),
+        'insulinDose': str(rng.choice([0, 1, 2, 4, 6, 10, 15])),
+        'insulinType': rng.choice(['rapid', 'short', 'intermediate', 'long', 'unknown']),
+        'carbsConsumed': rng.choice([None, '15', '45', '80']),
+        'recentActivity': rng.choice(['none', 'light', 'moderate', 'intense']),
+        'factors': rng.sample(['stress', 'illness', 'menstruation', 'alcohol'], rng.randrange(3)),
+    }
+    profile = rng.choice([{}, {
+        'weight': str(rng.randrange(45, 140)),
+        'age': str(rng.randrange(10, 90)),
+        'bmi': str(round(rng.uniform(16, 40), 1)),
+        'exerciseLevel': rng.choice(list(['Sedentary', 'Lightly active', 'Moderately active',
+                                          'Very active', 'Extremely active'])),
+        'conditions': rng.sample(['Obesity', 'Kidney Disease', 'Heart Disease'], rng.randrange(3)),
+    }])
+    return now, entry, profile, round(rng.uniform(0.1, 8), 2)
+
+
+def parity(cases):
+    if not shutil.which('node'):
+        print("Parity check skipped: node is not installed")
+        return True
+
+    rng = random.Random(42)
+    base_now = datetime(2026, 1, 5)
+    samples = [random_case(rng, base_now) for _ in range(cases)]
+
+    payload = []
+    for now, entry, profile, hours in samples:
+        elapsed = (now - datetime.fromisoformat(f"{entry['date']}T{entry['time']}")).total_seconds() / 3600
+        payload.append({'entry': entry, 'profile': profile, 'hours': hours,
+                        'elapsed': elapsed, 'hour': now.hour})
+    out = subprocess.run(
+        ['node', '-e', extract_js() + JS_HARNESS],
+        input=json.dumps(payload), capture_output=True, text=True, check=True
+    )
+    expected = np.array(json.loads(out.stdout), dtype=float)
+
+    actual = np.array([
+        forecast(build_inputs([entry], [profile], now), [hours])[0, 0]
+        for now, entry, profile, hours in samples
+    ])
+    mismatches = np.flatnonzero(np.abs(actual - expected) > 1)
+    print(f"Parity with glucose.js: {cases - len(mismatches)}/{cases} within 1 mg/dL "
+          f"(max diff {np.abs(actual - expected).max():.0f})")
+    for i in mismatches[:5]:
+        print(f"  case {i}: js={expected[i]:.0f} py={actual[i]:.0f} {payload[i]}")
+    return len(mismatches) == 0
+
+
+def benchmark(users, repeats):
+    rng = random.Random(7)
+    base_now = datetime(2026, 1, 5)
+    samples = [random_case(rng, base_now) for _ in range(users)]
+    horizons = horizons_hours(8, 5)
+
+    start = time.perf_counter()
+    inputs = build_inputs([s[1] for s in samples], [s[2] for s in samples], [s[0] for s in samples])
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        curves = forecast(inputs, horizons)
+    elapsed = (time.perf_counter() - start) / repeats
+
+    print(f"Forecast grid:     {len(horizons)} points (0-8h every 5 min)")
+    print(f"Users per call:    {users}")
+    print(f"Input build:       {build_time * 1000:.1f} ms ({users / build_time:,.0f} users/s)")
+    print(f"Forecast compute:  {elapsed * 1000:.1f} ms per call")
+    print(f"Throughput:        {users / elapsed:,.0f} forecast curves/s "
+          f"({users * len(horizons) / elapsed:,.0f} points/s)")
+    assert curves.shape == (users, len(horizons))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=2000, help="parity cases")
+    parser.add_argument("--users", type=int, default=10000, help="forecasts per vectorized call")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    ok = parity(args.cases)
+    benchmark(args.users, args.repeats)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Cold-start benchmark: how long a fresh worker takes to import main and serve /home.
+
+Each sample is a new interpreter, so nothing is cached between runs.
+`-X importtime` gives the cumulative import time of main and its heaviest
+top-level dependencies.
+
+Usage:
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --compare HEAD~1     # before/after table
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_REQUEST = (
+    "import time; start = time.perf_counter(); import main; "
+    "app = getattr(main, 'app', None) or main.create_app(); "
+    "app.test_client().get('/home'); print(time.perf_counter() - start)"
+)
+
+
+def run_python(tree, data_dir, *args):
+    env = dict(os.environ, DATA_DIR=data_dir, WARM_UP="0", PYTHONPATH=tree)
+    env.setdefault("SECRET_KEY", "bench")
+    return subprocess.run(
+        [sys.executable, *args], cwd=tree, env=env, capture_output=True, text=True, check=True
+    )
+
+
+def import_profile(tree, data_dir):
+    """(cumulative microseconds for main, {top-level module: cumulative microseconds})"""
+    stderr = run_python(tree, data_dir, '-X', 'importtime', '-c', 'import main').stderr
+    total = None
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        if name == 'main':
+            total = int(cumulative)
+        elif depth == 1:
+            modules[name] = int(cumulative)
+    return total, modules
+
+
+def measure(tree, runs):
+    with tempfile.TemporaryDirectory() as data_dir:
+        # First run creates the SQLite files; don't count it
+        run_python(tree, data_dir, '-c', FIRST_REQUEST)
+        imports, first_request, modules = [], [], {}
+        for _ in range(runs):
+            total, top = import_profile(tree, data_dir)
+            imports.append(total / 1000)
+            for name, micros in top.items():
+                modules.setdefault(name, []).append(micros / 1000)
+            first_request.append(float(run_python(tree, data_dir, '-c', FIRST_REQUEST).stdout) * 1000)
+    heaviest = sorted(
+        ((statistics.median(values), name) for name, values in modules.items()), reverse=True
+    )[:8]
+    return {
+        'import_ms': statistics.median(imports),
+        'first_request_ms': statistics.median(first_request),
+        'heaviest': heaviest,
+    }
+
+
+def export_revision(rev, directory):
+    archive = subprocess.run(['git', 'archive', rev], cwd=ROOT, capture_output=True, check=True).stdout
+    with tempfile.TemporaryFile() as f:
+        f.write(archive)
+        f.seek(0)
+        with tarfile.open(fileobj=f) as tar:
+            tar.extractall(directory)
+
+
+def report(label, result):
+    print(f"{label}: import main {result['import_ms']:.0f} ms, "
+          f"import + first request {result['first_request_ms']:.0f} ms")
+    for ms, name in result['heaviest']:
+        print(f"    {ms:8.1f} ms  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--compare', metavar='REV', help="also measure this git revision")
+    args = parser.parse_args()
+
+    results = []
+    if args.compare:
+        with tempfile.TemporaryDirectory() as tree:
+            export_revision(args.compare, tree)
+            results.append((args.compare, measure(tree, args.runs)))
+    results.append(('working tree', measure(ROOT, args.runs)))
+
+    for label, result in results:
+        report(label, result)
+    if len(results) == 2:
+        before, after = results[0][1], results[1][1]
+        print(f"cold start: {before['first_request_ms']:.0f} -> {after['first_request_ms']:.0f} ms "
+              f"({before['first_request_ms'] / after['first_request_ms']:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""Latency and throughput of the request pipeline against local stub upstreams.
+
+Runs the app under gunicorn (benchmarks/stub_app.py) with CalorieNinja and
+Gemini served by a StubServer in this process and Gradio replaced by
+StubGradioClient, then drives each endpoint and reports p50/p95/p99 and req/s.
+
+Usage:
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --endpoint upload --requests 500 --concurrency 32
+    STUB_GEMINI_ERROR_RATE=0.1 STUB_JITTER_MS=50 python benchmarks/bench_pipeline.py
+
+Track regressions by saving a run and comparing later runs against it:
+    python benchmarks/bench_pipeline.py --output baseline.json
+    python benchmarks/bench_pipeline.py --baseline baseline.json --tolerance 0.15
+"""
+import argparse
+import io
+import json
+import os
+import sys
+
+from PIL import Image
+
+from loadtest import free_port, run_load, start_app, stop_app
+from stubs import StubServer, UpstreamProfile
+
+
+def make_images(count):
+    """Small distinct JPEGs so every upload misses the prediction cache"""
+    images = []
+    for i in range(count):
+        buffer = io.BytesIO()
+        Image.new('RGB', (64, 64), (i % 256, (i // 256) % 256, 128)).save(buffer, 'JPEG')
+        images.append(buffer.getvalue())
+    return images
+
+
+def build_senders(base_url, total):
+    images = make_images(total)
+
+    def upload(session, i):
+        response = session.post(
+            base_url + '/upload',
+            files={'image': (f'meal{i}.jpg', images[i], 'image/jpeg')},
+            data={'nutritional_needs': '["low carb"]'},
+            timeout=120
+        )
+        return response.status_code == 200
+
+    def override_food(session, i):
+        # Unique food names so every request misses the nutrition and advice caches
+        response = session.post(base_url + '/api/override-food', json={'food_name': f'bench food {i}'}, timeout=120)
+        return response.status_code == 200
+
+    def chatbot(session, i):
+        response = session.post(
+            base_url + '/api/chatbot',
+            json={'message': f'How many carbs should I eat at dinner? ({i})'},
+            timeout=120
+        )
+        return response.status_code == 200 and response.json().get('success', False)
+
+    def chatbot_stream(session, i):
+        response = session.post(
+            base_url + '/api/chatbot/stream',
+            json={'message': f'How many carbs should I eat at dinner? ({i})'},
+            timeout=120, stream=True
+        )
+        body = b''.join(response.iter_content(chunk_size=None))
+        return response.status_code == 200 and b'event: done' in body
+
+    return {
+        'upload': upload,
+        'override-food': override_food,
+        'chatbot': chatbot,
+        'chatbot-stream': chatbot_stream,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Endpoints whose p95 or req/s moved the wrong way by more than tolerance"""
+    regressions = []
+    for endpoint, result in results.items():
+        before = baseline.get(endpoint)
+        if not before:
+            continue
+        if result['p95'] > before['p95'] * (1 + tolerance):
+            regressions.append(f"{endpoint}: p95 {before['p95']:.0f} -> {result['p95']:.0f} ms")
+        if result['rps'] < before['rps'] * (1 - tolerance):
+            regressions.append(f"{endpoint}: req/s {before['rps']:.1f} -> {result['rps']:.1f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--endpoint', action='append',
+                        help="upload, override-food, chatbot, chatbot-stream (default: all)")
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--workers', type=int, default=1, help="gunicorn worker processes")
+    parser.add_argument('--output', help="write results as JSON")
+    parser.add_argument('--baseline', help="JSON from an earlier --output run to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.1, help="allowed p95/req/s drift vs the baseline")
+    args = parser.parse_args()
+
+    profile = UpstreamProfile.from_env()
+    stubs = StubServer(profile).start()
+    port = free_port()
+    proc = start_app(port, env=dict(
+        profile.to_env(),
+        STUB_UPSTREAM_URL=stubs.url,
+        WEB_CONCURRENCY=str(args.workers),
+    ))
+    base_url = f'http://127.0.0.1:{port}'
+
+    results = {}
+    try:
+        senders = build_senders(base_url, args.requests)
+        endpoints = args.endpoint or list(senders)
+        print(f"{args.workers} worker(s), {args.concurrency} concurrent clients, {args.requests} requests per endpoint")
+        for name, settings in profile.settings.items():
+            print(f"  {name}: {settings['latency_ms']:.0f}±{settings['jitter_ms']:.0f} ms, "
+                  f"{settings['error_rate']:.0%} errors")
+        print(f"{'endpoint':<15} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for endpoint in endpoints:
+            result = run_load(senders[endpoint], args.requests, args.concurrency)
+            results[endpoint] = result
+            print(f"{endpoint:<15} {result['rps']:>8.1f} {result['p50']:>8.0f} {result['p95']:>8.0f} "
+                  f"{result['p99']:>8.0f} {result['errors']:>7}")
+        # Gradio calls happen inside the gunicorn workers, so only these two are counted here
+        print(f"upstream calls: {json.dumps(stubs.counts)}")
+    finally:
+        stop_app(proc)
+        stubs.stop()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("Regressions:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("No regressions against the baseline")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""Benchmark the local chatbot relevance gate against the Gemini YES/NO gate.
+
+Usage:
+    python benchmarks/bench_relevance.py            # agreement with the labels below
+    GOOGLE_API_KEY=... python benchmarks/bench_relevance.py --llm
+
+With --llm every sample is also sent through the original Gemini gate, so the
+report shows agreement with the live gate and the latency saved per message.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from relevance import classify_relevance, relevance_score
+
+# (message, expected relevance) - what the Gemini gate answers for these
+SAMPLES = [
+    ("What is a normal blood sugar level after eating?", True),
+    ("How much insulin should I take before dinner?", True),
+    ("Is metformin safe to take with alcohol?", True),
+    ("My glucose reading was 250 mg/dL this morning, what should I do?", True),
+    ("What are the symptoms of hypoglycemia?", True),
+    ("Can diabetics eat bananas?", True),
+    ("How many carbs should I eat per meal?", True),
+    ("What does an A1C of 7.2 mean?", True),
+    ("Why do my feet feel numb and tingly?", True),
+    ("Is brown rice better than white rice for blood sugar?", True),
+    ("What snacks won't spike my sugar at night?", True),
+    ("How does exercise affect my glucose levels?", True),
+    ("What is the difference between type 1 and type 2 diabetes?", True),
+    ("Should I check my ketones when I'm sick?", True),
+    ("How do I use my Dexcom CGM?", True),
+    ("Is Ozempic the same as insulin?", True),
+    ("I'm always thirsty and tired, could it be diabetes?", True),
+    ("What's a good breakfast for a diabetic?", True),
+    ("How often should I see my endocrinologist?", True),
+    ("Are artificial sweeteners okay for people with diabetes?", True),
+    ("Can stress raise my blood sugar?", True),
+    ("What should my fasting glucose be?", True),
+    ("How do I treat a low when I'm out running?", True),
+    ("Is fruit juice bad for diabetics?", True),
+    ("What is the weather going to be like tomorrow?", False),
+    ("Who won the football game last night?", False),
+    ("Can you write me a poem about the ocean?", False),
+    ("What's the capital of France?", False),
+    ("Help me debug my Python code", False),
+    ("Should I buy bitcoin or stocks?", False),
+    ("Recommend a good movie to watch tonight", False),
+    ("Tell me a joke", False),
+    ("Who is the president of the United States?", False),
+    ("Translate 'hello' into Spanish", False),
+    ("What's the best car to buy in 2024?", False),
+    ("Can you help with my math homework?", False),
+    ("Where should I go on vacation this summer?", False),
+    ("Write an essay about world history", False),
+    ("What song is number one right now?", False),
+    ("How do I learn JavaScript?", False),
+]
+
+
+def llm_gate(message):
+    import google.generativeai as genai
+
+    genai.configure(api_key=os.environ["GOOGLE_API_KEY"])
+    model = genai.GenerativeModel("gemini-2.5-flash")
+    check_prompt = f"""Is this question related to diabetes, glucose, nutrition for diabetics, diabetes medications, or diabetes care?
+Question: "{message}"
+
+Answer with just "YES" or "NO"."""
+    return "YES" in model.generate_content(check_prompt).text.upper()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--llm", action="store_true", help="compare against the live Gemini gate")
+    parser.add_argument("--low", type=float, default=0.2)
+    parser.add_argument("--high", type=float, default=0.8)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    reference = {}
+    llm_latencies = []
+    for message, label in SAMPLES:
+        if args.llm:
+            start = time.perf_counter()
+            reference[message] = llm_gate(message)
+            llm_latencies.append(time.perf_counter() - start)
+        else:
+            reference[message] = label
+
+    decided = agreed = escalated = 0
+    disagreements = []
+    for message, _ in SAMPLES:
+        decision = classify_relevance(message, args.low, args.high)
+        if decision is None:
+            escalated += 1
+            continue
+        decided += 1
+        if decision == reference[message]:
+            agreed += 1
+        else:
+            disagreements.append((message, decision, relevance_score(message)))
+
+    # Local gate latency
+    start = time.perf_counter()
+    for i in range(args.iterations):
+        classify_relevance(SAMPLES[i % len(SAMPLES)][0], args.low, args.high)
+    local_latency = (time.perf_counter() - start) / args.iterations
+
+    print(f"Samples:              {len(SAMPLES)}")
+    print(f"Decided locally:      {decided} ({decided / len(SAMPLES):.0%})")
+    print(f"Escalated to LLM:     {escalated}")
+    print(f"Agreement (decided):  {agreed}/{decided} ({agreed / max(decided, 1):.1%})")
+    print(f"Local gate latency:   {local_latency * 1e6:.1f} µs/message")
+    if llm_latencies:
+        llm_mean = statistics.mean(llm_latencies)
+        print(f"LLM gate latency:     {llm_mean * 1000:.0f} ms/message")
+        saved = llm_mean * decided / len(SAMPLES)
+        print(f"Mean latency saved:   {saved * 1000:.0f} ms/message")
+    for message, decision, score in disagreements:
+        print(f"  disagree: {message!r} -> {decision} (p={score:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Shared pieces of the HTTP load-test benchmarks: start gunicorn, drive it, summarize"""
+import math
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_app(port, env=None, app='stub_app:app'):
+    """Run gunicorn (gunicorn.conf.py + benchmarks on the path) and wait until it answers"""
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--pythonpath', 'benchmarks',
+         '--bind', f'127.0.0.1:{port}', app],
+        cwd=ROOT, env=dict(os.environ, **(env or {})),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with {proc.returncode}")
+        try:
+            requests.get(f'http://127.0.0.1:{port}/api/food-list', timeout=1)
+            return proc
+        except requests.RequestException:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("gunicorn did not start")
+
+
+def stop_app(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return float('nan')
+    rank = max(int(math.ceil(p / 100 * len(sorted_values))), 1)
+    return sorted_values[rank - 1]
+
+
+def run_load(send, total, concurrency):
+    """Call send(session, i) for i in range(total) from `concurrency` client threads.
+
+    send returns True for a successful response. Latencies are in ms.
+    """
+    sessions = {}
+
+    def one(i):
+        session = sessions.setdefault(i % concurrency, requests.Session())
+        start = time.perf_counter()
+        try:
+            ok = send(session, i)
+        except requests.RequestException:
+            ok = False
+        return (time.perf_counter() - start) * 1000, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(r[0] for r in results)
+    return {
+        'requests': total,
+        'rps': total / elapsed,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'errors': sum(1 for r in results if not r[1]),
+    }
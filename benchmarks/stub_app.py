@@ -0,0 +1,38 @@
+"""main.app wired to the stub upstreams in benchmarks/stubs.py.
+
+Used by the load-test benchmarks so they measure the app, not how fast
+Gradio, CalorieNinja or Gemini are today. If STUB_UPSTREAM_URL points at a
+StubServer started elsewhere (the benchmark harness runs one in its own
+process) that is used; otherwise one is started inside this worker.
+
+    STUB_LATENCY_MS=200 gunicorn -c gunicorn.conf.py --pythonpath benchmarks stub_app:app
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="glycogenie-bench-"))
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from stubs import StubServer, UpstreamProfile, install_gradio_stub
+
+PROFILE = UpstreamProfile.from_env()
+
+if os.environ.get("STUB_UPSTREAM_URL"):
+    url = os.environ["STUB_UPSTREAM_URL"].rstrip("/")
+    os.environ.update({
+        'CALORIENINJA_URL': f"{url}/v1/nutrition",
+        'GEMINI_API_ENDPOINT': url,
+    })
+    os.environ.setdefault('CALORIENINJA_API_KEY', 'stub')
+    os.environ.setdefault('GOOGLE_API_KEY', 'stub')
+else:
+    STUB_SERVER = StubServer(PROFILE).start()
+    os.environ.update(STUB_SERVER.environ())
+
+import main
+
+install_gradio_stub(main, PROFILE)
+
+app = main.app
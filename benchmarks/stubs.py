@@ -0,0 +1,217 @@
+"""Fake Gradio, CalorieNinja and Gemini upstreams with latency and error injection.
+
+CalorieNinja and Gemini are served over real HTTP by StubServer, so requests
+go through the same sessions, retries and SDK code as in production:
+
+    server = StubServer(UpstreamProfile.from_env()).start()
+    os.environ.update(server.environ())      # before importing main
+
+The Gradio Space protocol (config, upload, queue/SSE) isn't worth faking on
+the wire; StubGradioClient stands in for gradio_client.Client instead and is
+installed into main's GradioPool with install_gradio_stub(main).
+
+Each upstream is tuned with STUB_<NAME>_LATENCY_MS, STUB_<NAME>_JITTER_MS and
+STUB_<NAME>_ERROR_RATE (NAME is GRADIO, CALORIENINJA or GEMINI), falling back
+to STUB_LATENCY_MS / STUB_JITTER_MS / STUB_ERROR_RATE.
+"""
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+UPSTREAMS = ('gradio', 'calorieninja', 'gemini')
+
+NUTRITION_ITEM = {
+    'name': 'stub food',
+    'calories': 95.0,
+    'protein_g': 0.5,
+    'carbohydrates_total_g': 25.0,
+    'fat_total_g': 0.3,
+    'fiber_g': 4.4,
+    'sugar_g': 19.0,
+    'sodium_mg': 2.0,
+    'serving_size_g': 100.0,
+}
+
+GRADIO_RESULT = {
+    'label': 'apple_pie',
+    'confidences': [
+        {'label': 'apple_pie', 'confidence': 0.91},
+        {'label': 'waffles', 'confidence': 0.05},
+        {'label': 'french_toast', 'confidence': 0.02},
+    ],
+}
+
+GEMINI_TEXT = "This is a stubbed Gemini reply about blood sugar and carbohydrates."
+
+
+class UpstreamProfile:
+    """Latency (ms) and error rate (0-1) for each upstream"""
+
+    def __init__(self, latency_ms=200, jitter_ms=0, error_rate=0.0, **overrides):
+        self.settings = {
+            name: {'latency_ms': latency_ms, 'jitter_ms': jitter_ms, 'error_rate': error_rate}
+            for name in UPSTREAMS
+        }
+        for name, values in overrides.items():
+            self.settings[name].update(values)
+
+    @classmethod
+    def from_env(cls, environ=None):
+        env = os.environ if environ is None else environ
+        profile = cls(
+            latency_ms=float(env.get("STUB_LATENCY_MS", 200)),
+            jitter_ms=float(env.get("STUB_JITTER_MS", 0)),
+            error_rate=float(env.get("STUB_ERROR_RATE", 0)),
+        )
+        for name in UPSTREAMS:
+            for key in ('latency_ms', 'jitter_ms', 'error_rate'):
+                value = env.get(f"STUB_{name.upper()}_{key.upper()}")
+                if value is not None:
+                    profile.settings[name][key] = float(value)
+        return profile
+
+    def to_env(self):
+        """STUB_* variables that reproduce this profile in another process"""
+        return {
+            f"STUB_{name.upper()}_{key.upper()}": str(value)
+            for name, values in self.settings.items()
+            for key, value in values.items()
+        }
+
+    def delay(self, name):
+        settings = self.settings[name]
+        latency = settings['latency_ms'] + random.uniform(-1, 1) * settings['jitter_ms']
+        time.sleep(max(latency, 0) / 1000)
+
+    def should_fail(self, name):
+        return random.random() < self.settings[name]['error_rate']
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'GlycoGenieStub/1.0'
+
+    GEMINI_PATH = re.compile(r'^/v1beta/models/[^/:]+:(generateContent|streamGenerateContent)$')
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _fail(self, name):
+        self.server.count(name, error=True)
+        self._send_json(503, {'error': {'code': 503, 'message': f'{name} stub: injected error', 'status': 'UNAVAILABLE'}})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != '/v1/nutrition':
+            return self._send_json(404, {'error': 'not found'})
+        profile = self.server.profile
+        profile.delay('calorieninja')
+        if profile.should_fail('calorieninja'):
+            return self._fail('calorieninja')
+        self.server.count('calorieninja')
+        query = parse_qs(url.query).get('query', ['stub food'])[0]
+        self._send_json(200, {'items': [dict(NUTRITION_ITEM, name=query)]})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        match = self.GEMINI_PATH.match(urlparse(self.path).path)
+        if not match:
+            return self._send_json(404, {'error': 'not found'})
+        profile = self.server.profile
+        profile.delay('gemini')
+        if profile.should_fail('gemini'):
+            return self._fail('gemini')
+        self.server.count('gemini')
+        if match.group(1) == 'generateContent':
+            return self._send_json(200, gemini_response(GEMINI_TEXT))
+        # Streaming: a JSON array of partial responses, one word per chunk
+        words = GEMINI_TEXT.split(' ')
+        chunks = [gemini_response(word + ('' if i == len(words) - 1 else ' ')) for i, word in enumerate(words)]
+        self._send_json(200, chunks)
+
+
+def gemini_response(text):
+    return {
+        'candidates': [{
+            'content': {'parts': [{'text': text}], 'role': 'model'},
+            'finishReason': 'STOP',
+            'index': 0,
+        }],
+        'usageMetadata': {'promptTokenCount': 10, 'candidatesTokenCount': 10, 'totalTokenCount': 20},
+    }
+
+
+class StubServer(ThreadingHTTPServer):
+    """CalorieNinja and Gemini (REST) on one local port, run in a daemon thread"""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, profile=None, host='127.0.0.1', port=0):
+        super().__init__((host, port), _Handler)
+        self.profile = profile or UpstreamProfile.from_env()
+        self.counts = {name: {'ok': 0, 'errors': 0} for name in ('calorieninja', 'gemini')}
+        self._counts_lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, name, error=False):
+        with self._counts_lock:
+            self.counts[name]['errors' if error else 'ok'] += 1
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name='upstream-stubs', daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def environ(self):
+        """Environment that points main.py at this server"""
+        return {
+            'CALORIENINJA_URL': f"{self.url}/v1/nutrition",
+            'CALORIENINJA_API_KEY': os.environ.get('CALORIENINJA_API_KEY') or 'stub',
+            'GEMINI_API_ENDPOINT': self.url,
+            'GOOGLE_API_KEY': os.environ.get('GOOGLE_API_KEY') or 'stub',
+        }
+
+
+class StubGradioClient:
+    """Stands in for gradio_client.Client: predict() returns a fixed label set"""
+
+    def __init__(self, profile=None):
+        self.profile = profile or UpstreamProfile.from_env()
+        self.calls = 0
+
+    def predict(self, *args, api_name=None, **kwargs):
+        self.calls += 1
+        self.profile.delay('gradio')
+        if self.profile.should_fail('gradio'):
+            raise ConnectionError("gradio stub: injected error")
+        return GRADIO_RESULT
+
+
+def install_gradio_stub(main, profile=None):
+    """Point main's Gradio pool at StubGradioClient (before it has built any clients)"""
+    main.GRADIO_POOL.factory = lambda: StubGradioClient(profile)
+    main.CLASSIFIER_BACKEND = 'gradio'
+    return main.GRADIO_POOL
@@ -0,0 +1,153 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from db import SQLiteDB
+from metrics import CACHE_REQUESTS
+
+log = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Small LRU + TTL cache with an optional SQLite backing store.
+
+    The in-process layer keeps hot entries in memory. The SQLite layer is
+    shared by every gunicorn worker on the box and survives restarts.
+    Values must be JSON serializable; both layers hold them serialized, so
+    every get() returns a fresh copy that callers are free to modify.
+
+    A SQLite hit only writes last_access back when it is more than
+    touch_seconds old, so reads stay reads; LRU eviction is that coarse.
+    """
+
+    def __init__(self, namespace, ttl_seconds, max_entries=1024, db_path=None, touch_seconds=60):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.touch_seconds = touch_seconds
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        if db_path:
+            self._init_db()
+
+    # ---------- SQLite helpers ----------
+
+    def _connect(self):
+        return self._db.connect()
+
+    def _init_db(self):
+        self._db = SQLiteDB(self.db_path, schema="""
+            CREATE TABLE IF NOT EXISTS cache (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (namespace, key));
+            CREATE INDEX IF NOT EXISTS idx_cache_access ON cache (namespace, last_access);
+        """)
+
+    def _db_get(self, key, now):
+        """(serialized value, expires_at), or (None, None)"""
+        try:
+            row = self._connect().execute(
+                "SELECT value, expires_at, last_access FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            ).fetchone()
+            if row is None:
+                return None, None
+            value, expires_at, last_access = row
+            if expires_at <= now:
+                self._db_delete(key)
+                return None, None
+            if last_access <= now - self.touch_seconds:
+                self._connect().execute(
+                    "UPDATE cache SET last_access = ? WHERE namespace = ? AND key = ?",
+                    (now, self.namespace, key)
+                )
+            return value, expires_at
+        except sqlite3.Error as e:
+            log.warning("Cache read error (%s): %s", self.namespace, e)
+            return None, None
+
+    def _db_set(self, key, value, expires_at, now):
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, value, expires_at, now)
+            )
+            # Evict expired rows, then the least recently used beyond the cap
+            conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND expires_at <= ?",
+                (self.namespace, now)
+            )
+            conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key IN ("
+                " SELECT key FROM cache WHERE namespace = ?"
+                " ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.namespace, self.namespace, self.max_entries)
+            )
+        except sqlite3.Error as e:
+            log.warning("Cache write error (%s): %s", self.namespace, e)
+
+    def _db_delete(self, key):
+        try:
+            self._connect().execute(
+                "DELETE FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            )
+        except sqlite3.Error as e:
+            log.warning("Cache delete error (%s): %s", self.namespace, e)
+
+    # ---------- Public API ----------
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing/expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    CACHE_REQUESTS.inc(cache=self.namespace, result='hit')
+                    return json.loads(value)
+                del self._memory[key]
+
+        value = None
+        if self.db_path:
+            value, expires_at = self._db_get(key, now)
+        if value is None:
+            CACHE_REQUESTS.inc(cache=self.namespace, result='miss')
+            return default
+        CACHE_REQUESTS.inc(cache=self.namespace, result='hit')
+        self._remember(key, value, expires_at)
+        return json.loads(value)
+
+    def set(self, key, value, ttl_seconds=None):
+        """Store value under key for ttl_seconds (defaults to the cache TTL)"""
+        now = time.time()
+        expires_at = now + (ttl_seconds if ttl_seconds is not None else self.ttl_seconds)
+        value = json.dumps(value)
+        self._remember(key, value, expires_at)
+        if self.db_path:
+            self._db_set(key, value, expires_at, now)
+
+    def delete(self, key):
+        with self._lock:
+            self._memory.pop(key, None)
+        if self.db_path:
+            self._db_delete(key)
+
+    def _remember(self, key, value, expires_at):
+        with self._lock:
+            self._memory[key] = (value, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
@@ -0,0 +1,226 @@
+import json
+import logging
+import secrets
+import sqlite3
+import time
+
+from db import SQLiteDB
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chat_sessions (
+    session_id TEXT PRIMARY KEY,
+    summary TEXT NOT NULL,
+    turns TEXT NOT NULL,              -- JSON [{"role": "user"|"model", "content": ...}]
+    folded INTEGER NOT NULL,          -- turns folded into the summary so far
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_chat_sessions_updated ON chat_sessions (updated_at);
+"""
+
+# Reply the model "gives" to the summary message that opens a compacted history
+SUMMARY_ACK = "Understood, I'll keep that context in mind."
+
+
+def estimate_tokens(text):
+    """Rough Gemini token count: about four characters per token for English"""
+    return len(text) // 4 + 1
+
+
+def turns_tokens(turns):
+    return sum(estimate_tokens(turn['content']) for turn in turns)
+
+
+def clip_to_tokens(text, max_tokens, keep='end'):
+    """Cut text to roughly max_tokens, keeping its start or its end"""
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    return text[-max_chars:] if keep == 'end' else text[:max_chars]
+
+
+def extractive_summary(summary, turns, max_tokens):
+    """Summarize without a model: the old summary plus the start of each folded turn"""
+    lines = [summary] if summary else []
+    for turn in turns:
+        speaker = 'User' if turn['role'] == 'user' else 'Assistant'
+        content = " ".join(turn['content'].split())
+        lines.append(f"{speaker}: {content[:160]}")
+    # The most recent context matters most, so trim from the front
+    return clip_to_tokens("\n".join(lines), max_tokens, keep='end')
+
+
+class ChatSessionStore:
+    """Server-held chatbot conversations, shared by every gunicorn worker.
+
+    A session is a rolling summary plus the most recent turns verbatim. When
+    the verbatim turns grow past history_tokens, compact() folds the oldest
+    ones into the summary (kept under summary_tokens) until they are back
+    under half the budget, so the prompt for each turn stays bounded however
+    long the conversation runs. Sessions idle for ttl_seconds expire, and
+    beyond max_sessions the least recently used are evicted.
+
+        session_id, session = store.get_or_create(request_session_id)
+        chat = model.start_chat(history=store.history(session))
+        ...
+        if store.append(session_id, message, reply):
+            executor.submit(store.compact, session_id)
+    """
+
+    def __init__(self, path, ttl_seconds=24 * 3600, max_sessions=10000, history_tokens=1000,
+                 summary_tokens=300, summarizer=extractive_summary):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.history_tokens = history_tokens
+        self.summary_tokens = summary_tokens
+        self.summarizer = summarizer
+        self.db = SQLiteDB(path, schema=SCHEMA)
+
+    @staticmethod
+    def new_session_id():
+        return secrets.token_urlsafe(16)
+
+    def _row(self, conn, session_id, now):
+        row = conn.execute(
+            "SELECT summary, turns, folded, updated_at FROM chat_sessions WHERE session_id = ?",
+            (session_id,)
+        ).fetchone()
+        if row is None or row[3] <= now - self.ttl_seconds:
+            return None
+        return {'summary': row[0], 'turns': json.loads(row[1]), 'folded': row[2]}
+
+    def get(self, session_id):
+        """The session's summary and turns, or None if unknown or expired"""
+        if not session_id:
+            return None
+        try:
+            return self._row(self.db.connect(), session_id, time.time())
+        except sqlite3.Error as e:
+            log.warning("Chat session read error: %s", e)
+            return None
+
+    def get_or_create(self, session_id=None, seed_turns=None):
+        """(session_id, session) for an existing session, or a fresh one.
+
+        seed_turns (the history array older clients still send) is only used
+        to start a new session.
+        """
+        session = self.get(session_id)
+        if session is not None:
+            return session_id, session
+        turns = [
+            {'role': 'model' if turn.get('role') in ('assistant', 'model') else 'user',
+             'content': str(turn.get('content', ''))}
+            for turn in (seed_turns or []) if isinstance(turn, dict) and turn.get('content')
+        ]
+        session = {'summary': '', 'turns': turns, 'folded': 0}
+        session_id = self.new_session_id()
+        self._save(session_id, session)
+        self.evict()
+        return session_id, session
+
+    def _save(self, session_id, session):
+        try:
+            self.db.execute(
+                "INSERT OR REPLACE INTO chat_sessions (session_id, summary, turns, folded, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (session_id, session['summary'], json.dumps(session['turns']), session['folded'], time.time())
+            )
+        except sqlite3.Error as e:
+            log.warning("Chat session write error: %s", e)
+
+    def history(self, session):
+        """Gemini chat history for a session: the summary, then the verbatim turns"""
+        messages = []
+        if session['summary']:
+            messages.append({'role': 'user', 'parts': [f"Summary of our conversation so far:\n{session['summary']}"]})
+            messages.append({'role': 'model', 'parts': [SUMMARY_ACK]})
+        for turn in session['turns']:
+            messages.append({'role': turn['role'], 'parts': [turn['content']]})
+        return messages
+
+    def append(self, session_id, user_message, reply):
+        """Record one exchange; returns True when the session is due for compact()"""
+        new_turns = [{'role': 'user', 'content': user_message}, {'role': 'model', 'content': reply}]
+        try:
+            with self.db.transaction() as conn:
+                session = self._row(conn, session_id, time.time())
+                if session is None:
+                    session = {'summary': '', 'turns': [], 'folded': 0}
+                session['turns'].extend(new_turns)
+                conn.execute(
+                    "INSERT OR REPLACE INTO chat_sessions (session_id, summary, turns, folded, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (session_id, session['summary'], json.dumps(session['turns']), session['folded'], time.time())
+                )
+        except sqlite3.Error as e:
+            log.warning("Chat session write error: %s", e)
+            return False
+        return turns_tokens(session['turns']) > self.history_tokens
+
+    def _turns_to_fold(self, turns):
+        """How many of the oldest turns to fold to get under half the budget (whole exchanges only)"""
+        target = self.history_tokens // 2
+        remaining = turns_tokens(turns)
+        count = 0
+        # Always keep the latest exchange verbatim
+        while count < len(turns) - 2 and remaining > target:
+            remaining -= turns_tokens(turns[count:count + 2])
+            count += 2
+        return count
+
+    def compact(self, session_id):
+        """Fold the oldest turns into the rolling summary if the session is over budget.
+
+        The summarizer (possibly a slow model call) runs outside any lock; the
+        result is written only if no other worker compacted the session in the
+        meantime, and turns appended meanwhile are kept.
+        """
+        session = self.get(session_id)
+        if session is None or turns_tokens(session['turns']) <= self.history_tokens:
+            return False
+        count = self._turns_to_fold(session['turns'])
+        if not count:
+            return False
+
+        folded_turns = session['turns'][:count]
+        try:
+            summary = self.summarizer(session['summary'], folded_turns, self.summary_tokens)
+        except Exception as e:
+            log.warning("Chat summary error, using extractive summary: %s", e)
+            summary = extractive_summary(session['summary'], folded_turns, self.summary_tokens)
+        summary = clip_to_tokens(summary.strip(), self.summary_tokens)
+
+        try:
+            with self.db.transaction() as conn:
+                current = self._row(conn, session_id, time.time())
+                if current is None or current['folded'] != session['folded']:
+                    return False
+                conn.execute(
+                    "UPDATE chat_sessions SET summary = ?, turns = ?, folded = ? WHERE session_id = ?",
+                    (summary, json.dumps(current['turns'][count:]), current['folded'] + count, session_id)
+                )
+        except sqlite3.Error as e:
+            log.warning("Chat session compaction error: %s", e)
+            return False
+        return True
+
+    def delete(self, session_id):
+        try:
+            self.db.execute("DELETE FROM chat_sessions WHERE session_id = ?", (session_id,))
+        except sqlite3.Error as e:
+            log.warning("Chat session delete error: %s", e)
+
+    def evict(self):
+        """Drop expired sessions, then the least recently used beyond max_sessions"""
+        try:
+            conn = self.db.connect()
+            conn.execute("DELETE FROM chat_sessions WHERE updated_at <= ?", (time.time() - self.ttl_seconds,))
+            conn.execute(
+                "DELETE FROM chat_sessions WHERE session_id IN ("
+                " SELECT session_id FROM chat_sessions ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_sessions,)
+            )
+        except sqlite3.Error as e:
+            log.warning("Chat session eviction error: %s", e)
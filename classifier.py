@@ -0,0 +1,152 @@
+import json
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future
+
+log = logging.getLogger(__name__)
+
+
+def load_labels(labels_path):
+    """Class labels from a JSON list or a text file with one label per line"""
+    with open(labels_path) as f:
+        if labels_path.endswith('.json'):
+            return json.load(f)
+        return [line.strip() for line in f if line.strip()]
+
+
+class MicroBatcher:
+    """Collects concurrent calls and runs them through one batched function call.
+
+    batch_fn receives a list of inputs and must return a list of results in
+    the same order. Callers block in submit() until their result is ready.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=8, max_wait_ms=10):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._pid = None
+
+    def _ensure_worker(self):
+        # Threads don't survive fork, so start (or restart) one per process
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._worker = None
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="classifier-batcher", daemon=True)
+                self._worker.start()
+
+    def submit(self, item, timeout=None):
+        """Queue an item and wait for its result"""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((item, future))
+        return future.result(timeout=timeout)
+
+    def _run(self):
+        pending = self._queue
+        while True:
+            batch = [pending.get()]
+            try:
+                # Wait briefly for more requests to share the forward pass
+                while len(batch) < self.max_batch_size:
+                    batch.append(pending.get(timeout=self.max_wait))
+            except queue.Empty:
+                pass
+
+            items = [item for item, _ in batch]
+            try:
+                results = self.batch_fn(items)
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+
+
+class LocalClassifier:
+    """CPU-only ONNX Runtime ingredient classifier with micro-batched inference.
+
+    The model is an ONNX export of the ingredient classifier that takes a
+    float32 NCHW batch of ImageNet-normalized RGB images and returns one row
+    of logits per image. Labels are read from a JSON list or a text file with
+    one label per line, in output order.
+    """
+
+    MEAN = (0.485, 0.456, 0.406)
+    STD = (0.229, 0.224, 0.225)
+
+    def __init__(self, model_path, labels_path, input_size=224, top_k=5,
+                 max_batch_size=8, max_wait_ms=10, num_threads=None):
+        self.model_path = model_path
+        self.labels = self._load_labels(labels_path)
+        self.input_size = input_size
+        self.top_k = top_k
+        self.num_threads = num_threads
+        self._session = None
+        self._session_pid = None
+        self._session_lock = threading.Lock()
+        self._batcher = MicroBatcher(self._run_batch, max_batch_size, max_wait_ms)
+
+    @staticmethod
+    def _load_labels(labels_path):
+        return load_labels(labels_path)
+
+    def _get_session(self):
+        """Load the model once per worker process"""
+        with self._session_lock:
+            if self._session is None or self._session_pid != os.getpid():
+                import onnxruntime as ort
+
+                options = ort.SessionOptions()
+                if self.num_threads:
+                    options.intra_op_num_threads = self.num_threads
+                self._session = ort.InferenceSession(
+                    self.model_path, sess_options=options, providers=["CPUExecutionProvider"]
+                )
+                self._session_pid = os.getpid()
+                log.debug("Local classifier loaded from %s", self.model_path)
+            return self._session
+
+    def warm_up(self):
+        self._get_session()
+
+    def _preprocess(self, file_path):
+        import numpy as np
+        from PIL import Image, ImageOps
+
+        with Image.open(file_path) as img:
+            img = ImageOps.exif_transpose(img).convert('RGB')
+            img = ImageOps.fit(img, (self.input_size, self.input_size), Image.BILINEAR)
+            pixels = np.asarray(img, dtype=np.float32) / 255.0
+        pixels = (pixels - np.array(self.MEAN, dtype=np.float32)) / np.array(self.STD, dtype=np.float32)
+        return pixels.transpose(2, 0, 1)
+
+    def _run_batch(self, arrays):
+        import numpy as np
+
+        session = self._get_session()
+        input_name = session.get_inputs()[0].name
+        logits = session.run(None, {input_name: np.stack(arrays)})[0]
+
+        # Softmax per row, then top-k
+        logits = logits - logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+        top = np.argsort(-probs, axis=1)[:, :self.top_k]
+        return [
+            [(self.labels[idx], float(row[idx])) for idx in indices]
+            for row, indices in zip(probs, top)
+        ]
+
+    def predict(self, file_path, timeout=None):
+        """Return [(label, confidence), ...] for an image file, best first"""
+        # Decode/resize in the caller's thread; only the forward pass is batched
+        return self._batcher.submit(self._preprocess(file_path), timeout=timeout)
@@ -0,0 +1,130 @@
+import json
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Per-process registry of upstream clients. Everything here is built lazily on
+# first use and dropped in the child after a fork, so gunicorn --preload never
+# shares sockets or gRPC channels between workers.
+_lock = threading.Lock()
+_models = {}
+_http_session = None
+_genai_configured = False
+_stats = {'models_built': 0, 'model_reuses': 0}
+
+
+def _reset_after_fork():
+    global _lock, _http_session, _genai_configured
+    _lock = threading.Lock()
+    _models.clear()
+    _http_session = None
+    _genai_configured = False
+    _stats.update(models_built=0, model_reuses=0)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_model(model_name, generation_config=None, system_instruction=None):
+    """Return a shared GenerativeModel for this configuration"""
+    key = (
+        model_name,
+        json.dumps(generation_config or {}, sort_keys=True),
+        system_instruction,
+    )
+    with _lock:
+        model = _models.get(key)
+        if model is not None:
+            _stats['model_reuses'] += 1
+            return model
+
+        genai = _configure_genai()
+
+        kwargs = {}
+        if generation_config:
+            kwargs['generation_config'] = generation_config
+        if system_instruction:
+            kwargs['system_instruction'] = system_instruction
+        model = genai.GenerativeModel(model_name, **kwargs)
+        _models[key] = model
+        _stats['models_built'] += 1
+        return model
+
+
+def _configure_genai():
+    """Import and configure the Gemini SDK on first use (it takes ~0.5s to import).
+
+    GEMINI_API_ENDPOINT points it at another server (REST only); GEMINI_TRANSPORT
+    picks the transport, "rest" being the one that cooperates with gevent.
+    """
+    global _genai_configured
+    import google.generativeai as genai
+
+    if not _genai_configured:
+        endpoint = os.environ.get("GEMINI_API_ENDPOINT")
+        if endpoint:
+            genai.configure(
+                api_key=os.environ.get("GOOGLE_API_KEY"),
+                transport="rest",
+                client_options={"api_endpoint": endpoint}
+            )
+        else:
+            genai.configure(
+                api_key=os.environ.get("GOOGLE_API_KEY"),
+                transport=os.environ.get("GEMINI_TRANSPORT") or None
+            )
+        _genai_configured = True
+    return genai
+
+
+def get_http_session():
+    """Shared keep-alive requests.Session with retry/backoff for idempotent calls"""
+    global _http_session
+    with _lock:
+        if _http_session is None:
+            retry = Retry(
+                total=int(os.environ.get("HTTP_RETRIES", 2)),
+                backoff_factor=float(os.environ.get("HTTP_BACKOFF", 0.3)),
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(['GET', 'HEAD']),
+                respect_retry_after_header=True,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=int(os.environ.get("HTTP_POOL_SIZE", 16)),
+                max_retries=retry,
+            )
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _http_session = session
+        return _http_session
+
+
+def client_stats():
+    """Model reuse and HTTP connection reuse counters for this worker"""
+    stats = dict(_stats, pid=os.getpid())
+    pools = {}
+    session = _http_session
+    if session is not None:
+        seen = set()
+        for adapter in session.adapters.values():
+            if id(adapter) in seen:
+                continue
+            seen.add(id(adapter))
+            for pool_key in list(adapter.poolmanager.pools.keys()):
+                pool = adapter.poolmanager.pools.get(pool_key)
+                if pool is None:
+                    continue
+                # urllib3 counts every request and every new socket per host pool
+                pools[f"{pool.scheme}://{pool.host}"] = {
+                    'requests': pool.num_requests,
+                    'connections_opened': pool.num_connections,
+                    'reused': max(pool.num_requests - pool.num_connections, 0),
+                }
+    stats['http_pools'] = pools
+    return stats
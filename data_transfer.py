@@ -0,0 +1,254 @@
+import csv
+import io
+import itertools
+import json
+import time
+import zlib
+from datetime import datetime, timezone
+
+from glucose_store import entry_to_row
+from reminders import reminder_to_row
+
+FORMAT_VERSION = 1
+
+# Columns of the CSV export, which holds glucose readings only (NDJSON carries everything)
+CSV_FIELDS = (
+    'id', 'date', 'time', 'currentGlucose', 'insulinDose', 'insulinType',
+    'carbsConsumed', 'recentActivity', 'factors', 'notes',
+)
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+# Output is handed to the compressor (or the client) in pieces of about this size
+CHUNK_BYTES = 64 * 1024
+# Longest line accepted on import; a gzip bomb or a file without newlines stops here
+MAX_LINE_BYTES = 1024 * 1024
+
+
+# ---------- Export ----------
+
+def export_ndjson(glucose_store, reminder_store, user_id, batch_size=1000):
+    """A header line, then every glucose reading (oldest first) and reminder, one JSON object per line"""
+    yield json.dumps({
+        'kind': 'header',
+        'format': 'glycogenie-export',
+        'version': FORMAT_VERSION,
+        'exported_at': datetime.now(timezone.utc).isoformat(),
+    }) + "\n"
+    for entry in glucose_store.iter_entries(user_id, batch_size):
+        yield json.dumps({'kind': 'glucose', **entry}) + "\n"
+    for reminder in reminder_store.list_reminders(user_id):
+        yield json.dumps({'kind': 'reminder', **reminder}) + "\n"
+
+
+def export_csv(glucose_store, user_id, batch_size=1000):
+    """Glucose readings as CSV rows, oldest first, with factors joined by ';'"""
+    out = io.StringIO()
+    writer = csv.writer(out)
+
+    def take():
+        text = out.getvalue()
+        out.seek(0)
+        out.truncate()
+        return text
+
+    writer.writerow(CSV_FIELDS)
+    yield take()
+    for entry in glucose_store.iter_entries(user_id, batch_size):
+        writer.writerow([
+            ';'.join(entry[field]) if field == 'factors' else entry[field]
+            for field in CSV_FIELDS
+        ])
+        yield take()
+
+
+def encode_chunks(lines, compress=True, chunk_bytes=CHUNK_BYTES, level=6):
+    """Join text lines into ~chunk_bytes pieces of UTF-8, gzipped as one stream if compress"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16) if compress else None
+    pending = []
+    size = 0
+    for line in lines:
+        pending.append(line)
+        size += len(line)
+        if size >= chunk_bytes:
+            data = "".join(pending).encode()
+            pending = []
+            size = 0
+            if compressor:
+                data = compressor.compress(data)
+            if data:
+                yield data
+    data = "".join(pending).encode()
+    if compressor:
+        data = compressor.compress(data) + compressor.flush()
+    if data:
+        yield data
+
+
+# ---------- Import ----------
+
+def decompressed(chunks, max_chunk=CHUNK_BYTES):
+    """Bytes of an upload, gunzipped on the fly when it starts with the gzip magic.
+
+    Output comes in pieces of at most max_chunk, so a small, highly
+    compressed body can't expand all at once. Concatenated gzip members
+    (`cat a.gz b.gz`) are read one after another.
+    """
+    chunks = iter(chunks)
+    head = b''
+    for chunk in chunks:
+        head += chunk
+        if len(head) >= len(GZIP_MAGIC):
+            break
+    if not head.startswith(GZIP_MAGIC):
+        if head:
+            yield head
+        yield from chunks
+        return
+
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    started = False
+    for chunk in itertools.chain((head,), chunks):
+        data = chunk
+        while data:
+            started = True
+            out = decompressor.decompress(data, max_chunk)
+            if out:
+                yield out
+            if decompressor.eof:
+                data = decompressor.unused_data
+                decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+                started = False
+            else:
+                data = decompressor.unconsumed_tail
+    if started:
+        tail = decompressor.flush()
+        if tail:
+            yield tail
+        if not decompressor.eof:
+            raise ValueError("gzip data ends early")
+
+
+def iter_lines(chunks, max_line_bytes=MAX_LINE_BYTES):
+    """Text lines (line endings kept) from a stream of possibly gzipped bytes"""
+    buffer = b''
+    for chunk in decompressed(chunks):
+        buffer += chunk
+        lines = buffer.split(b'\n')
+        buffer = lines.pop()
+        if len(buffer) > max_line_bytes:
+            raise ValueError(f"line longer than {max_line_bytes} bytes")
+        for line in lines:
+            yield line.decode('utf-8', 'replace') + "\n"
+    if buffer:
+        yield buffer.decode('utf-8', 'replace')
+
+
+def _ndjson_records(lines):
+    for line_number, line in enumerate(lines, 1):
+        if line.strip():
+            yield line_number, line
+
+
+def _csv_records(lines):
+    reader = csv.DictReader(lines)
+    missing = {'id', 'date', 'time', 'currentGlucose'} - set(reader.fieldnames or ())
+    if missing:
+        raise ValueError(f"CSV header is missing {', '.join(sorted(missing))}")
+    for row in reader:
+        # Empty cells were None (no insulin type, no carbs) in the export
+        row = {field: value or None for field, value in row.items() if field}
+        row['factors'] = [factor for factor in (row.get('factors') or '').split(';') if factor]
+        row['kind'] = 'glucose'
+        yield reader.line_num, row
+
+
+def _parse_record(record):
+    if isinstance(record, str):
+        record = json.loads(record)
+    if not isinstance(record, dict):
+        raise ValueError("each line must be a JSON object")
+    return record
+
+
+def import_records(chunks, glucose_store, reminder_store, user_id, batch_size=5000, max_errors=20):
+    """Read an NDJSON or CSV export (optionally gzipped) from byte chunks into the stores.
+
+    Records are validated one at a time and inserted in batches of
+    batch_size, each in its own transaction, so memory stays flat however
+    large the file is. Ids the user already has are skipped, which makes
+    importing the same file twice harmless and lets an interrupted import
+    simply be run again. Lines without a 'kind' are taken as glucose readings.
+
+    Returns counts, up to max_errors invalid-record messages, and 'error' if
+    the stream itself couldn't be read to the end.
+    """
+    result = {
+        'records': 0, 'glucose_inserted': 0, 'reminders_inserted': 0,
+        'duplicates': 0, 'invalid': 0, 'errors': [], 'error': None,
+    }
+    now = time.time()
+    glucose_rows = []
+    reminders = []
+
+    def flush_glucose():
+        inserted = glucose_store.add_rows(user_id, glucose_rows)
+        result['glucose_inserted'] += inserted
+        result['duplicates'] += len(glucose_rows) - inserted
+        glucose_rows.clear()
+
+    def flush_reminders():
+        inserted = reminder_store.upsert(user_id, reminders, now=now, replace=False)
+        result['reminders_inserted'] += inserted
+        result['duplicates'] += len(reminders) - inserted
+        reminders.clear()
+
+    try:
+        lines = itertools.dropwhile(lambda line: not line.strip(), iter_lines(chunks))
+        first = next(lines, None)
+        if first is None:
+            return result
+        first = first.lstrip('\ufeff')
+        lines = itertools.chain((first,), lines)
+        records = _ndjson_records(lines) if first.lstrip().startswith('{') else _csv_records(lines)
+
+        for line_number, record in records:
+            try:
+                record = _parse_record(record)
+                kind = record.pop('kind', 'glucose')
+                if kind == 'header':
+                    version = record.get('version', FORMAT_VERSION)
+                    if isinstance(version, bool) or not isinstance(version, int):
+                        result['error'] = f"export version {version!r} is not a number"
+                        return result
+                    if version > FORMAT_VERSION:
+                        result['error'] = f"export version {version} is newer than this server"
+                        return result
+                    continue
+                result['records'] += 1
+                if kind == 'glucose':
+                    glucose_rows.append(entry_to_row(user_id, record, now))
+                elif kind == 'reminder':
+                    reminder_to_row(user_id, record, now)
+                    reminders.append(record)
+                else:
+                    raise ValueError(f"unknown kind {kind!r}")
+            except (ValueError, TypeError) as e:
+                result['invalid'] += 1
+                if len(result['errors']) < max_errors:
+                    result['errors'].append(f"line {line_number}: {e}")
+                continue
+
+            if len(glucose_rows) >= batch_size:
+                flush_glucose()
+            if len(reminders) >= batch_size:
+                flush_reminders()
+    except (ValueError, zlib.error, csv.Error) as e:
+        result['error'] = str(e)
+    finally:
+        # Everything validated so far is kept, even when the stream breaks off
+        if glucose_rows:
+            flush_glucose()
+        if reminders:
+            flush_reminders()
+    return result
@@ -0,0 +1,60 @@
+import os
+import sqlite3
+import threading
+
+
+class SQLiteDB:
+    """Per-thread SQLite connections to one database file.
+
+    Connections are opened lazily and re-opened after a fork, so the same
+    object can be created at import time and used from gunicorn workers.
+    """
+
+    def __init__(self, path, schema=None):
+        self.path = path
+        self.schema = schema
+        self._local = threading.local()
+        self._pid = os.getpid()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if schema:
+            self.connect().executescript(schema)
+
+    def connect(self):
+        if self._pid != os.getpid():
+            self._local = threading.local()
+            self._pid = os.getpid()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def execute(self, sql, params=()):
+        return self.connect().execute(sql, params)
+
+    def executemany(self, sql, rows):
+        return self.connect().executemany(sql, rows)
+
+    def transaction(self):
+        """Context manager for an explicit BEGIN IMMEDIATE ... COMMIT block"""
+        return _Transaction(self.connect())
+
+
+class _Transaction:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.execute("COMMIT")
+        else:
+            self.conn.execute("ROLLBACK")
+        return False
@@ -0,0 +1,104 @@
+import heapq
+from collections import defaultdict
+
+
+def normalize(text):
+    return " ".join(text.lower().replace('_', ' ').split())
+
+
+def trigrams(text):
+    """Character trigrams of a word or phrase, padded so short words still get some"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FoodIndex:
+    """Typo-tolerant autocomplete over a fixed list of food names.
+
+    Built once: a prefix trie over every word of every name (so "pie" finds
+    "apple pie") and a trigram index for misspellings ("brocoli", "bannana").
+    Lookups touch only the trie path and the trigram posting lists.
+
+        index = FoodIndex(["apple pie", "banana", ...])
+        index.search("aple", limit=5)   # [("apple", 0.62), ("apple pie", 0.45), ...]
+    """
+
+    # Below this trigram similarity a match is noise
+    MIN_SIMILARITY = 0.3
+
+    def __init__(self, names):
+        seen = {}
+        for name in names:
+            key = normalize(name)
+            if key and key not in seen:
+                seen[key] = len(seen)
+        self.names = list(seen)
+        self._trie = {}
+        self._grams = defaultdict(list)
+        self._gram_counts = []
+        for item_id, name in enumerate(self.names):
+            for position, word in enumerate(name.split()):
+                self._insert(word, item_id, position)
+            grams = trigrams(name)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._grams[gram].append(item_id)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _insert(self, word, item_id, position):
+        node = self._trie
+        for char in word:
+            node = node.setdefault(char, {})
+            # '' holds (item, word position) for every name with a word under this prefix
+            node.setdefault('', []).append((item_id, position))
+
+    def _prefix_matches(self, prefix):
+        node = self._trie
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+        return node.get('', [])
+
+    def search(self, query, limit=10):
+        """Ranked (name, score) matches; score is in (0, 2], higher is better"""
+        query = normalize(query)
+        if not query:
+            return []
+        scores = {}
+
+        # Prefix matches: every query word must prefix some word of the name.
+        # Names starting with the query rank first, shorter names break ties.
+        words = query.split()
+        candidates = None
+        first_word_at_start = set()
+        for i, word in enumerate(words):
+            matches = self._prefix_matches(word)
+            ids = {item_id for item_id, _ in matches}
+            if i == 0:
+                first_word_at_start = {item_id for item_id, position in matches if position == 0}
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                break
+        for item_id in candidates or ():
+            name = self.names[item_id]
+            score = 1.5 if item_id in first_word_at_start else 1.2
+            scores[item_id] = score + len(query) / len(name) * 0.3
+
+        # Trigram similarity (Dice coefficient) for typos; one or two letters
+        # are still being typed, not misspelled
+        if len(query) >= 3:
+            query_grams = trigrams(query)
+            shared = defaultdict(int)
+            for gram in query_grams:
+                for item_id in self._grams.get(gram, ()):
+                    shared[item_id] += 1
+            for item_id, count in shared.items():
+                similarity = 2 * count / (len(query_grams) + self._gram_counts[item_id])
+                if similarity >= self.MIN_SIMILARITY and similarity > scores.get(item_id, 0):
+                    scores[item_id] = similarity
+
+        ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], self.names[item[0]]))
+        return [(self.names[item_id], round(score, 3)) for item_id, score in ranked]
@@ -0,0 +1,250 @@
+"""Vectorized port of the glucose prediction model in static/js/glucose.js.
+
+The browser's predictGlucose() evaluates one horizon for one reading. This
+module evaluates the same model (insulin activity curves, personalized ISF,
+carb absorption, activity, stress/illness factors and basal drift) for a whole
+grid of horizons and any number of users in one NumPy pass.
+
+    inputs = build_inputs([entry], [profile], now)
+    curves = forecast(inputs, horizons_hours(8, 5))   # shape (users, horizons)
+"""
+from datetime import datetime
+
+import numpy as np
+
+# Insulin action parameters: onset, peak, duration (hours), peak effect, shape
+SHAPE_BIEXPONENTIAL, SHAPE_GAUSSIAN, SHAPE_PLATEAU, SHAPE_FLAT = range(4)
+INSULIN_PARAMS = {
+    'rapid': (0.17, 1.0, 5, 1.0, SHAPE_BIEXPONENTIAL),
+    'short': (0.5, 2.5, 8, 0.85, SHAPE_GAUSSIAN),
+    'intermediate': (1.5, 6, 18, 0.6, SHAPE_PLATEAU),
+    'long': (2, -1, 24, 0.25, SHAPE_FLAT),
+}
+
+ISF_EXERCISE_MULTIPLIERS = {
+    'Sedentary': 0.9,
+    'Lightly active': 1.0,
+    'Moderately active': 1.1,
+    'Very active': 1.2,
+    'Extremely active': 1.3,
+}
+UTILIZATION_EXERCISE_MULTIPLIERS = {
+    'Sedentary': 0.8,
+    'Lightly active': 1.0,
+    'Moderately active': 1.2,
+    'Very active': 1.4,
+    'Extremely active': 1.6,
+}
+ACTIVITY_REDUCTION = {'light': 15, 'moderate': 30, 'intense': 50}
+FACTOR_IMPACT = {'stress': 30, 'illness': 40, 'menstruation': 20, 'alcohol': -15}
+
+CARB_PEAK_HOURS = 0.75
+CARB_DURATION_HOURS = 2.5
+MIN_PREDICTION = 40
+
+
+def horizons_hours(max_hours=8, step_minutes=5):
+    """Forecast grid in hours: 0, step, 2*step, ... max_hours"""
+    steps = int(round(max_hours * 60 / step_minutes))
+    return np.arange(steps + 1) * (step_minutes / 60.0)
+
+
+def _float(value):
+    """parseFloat-ish: NaN when missing or unparseable"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def _int(value):
+    """parseInt-ish: NaN when missing or unparseable"""
+    try:
+        return float(int(float(value)))
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def personalized_isf(profile, current_glucose):
+    """calculatePersonalizedISF() for one user"""
+    isf = 40.0
+    if profile.get('weight'):
+        estimated_tdd = _float(profile['weight']) * 0.5
+        isf = 1800 / estimated_tdd if estimated_tdd else float('inf')
+    if profile.get('age'):
+        age = _int(profile['age'])
+        if age < 18:
+            isf *= 1.2
+        elif age > 65:
+            isf *= 1.15
+    if profile.get('exerciseLevel'):
+        isf *= ISF_EXERCISE_MULTIPLIERS.get(profile['exerciseLevel'], 1.0)
+    if profile.get('bmi'):
+        bmi = _float(profile['bmi'])
+        if bmi > 30:
+            isf *= 0.8
+        elif bmi < 18.5:
+            isf *= 1.1
+    if current_glucose > 250:
+        isf *= 0.9
+    return max(20.0, min(80.0, isf))
+
+
+def basal_rate(profile):
+    """Net basal glucose change per hour (production - utilization) for one user"""
+    production = 2.0
+    utilization = 1.5
+    if profile.get('exerciseLevel'):
+        utilization *= UTILIZATION_EXERCISE_MULTIPLIERS.get(profile['exerciseLevel'], 1.0)
+    if profile.get('age') and _int(profile['age']) > 60:
+        utilization *= 0.9
+    conditions = profile.get('conditions') or []
+    if 'Obesity' in conditions:
+        production *= 1.2
+        utilization *= 0.8
+    if 'Kidney Disease' in conditions:
+        utilization *= 0.85
+    return production - utilization
+
+
+def carb_ratio(profile):
+    """mg/dL rise per gram of carbohydrate"""
+    if profile.get('bmi'):
+        bmi = _float(profile['bmi'])
+        if bmi > 30:
+            return 5.0
+        if bmi < 20:
+            return 3.0
+    return 4.0
+
+
+def build_inputs(entries, profiles, now=None):
+    """Turn glucose.js entries and userProfile dicts into model arrays.
+
+    entries[i] is the latest reading for user i, profiles[i] their profile.
+    now is a naive local datetime (the user's wall clock), or one per user.
+    """
+    count = len(entries)
+    if now is None:
+        now = datetime.now()
+    nows = now if isinstance(now, (list, tuple)) else [now] * count
+
+    current = np.empty(count)
+    dose = np.empty(count)
+    params = np.empty((count, 5))
+    elapsed = np.empty(count)
+    carbs = np.zeros(count)
+    ratio = np.empty(count)
+    activity = np.zeros(count)
+    factors = np.zeros(count)
+    isf = np.empty(count)
+    basal = np.empty(count)
+    hour = np.empty(count)
+
+    for i, (entry, profile, user_now) in enumerate(zip(entries, profiles, nows)):
+        profile = profile or {}
+        current[i] = _float(entry.get('currentGlucose'))
+        dose[i] = _float(entry.get('insulinDose'))
+        params[i] = INSULIN_PARAMS.get(entry.get('insulinType'), INSULIN_PARAMS['rapid'])
+        entry_time = datetime.fromisoformat(f"{entry['date']}T{entry['time']}")
+        elapsed[i] = (user_now - entry_time).total_seconds() / 3600
+        if entry.get('carbsConsumed'):
+            carbs[i] = _float(entry['carbsConsumed'])
+        ratio[i] = carb_ratio(profile)
+        activity[i] = ACTIVITY_REDUCTION.get(entry.get('recentActivity') or 'none', 0)
+        factors[i] = sum(FACTOR_IMPACT[f] for f in set(entry.get('factors') or []) if f in FACTOR_IMPACT)
+        isf[i] = personalized_isf(profile, current[i])
+        basal[i] = basal_rate(profile)
+        hour[i] = user_now.hour
+
+    return {
+        'current': current,
+        'dose': dose,
+        'params': params,
+        'elapsed': elapsed,
+        'carbs': carbs,
+        'carb_ratio': ratio,
+        'activity': activity,
+        'factors': factors,
+        'isf': isf,
+        'basal_rate': basal,
+        'hour': hour,
+    }
+
+
+def insulin_activity(hours, params):
+    """calculateInsulinActivity() over arrays.
+
+    hours has shape (users, horizons); params has shape (users, 5).
+    """
+    onset, peak, duration, peak_effect, shape = (params[:, i:i + 1] for i in range(5))
+    t = hours - onset
+    span = duration - onset
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Long-acting: ramp up over 2h, flat, ramp down over the last 2h
+        flat = np.where(
+            t < 2, (t / 2) * peak_effect,
+            np.where(t > span - 2, ((span - t) / 2) * peak_effect, peak_effect)
+        )
+
+        # Intermediate: linear rise, plateau around the peak, linear fall
+        peak_start = peak - 2
+        peak_end = peak + 3
+        plateau = np.where(
+            t < peak_start, (t / peak_start) * peak_effect,
+            np.where(t <= peak_end, peak_effect, peak_effect * (1 - (t - peak_end) / (span - peak_end)))
+        )
+
+        # Short-acting: gaussian around the peak
+        sigma = span / 6
+        gaussian = peak_effect * np.exp(-((t - (peak - onset)) ** 2) / (2 * sigma ** 2))
+
+        # Rapid-acting: quadratic rise to the peak, then exponential decay
+        peak_time = peak - onset
+        rise = peak_effect * (1 - (1 - t / peak_time) ** 2)
+        decay = peak_effect * np.exp(-(3 / (span - peak_time)) * (t - peak_time))
+        biexponential = np.where(t <= peak_time, rise, decay)
+
+    activity = np.select(
+        [shape == SHAPE_FLAT, shape == SHAPE_PLATEAU, shape == SHAPE_GAUSSIAN],
+        [flat, plateau, gaussian],
+        biexponential
+    )
+    return np.where((hours < onset) | (hours > duration), 0.0, activity)
+
+
+def forecast(inputs, horizons, rounded=True):
+    """Predicted glucose for every user (rows) at every horizon in hours (columns)"""
+    h = np.asarray(horizons, dtype=float)[None, :]
+    col = {key: value[:, None] if value.ndim == 1 else value for key, value in inputs.items()}
+
+    # Insulin: activity at time since the dose, scaled by dose and ISF
+    glucose_drop = col['dose'] * col['isf'] * insulin_activity(col['elapsed'] + h, inputs['params'])
+
+    # Basal drift, counter-regulation below 70 mg/dL and the dawn phenomenon
+    basal = col['basal_rate'] * h
+    projected = col['current'] + basal
+    basal = basal + np.where(projected < 70, (70 - projected) * 0.4, 0.0)
+    target_hour = (col['hour'] + h) % 24
+    basal = basal + np.where((target_hour >= 4) & (target_hour <= 8), 10.0, 0.0)
+
+    # Carbs: gaussian absorption peaking at 45 minutes, finished after 2.5h
+    sigma = CARB_DURATION_HOURS / 4
+    absorption = np.exp(-((h - CARB_PEAK_HOURS) ** 2) / (2 * sigma ** 2))
+    absorption = np.where((h < 0) | (h > CARB_DURATION_HOURS), 0.0, absorption)
+    carb_impact = np.where(col['carbs'] > 0, col['carbs'] * col['carb_ratio'] * absorption, 0.0)
+
+    # Exercise effect decays with a ~2h half-life
+    activity_impact = col['activity'] * np.exp(-0.35 * h)
+
+    predicted = col['current'] - glucose_drop + basal + carb_impact - activity_impact + col['factors']
+    if rounded:
+        # JavaScript Math.round: halves round up
+        predicted = np.floor(predicted + 0.5)
+    return np.maximum(MIN_PREDICTION, predicted)
+
+
+def predict_glucose(entry, profile, hours, now=None):
+    """Single-horizon prediction, the equivalent of predictGlucose() in the browser"""
+    return int(forecast(build_inputs([entry], [profile], now), [hours])[0, 0])
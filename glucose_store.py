@@ -0,0 +1,510 @@
+import json
+import math
+import time
+from datetime import date as date_cls, datetime, timedelta
+
+# numpy is imported inside the functions that need it, so importing the store
+# (and with it the app) stays cheap
+
+from db import SQLiteDB
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS glucose_readings (
+    id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    logged_at TEXT NOT NULL,          -- local 'YYYY-MM-DDTHH:MM' as entered
+    glucose REAL NOT NULL,
+    insulin_dose REAL,
+    insulin_type TEXT,
+    carbs REAL,
+    activity TEXT,
+    factors TEXT,
+    notes TEXT,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (user_id, id)
+);
+CREATE INDEX IF NOT EXISTS idx_glucose_user_time
+    ON glucose_readings (user_id, logged_at DESC, id DESC);
+
+-- Running aggregates, updated on every insert/delete so stats never rescan readings
+CREATE TABLE IF NOT EXISTS glucose_daily (
+    user_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    total REAL NOT NULL,
+    total_sq REAL NOT NULL,
+    min REAL,
+    max REAL,
+    very_low INTEGER NOT NULL,
+    low INTEGER NOT NULL,
+    in_range INTEGER NOT NULL,
+    high INTEGER NOT NULL,
+    very_high INTEGER NOT NULL,
+    PRIMARY KEY (user_id, day)
+);
+CREATE TABLE IF NOT EXISTS glucose_totals (
+    user_id TEXT PRIMARY KEY,
+    n INTEGER NOT NULL,
+    total REAL NOT NULL,
+    total_sq REAL NOT NULL,
+    min REAL,
+    max REAL,
+    very_low INTEGER NOT NULL,
+    low INTEGER NOT NULL,
+    in_range INTEGER NOT NULL,
+    high INTEGER NOT NULL,
+    very_high INTEGER NOT NULL
+);
+"""
+
+# Consensus time-in-range buckets (mg/dL): <54, 54-69, 70-180, 181-250, >250
+RANGE_BUCKETS = ('very_low', 'low', 'in_range', 'high', 'very_high')
+AGGREGATE_COLUMNS = "n, total, total_sq, min, max, " + ", ".join(RANGE_BUCKETS)
+
+# Browser ids look like 'glucose_1718000000000_k3j9x2m1q'; anything much longer isn't one
+MAX_ID_LENGTH = 128
+
+COLUMNS = (
+    "id, logged_at, glucose, insulin_dose, insulin_type, carbs, activity, factors, notes"
+)
+
+
+def _number(value, name):
+    if value in (None, ''):
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f"{name} must be a number")
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f"{name} must be a finite number")
+    return number
+
+
+def _text(value, name, default=None):
+    if value in (None, ''):
+        return default
+    if not isinstance(value, str):
+        raise ValueError(f"{name} must be a string")
+    return value
+
+
+def _format_number(value):
+    """Render numbers the way the browser stored them ('120', not '120.0')"""
+    if value is None:
+        return None
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def entry_to_row(user_id, entry, now=None):
+    """Validate a glucose.html entry dict and turn it into a table row.
+
+    Raises ValueError for anything the stats and forecast code couldn't read
+    back: malformed or future dates, bad times, non-finite numbers.
+    """
+    if not isinstance(entry, dict):
+        raise ValueError("each entry must be an object")
+    entry_id = entry.get('id')
+    if not isinstance(entry_id, str) or not entry_id.strip():
+        raise ValueError("id must be a non-empty string")
+    entry_id = entry_id.strip()
+    if len(entry_id) > MAX_ID_LENGTH:
+        raise ValueError(f"id can't be longer than {MAX_ID_LENGTH} characters")
+    date = str(entry.get('date') or '').strip()
+    time_of_day = str(entry.get('time') or '').strip()[:5]
+    if not date or not time_of_day:
+        raise ValueError("date and time are required")
+    try:
+        day = date_cls.fromisoformat(date)
+        time_of_day = datetime.strptime(time_of_day, '%H:%M').strftime('%H:%M')
+    except ValueError:
+        raise ValueError("date must be YYYY-MM-DD and time HH:MM") from None
+    # Dates are the user's local day, which can be a day ahead of the server's
+    if day > date_cls.today() + timedelta(days=1):
+        raise ValueError("date can't be in the future")
+
+    glucose = _number(entry.get('currentGlucose'), 'currentGlucose')
+    if glucose is None:
+        raise ValueError("currentGlucose is required")
+
+    factors = entry.get('factors') or []
+    if not isinstance(factors, list) or not all(isinstance(factor, str) for factor in factors):
+        raise ValueError("factors must be a list of strings")
+    # The CSV export joins factors with ';'
+    if any(';' in factor for factor in factors):
+        raise ValueError("factors can't contain ';'")
+
+    return (
+        entry_id,
+        user_id,
+        f"{day.isoformat()}T{time_of_day}",
+        glucose,
+        _number(entry.get('insulinDose'), 'insulinDose'),
+        _text(entry.get('insulinType'), 'insulinType'),
+        _number(entry.get('carbsConsumed'), 'carbsConsumed'),
+        _text(entry.get('recentActivity'), 'recentActivity', 'none'),
+        json.dumps(factors),
+        (_text(entry.get('notes'), 'notes', '')).strip(),
+        now if now is not None else time.time(),
+    )
+
+
+def row_to_entry(row):
+    """Turn a table row back into the dict shape glucose.html uses"""
+    entry_id, logged_at, glucose, dose, insulin_type, carbs, activity, factors, notes = row
+    date, _, time_of_day = logged_at.partition('T')
+    return {
+        'id': entry_id,
+        'date': date,
+        'time': time_of_day,
+        'currentGlucose': _format_number(glucose),
+        'insulinDose': _format_number(dose),
+        'insulinType': insulin_type,
+        'carbsConsumed': _format_number(carbs),
+        'recentActivity': activity or 'none',
+        'factors': json.loads(factors) if factors else [],
+        'notes': notes or '',
+    }
+
+
+def bucket_index(values):
+    """Time-in-range bucket (0-4) for each glucose value"""
+    import numpy as np
+
+    values = np.asarray(values, dtype=float)
+    # 70 and 180 themselves count as in range
+    return (
+        (values >= 54).astype(np.int64) + (values >= 70) + (values > 180) + (values > 250)
+    )
+
+
+def aggregate_by_day(days, values):
+    """Per-day n/sum/sum of squares/min/max/bucket counts for a batch of readings"""
+    import numpy as np
+
+    days = np.asarray(days)
+    values = np.asarray(values, dtype=float)
+    unique_days, inverse = np.unique(days, return_inverse=True)
+    size = len(unique_days)
+
+    n = np.bincount(inverse, minlength=size)
+    total = np.bincount(inverse, weights=values, minlength=size)
+    total_sq = np.bincount(inverse, weights=values * values, minlength=size)
+    minimum = np.full(size, np.inf)
+    maximum = np.full(size, -np.inf)
+    np.minimum.at(minimum, inverse, values)
+    np.maximum.at(maximum, inverse, values)
+    buckets = np.zeros((size, len(RANGE_BUCKETS)), dtype=np.int64)
+    np.add.at(buckets, (inverse, bucket_index(values)), 1)
+
+    return [
+        (str(day), int(n[i]), float(total[i]), float(total_sq[i]),
+         float(minimum[i]), float(maximum[i]), *(int(b) for b in buckets[i]))
+        for i, day in enumerate(unique_days)
+    ]
+
+
+def describe(n, total, total_sq, minimum, maximum, buckets):
+    """Mean, SD, CV, GMI, eA1C and time-in-range from running aggregates"""
+    if not n:
+        return None
+    mean = total / n
+    variance = max(total_sq / n - mean * mean, 0.0)
+    std = variance ** 0.5
+    return {
+        'count': int(n),
+        'mean': round(mean, 1),
+        'std': round(std, 1),
+        'cv_percent': round(100 * std / mean, 1) if mean else None,
+        'min': minimum,
+        'max': maximum,
+        # Glucose Management Indicator (Bergenstal 2018) and ADAG estimated A1C
+        'gmi_percent': round(3.31 + 0.02392 * mean, 1),
+        'estimated_a1c_percent': round((mean + 46.7) / 28.7, 1),
+        'time_in_range_percent': {
+            name: round(100 * count / n, 1) for name, count in zip(RANGE_BUCKETS, buckets)
+        },
+    }
+
+
+class GlucoseStore:
+    """Per-user glucose readings in SQLite, indexed by (user, time)"""
+
+    def __init__(self, db_path):
+        self.db = SQLiteDB(db_path, schema=SCHEMA)
+        self._backfill_stats()
+
+    # ---------- Running aggregates ----------
+
+    def _backfill_stats(self):
+        """Build aggregates for readings stored before the stats tables existed"""
+        has_totals = self.db.execute("SELECT 1 FROM glucose_totals LIMIT 1").fetchone()
+        has_readings = self.db.execute("SELECT 1 FROM glucose_readings LIMIT 1").fetchone()
+        if has_readings and not has_totals:
+            users = [row[0] for row in self.db.execute(
+                "SELECT DISTINCT user_id FROM glucose_readings"
+            )]
+            for user_id in users:
+                self.rebuild_stats(user_id)
+
+    def rebuild_stats(self, user_id):
+        """Recompute a user's aggregates from scratch with one vectorized pass"""
+        with self.db.transaction() as conn:
+            rows = conn.execute(
+                "SELECT substr(logged_at, 1, 10), glucose FROM glucose_readings WHERE user_id = ?",
+                (user_id,)
+            ).fetchall()
+            conn.execute("DELETE FROM glucose_daily WHERE user_id = ?", (user_id,))
+            conn.execute("DELETE FROM glucose_totals WHERE user_id = ?", (user_id,))
+            if rows:
+                days, values = zip(*rows)
+                self._apply_daily(conn, user_id, aggregate_by_day(days, values))
+
+    def _apply_daily(self, conn, user_id, daily_rows):
+        """Fold per-day aggregates of newly inserted readings into the running totals"""
+        upsert_updates = (
+            "n = n + excluded.n, total = total + excluded.total, "
+            "total_sq = total_sq + excluded.total_sq, "
+            "min = MIN(min, excluded.min), max = MAX(max, excluded.max), "
+            + ", ".join(f"{b} = {b} + excluded.{b}" for b in RANGE_BUCKETS)
+        )
+        conn.executemany(
+            f"INSERT INTO glucose_daily (user_id, day, {AGGREGATE_COLUMNS}) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            f"ON CONFLICT (user_id, day) DO UPDATE SET {upsert_updates}",
+            [(user_id, *row) for row in daily_rows]
+        )
+
+        n = sum(row[1] for row in daily_rows)
+        if not n:
+            return
+        batch_totals = (
+            n,
+            sum(row[2] for row in daily_rows),
+            sum(row[3] for row in daily_rows),
+            min(row[4] for row in daily_rows),
+            max(row[5] for row in daily_rows),
+            *(sum(row[6 + i] for row in daily_rows) for i in range(len(RANGE_BUCKETS)))
+        )
+        conn.execute(
+            f"INSERT INTO glucose_totals (user_id, {AGGREGATE_COLUMNS}) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            f"ON CONFLICT (user_id) DO UPDATE SET {upsert_updates}",
+            (user_id, *batch_totals)
+        )
+
+    def _remove_reading(self, conn, user_id, day, value):
+        """Take one deleted reading back out of the running totals"""
+        bucket = RANGE_BUCKETS[int(bucket_index([value])[0])]
+        # min/max can't be un-applied, so re-derive them (only on delete, which is rare)
+        conn.execute(
+            f"UPDATE glucose_daily SET n = n - 1, total = total - ?, total_sq = total_sq - ?, "
+            f"{bucket} = {bucket} - 1, "
+            "min = (SELECT MIN(glucose) FROM glucose_readings "
+            "       WHERE user_id = ? AND logged_at >= ? AND logged_at < ?), "
+            "max = (SELECT MAX(glucose) FROM glucose_readings "
+            "       WHERE user_id = ? AND logged_at >= ? AND logged_at < ?) "
+            "WHERE user_id = ? AND day = ?",
+            (value, value * value, user_id, day, day + 'U', user_id, day, day + 'U', user_id, day)
+        )
+        conn.execute("DELETE FROM glucose_daily WHERE user_id = ? AND n <= 0", (user_id,))
+        conn.execute(
+            f"UPDATE glucose_totals SET n = n - 1, total = total - ?, total_sq = total_sq - ?, "
+            f"{bucket} = {bucket} - 1, "
+            "min = (SELECT MIN(min) FROM glucose_daily WHERE user_id = ?), "
+            "max = (SELECT MAX(max) FROM glucose_daily WHERE user_id = ?) "
+            "WHERE user_id = ?",
+            (value, value * value, user_id, user_id, user_id)
+        )
+        conn.execute("DELETE FROM glucose_totals WHERE user_id = ? AND n <= 0", (user_id,))
+
+    # ---------- Readings ----------
+
+    def add_entries(self, user_id, entries):
+        """Insert entries, ignoring ids the user already has. Returns the number inserted."""
+        now = time.time()
+        return self.add_rows(user_id, [entry_to_row(user_id, entry, now) for entry in entries])
+
+    def add_rows(self, user_id, rows):
+        """Insert rows built by entry_to_row, in one transaction, skipping known ids"""
+        by_id = {}
+        for row in rows:
+            by_id.setdefault(row[0], row)
+        rows = by_id
+
+        with self.db.transaction() as conn:
+            # Drop ids that are already stored so the aggregates only see new readings
+            ids = list(rows)
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                existing = conn.execute(
+                    "SELECT id FROM glucose_readings WHERE user_id = ? AND id IN "
+                    f"({', '.join('?' * len(chunk))})",
+                    [user_id, *chunk]
+                )
+                for (entry_id,) in existing:
+                    rows.pop(entry_id, None)
+
+            new_rows = list(rows.values())
+            if not new_rows:
+                return 0
+            conn.executemany(
+                "INSERT INTO glucose_readings (id, user_id, logged_at, glucose, "
+                "insulin_dose, insulin_type, carbs, activity, factors, notes, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                new_rows
+            )
+            self._apply_daily(conn, user_id, aggregate_by_day(
+                [row[2][:10] for row in new_rows],
+                [row[3] for row in new_rows]
+            ))
+            return len(new_rows)
+
+    def iter_entries(self, user_id, batch_size=1000):
+        """Every reading, oldest first, read a page at a time so memory stays flat"""
+        cursor = None
+        while True:
+            entries, cursor = self.list_entries(user_id, limit=batch_size, cursor=cursor, ascending=True)
+            yield from entries
+            if cursor is None:
+                return
+
+    def list_entries(self, user_id, start=None, end=None, limit=50, cursor=None, ascending=False):
+        """Readings in [start, end), newest first, using keyset pagination.
+
+        start/end are 'YYYY-MM-DDTHH:MM' strings. cursor is the value returned
+        as next_cursor by the previous page.
+        """
+        clauses = ["user_id = ?"]
+        params = [user_id]
+        if start:
+            clauses.append("logged_at >= ?")
+            params.append(start)
+        if end:
+            clauses.append("logged_at < ?")
+            params.append(end)
+        if cursor:
+            cursor_time, _, cursor_id = cursor.partition('|')
+            op = ">" if ascending else "<"
+            clauses.append(f"(logged_at, id) {op} (?, ?)")
+            params.extend([cursor_time, cursor_id])
+
+        order = "ASC" if ascending else "DESC"
+        rows = self.db.execute(
+            f"SELECT {COLUMNS} FROM glucose_readings WHERE {' AND '.join(clauses)} "
+            f"ORDER BY logged_at {order}, id {order} LIMIT ?",
+            params + [limit + 1]
+        ).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = f"{last[1]}|{last[0]}"
+        return [row_to_entry(row) for row in rows], next_cursor
+
+    def summary(self, user_id):
+        """Entry count, mean glucose and the latest entry"""
+        totals = self.db.execute(
+            "SELECT n, total FROM glucose_totals WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        count, total = totals if totals else (0, 0)
+        latest, _ = self.list_entries(user_id, limit=1)
+        return {
+            'count': count,
+            'average': total / count if count else None,
+            'latest': latest[0] if latest else None,
+        }
+
+    def stats(self, user_id, days=14, weeks=12, today=None):
+        """Overall, daily, weekly and rolling glucose statistics from the running aggregates"""
+        import numpy as np
+
+        totals = self.db.execute(
+            f"SELECT {AGGREGATE_COLUMNS} FROM glucose_totals WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        if not totals:
+            return {'overall': None, 'daily': [], 'weekly': [], 'rolling': {}}
+
+        today = today or date_cls.today()
+        since = today - timedelta(days=max(days, weeks * 7, 90) - 1)
+        rows = self.db.execute(
+            f"SELECT day, {AGGREGATE_COLUMNS} FROM glucose_daily "
+            "WHERE user_id = ? AND day >= ? AND day <= ? ORDER BY day",
+            (user_id, since.isoformat(), today.isoformat())
+        ).fetchall()
+
+        result = {
+            'overall': describe(totals[0], totals[1], totals[2], totals[3], totals[4], totals[5:]),
+            'daily': [],
+            'weekly': [],
+            'rolling': {},
+        }
+        if not rows:
+            return result
+
+        day_strings = [row[0] for row in rows]
+        agg = np.array([row[1:] for row in rows], dtype=float)
+        n, total, total_sq, minimum, maximum = agg[:, 0], agg[:, 1], agg[:, 2], agg[:, 3], agg[:, 4]
+        buckets = agg[:, 5:]
+        day_offsets = np.array(
+            [(today - date_cls.fromisoformat(d)).days for d in day_strings]
+        )
+
+        def window(mask):
+            if not mask.any():
+                return None
+            return describe(
+                n[mask].sum(), total[mask].sum(), total_sq[mask].sum(),
+                float(minimum[mask].min()), float(maximum[mask].max()), buckets[mask].sum(axis=0)
+            )
+
+        recent = day_offsets < days
+        means = np.divide(total, n, out=np.zeros_like(total), where=n > 0)
+        in_range = np.divide(buckets[:, 2], n, out=np.zeros_like(total), where=n > 0)
+        result['daily'] = [
+            {
+                'day': day_strings[i],
+                'count': int(n[i]),
+                'mean': round(float(means[i]), 1),
+                'min': float(minimum[i]),
+                'max': float(maximum[i]),
+                'time_in_range_percent': round(100 * float(in_range[i]), 1),
+            }
+            for i in np.flatnonzero(recent)
+        ]
+
+        # Weeks counted back from today (week 0 = the last 7 days)
+        week_index = day_offsets // 7
+        for week in range(weeks - 1, -1, -1):
+            stats = window(week_index == week)
+            if stats:
+                start = today - timedelta(days=week * 7 + 6)
+                result['weekly'].append({'week_start': start.isoformat(), **stats})
+
+        for span in (7, 14, 30, 90):
+            stats = window(day_offsets < span)
+            if stats:
+                result['rolling'][f'{span}d'] = stats
+        return result
+
+    def delete_entry(self, user_id, entry_id):
+        with self.db.transaction() as conn:
+            row = conn.execute(
+                "SELECT logged_at, glucose FROM glucose_readings WHERE user_id = ? AND id = ?",
+                (user_id, entry_id)
+            ).fetchone()
+            if row is None:
+                return False
+            conn.execute(
+                "DELETE FROM glucose_readings WHERE user_id = ? AND id = ?",
+                (user_id, entry_id)
+            )
+            self._remove_reading(conn, user_id, row[0][:10], row[1])
+            return True
+
+    def clear(self, user_id):
+        with self.db.transaction() as conn:
+            cur = conn.execute("DELETE FROM glucose_readings WHERE user_id = ?", (user_id,))
+            conn.execute("DELETE FROM glucose_daily WHERE user_id = ?", (user_id,))
+            conn.execute("DELETE FROM glucose_totals WHERE user_id = ?", (user_id,))
+            return cur.rowcount
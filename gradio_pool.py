@@ -0,0 +1,215 @@
+import logging
+import os
+import random
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+
+class GradioUnavailable(Exception):
+    """No healthy Gradio client right now (still connecting, or the circuit is open)"""
+
+
+def is_connection_error(error):
+    """Whether a failed call points at the connection or the Space, not the input.
+
+    Transport errors, timeouts and 5xx responses count; errors the Space's app
+    raised (an undecodable image, a validation error) do not.
+    """
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    try:
+        import httpx
+    except ImportError:
+        return False
+    if isinstance(error, httpx.TransportError):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return False
+
+
+class GradioPool:
+    """A few warm Gradio clients behind a circuit breaker.
+
+    Clients are built by a background thread (start() kicks it off at worker
+    start), never on the request path. A client whose call fails is dropped
+    and rebuilt in the background; the set of clients is an immutable tuple
+    that is swapped whole, so callers never see a half-built client.
+
+    Only failures that is_failure() blames on the connection (by default
+    is_connection_error) count towards the breaker and cost the client;
+    other errors go straight back to the caller.
+
+    After failure_threshold consecutive failed calls the circuit opens and
+    calls fail fast for an exponentially growing backoff; then one trial call
+    is let through (half-open) to decide whether to close it again. Failed
+    client builds back off the same way.
+    """
+
+    def __init__(self, factory, size=2, failure_threshold=3, backoff_base=1.0, backoff_max=60.0,
+                 acquire_timeout=10.0, is_failure=is_connection_error):
+        self.factory = factory
+        self.is_failure = is_failure
+        self.size = max(size, 1)
+        self.failure_threshold = failure_threshold
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.acquire_timeout = acquire_timeout
+        self._reset()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        # Also runs in a forked child: threads and sockets don't survive the fork
+        self._cond = threading.Condition()
+        self._clients = ()
+        self._next = 0
+        self._maintainer = None
+        self._build_failures = 0
+        self._state = 'closed'
+        self._failures = 0
+        self._opens = 0
+        self._open_until = 0.0
+        self._trial_in_flight = False
+        self._last_error = None
+        self._last_success = None
+        self._stats = {'calls': 0, 'failures': 0, 'rejected': 0, 'clients_built': 0, 'reconnects': 0}
+
+    def _backoff(self, attempt):
+        delay = min(self.backoff_base * (2 ** max(attempt - 1, 0)), self.backoff_max)
+        return delay * random.uniform(0.8, 1.2)
+
+    # ---------- background client builder ----------
+
+    def start(self):
+        """Start building clients in the background (idempotent)"""
+        with self._cond:
+            if self._maintainer is None or not self._maintainer.is_alive():
+                self._maintainer = threading.Thread(target=self._maintain, name="gradio-pool", daemon=True)
+                self._maintainer.start()
+
+    def _maintain(self):
+        while True:
+            with self._cond:
+                while len(self._clients) >= self.size:
+                    self._cond.wait()
+                delay = self._backoff(self._build_failures) if self._build_failures else 0
+            if delay:
+                time.sleep(delay)
+
+            try:
+                client = self.factory()
+            except Exception as e:
+                with self._cond:
+                    self._build_failures += 1
+                    self._last_error = f"{type(e).__name__}: {e}"
+                    # Wake callers waiting for the first client so they fail fast
+                    self._cond.notify_all()
+                log.warning("Gradio client build failed (attempt %d): %s", self._build_failures, e)
+                continue
+
+            with self._cond:
+                self._clients = self._clients + (client,)
+                self._build_failures = 0
+                self._stats['clients_built'] += 1
+                self._cond.notify_all()
+
+    def _discard(self, client):
+        """Drop a client after a failed call; the builder replaces it"""
+        with self._cond:
+            if client in self._clients:
+                self._clients = tuple(c for c in self._clients if c is not client)
+                self._stats['reconnects'] += 1
+                self._cond.notify_all()
+
+    # ---------- calls ----------
+
+    def _acquire(self):
+        self.start()
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._cond:
+            while not self._clients:
+                # Only wait while a build is still worth waiting for
+                remaining = deadline - time.monotonic()
+                if self._build_failures or remaining <= 0:
+                    raise GradioUnavailable(f"Gradio Space not connected ({self._last_error or 'still connecting'})")
+                self._cond.wait(remaining)
+            clients = self._clients
+            self._next += 1
+            return clients[self._next % len(clients)]
+
+    def _before_call(self):
+        with self._cond:
+            self._stats['calls'] += 1
+            if self._state == 'open':
+                if time.monotonic() < self._open_until:
+                    self._stats['rejected'] += 1
+                    raise GradioUnavailable(
+                        f"Gradio circuit open for another {self._open_until - time.monotonic():.1f}s"
+                    )
+                self._state = 'half_open'
+            if self._state == 'half_open':
+                if self._trial_in_flight:
+                    self._stats['rejected'] += 1
+                    raise GradioUnavailable("Gradio circuit half-open, trial call in flight")
+                self._trial_in_flight = True
+
+    def _on_success(self):
+        with self._cond:
+            self._state = 'closed'
+            self._failures = 0
+            self._opens = 0
+            self._trial_in_flight = False
+            self._last_success = time.time()
+
+    def _on_failure(self, error):
+        with self._cond:
+            self._stats['failures'] += 1
+            self._failures += 1
+            self._last_error = f"{type(error).__name__}: {error}"
+            if self._state == 'half_open' or self._failures >= self.failure_threshold:
+                self._opens += 1
+                self._state = 'open'
+                self._open_until = time.monotonic() + self._backoff(self._opens)
+            self._trial_in_flight = False
+
+    def predict(self, *args, **kwargs):
+        """client.predict() on a pooled client, guarded by the circuit breaker"""
+        self._before_call()
+        try:
+            client = self._acquire()
+        except GradioUnavailable:
+            with self._cond:
+                self._trial_in_flight = False
+            raise
+        try:
+            result = client.predict(*args, **kwargs)
+        except Exception as e:
+            if self.is_failure(e):
+                self._on_failure(e)
+                self._discard(client)
+            else:
+                # The Space answered, so the client and the connection are fine
+                self._on_success()
+            raise
+        self._on_success()
+        return result
+
+    def health(self):
+        """Snapshot for /test-gradio"""
+        with self._cond:
+            now = time.monotonic()
+            return dict(
+                self._stats,
+                pid=os.getpid(),
+                state=self._state,
+                ready=len(self._clients),
+                size=self.size,
+                consecutive_failures=self._failures,
+                build_failures=self._build_failures,
+                retry_in=round(max(self._open_until - now, 0), 1) if self._state == 'open' else 0,
+                last_error=self._last_error,
+                last_success_age=round(time.time() - self._last_success, 1) if self._last_success else None,
+            )
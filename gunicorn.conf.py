@@ -0,0 +1,58 @@
+"""Gunicorn settings, picked up automatically from the working directory.
+
+Almost every request spends its time waiting on Gradio, CalorieNinja or Gemini,
+so workers are threaded by default: each process serves GUNICORN_THREADS
+requests at once instead of one. For many mostly-idle connections (e.g. long
+chatbot streams) use gevent instead:
+
+    pip install gevent
+    GUNICORN_WORKER_CLASS=gevent gunicorn main:app
+"""
+import multiprocessing
+import os
+import tempfile
+
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+
+# gthread: requests in flight per worker (sync ignores this; gunicorn would
+# silently switch sync to gthread if it were > 1)
+threads = int(os.environ.get("GUNICORN_THREADS", 32)) if worker_class == "gthread" else 1
+
+# gevent: open connections per worker
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 1000))
+
+# Photo uploads can wait a minute on the Space before the stage deadline fires
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+graceful_timeout = 30
+keepalive = 5
+
+if worker_class == "gevent":
+    # The Gemini SDK's default gRPC transport doesn't yield to the gevent hub;
+    # its REST transport goes through requests, which gevent patches
+    os.environ.setdefault("GEMINI_TRANSPORT", "rest")
+
+# Each worker keeps its own metrics; with several, they share snapshots through
+# a directory so /metrics reports totals for the whole server
+if workers > 1 and not os.environ.get("METRICS_DIR"):
+    os.environ["METRICS_DIR"] = tempfile.mkdtemp(prefix="glycogenie-metrics-")
+
+
+def on_starting(server):
+    # Build the static bundles once in the master, so workers only read the manifest
+    from assets import AssetPipeline
+    AssetPipeline(output_dir=os.environ.get("ASSETS_DIR")).load()
+
+
+def post_worker_init(worker):
+    # Import the SDKs and connect to the upstreams in the background, per worker
+    # (after the fork, so nothing is shared with the master or other workers)
+    import main
+    main.start_warm_up()
+    main.start_reminder_scheduler()
+
+
+def child_exit(server, worker):
+    # Its metrics snapshot would otherwise keep being summed into /metrics
+    from metrics import REGISTRY
+    REGISTRY.remove_process(worker.pid)
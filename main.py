@@ -1,12 +1,33 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from flask import Flask, Blueprint, render_template, request, redirect, url_for, flash, jsonify, Response, stream_with_context, session, g, abort, send_from_directory
 import os
+import io
 import json
-import requests
-import google.generativeai as genai
-from PIL import Image
-from gradio_client import Client, handle_file
+import hashlib
+import logging
+import math
+import mimetypes
+import secrets
+import time
+import click
 import tempfile
+import threading
+import uuid
+import zipfile
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 from werkzeug.utils import secure_filename
+from cache import TTLCache
+from glucose_store import GlucoseStore, entry_to_row
+from chat_sessions import ChatSessionStore, extractive_summary
+from reminders import ReminderStore, ReminderScheduler, LogSink, WebhookSink
+from data_transfer import export_ndjson, export_csv, encode_chunks, import_records
+from clients import get_model, get_http_session, client_stats
+from metrics import REGISTRY, CACHE_REQUESTS, HTTP_REQUEST_SECONDS, UPSTREAM_ERRORS, span
+from relevance import classify_relevance
+from gradio_pool import GradioPool, GradioUnavailable
+from food_search import FoodIndex
+from admission import SingleFlight, UpstreamSaturated, limiter_from_env
+from assets import AssetPipeline, ENCODINGS
 
 # Common food items that work well with Calorie Ninja API
 CALORIE_NINJA_FOODS = [
@@ -32,31 +53,223 @@ CALORIE_NINJA_FOODS = [
     "smoothie", "protein shake", "energy bar", "granola", "cereal"
 ]
 
-app = Flask(__name__)
-app.secret_key = "password" 
+# Routes live on a blueprint so create_app() can build the app; heavy SDKs
+# (Gemini, Gradio, Pillow, NumPy) are imported on first use, not here
+bp = Blueprint('main', __name__, cli_group=None)
+
+# Per-request detail (prompts, raw model output, cache hits) is logged at DEBUG
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s %(levelname)s [%(process)d] %(message)s")
+log = logging.getLogger("glycogenie")
+
+@bp.before_app_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@bp.after_app_request
+def record_request_time(response):
+    # Streamed responses (SSE, NDJSON) are timed to the first byte
+    started = g.pop('request_started', None)
+    if started is not None:
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            endpoint=request.url_rule.rule if request.url_rule else 'unmatched',
+            method=request.method,
+            status=response.status_code
+        )
+    return response
 
 # Set up API keys
 GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY")
 CALORIENINJA_API_KEY = os.environ.get("CALORIENINJA_API_KEY")
 
-# Configure Gemini
-genai.configure(api_key=GOOGLE_API_KEY)
+# Upstream locations (overridable to point at staging or the benchmark stubs)
+CALORIENINJA_URL = os.environ.get("CALORIENINJA_URL", "https://api.calorieninjas.com/v1/nutrition")
+GRADIO_SPACE = os.environ.get("GRADIO_SPACE", "calcuplate/ingredientClassificationModel")
+# (Gemini is configured from GOOGLE_API_KEY / GEMINI_API_ENDPOINT in clients.py)
+
+# Shared on-disk cache (one SQLite file for every gunicorn worker)
+DATA_DIR = os.environ.get("DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "instance"))
+CACHE_DB_PATH = os.environ.get("CACHE_DB_PATH", os.path.join(DATA_DIR, "cache.sqlite3"))
+
+# Nutrition facts rarely change, so keep them for a week
+NUTRITION_CACHE = TTLCache(
+    "nutrition",
+    ttl_seconds=int(os.environ.get("NUTRITION_CACHE_TTL", 7 * 24 * 3600)),
+    max_entries=int(os.environ.get("NUTRITION_CACHE_SIZE", 2048)),
+    db_path=CACHE_DB_PATH
+)
+
+# Per-user glucose log
+GLUCOSE_STORE = GlucoseStore(
+    os.environ.get("GLUCOSE_DB_PATH", os.path.join(DATA_DIR, "glucose.sqlite3"))
+)
+
+# Reminders, delivered server-side by whichever worker holds the scheduler lease
+REMINDER_STORE = ReminderStore(
+    os.environ.get("REMINDER_DB_PATH", os.path.join(DATA_DIR, "reminders.sqlite3"))
+)
+REMINDER_WEBHOOK_URL = os.environ.get("REMINDER_WEBHOOK_URL")
+REMINDER_SCHEDULER = ReminderScheduler(
+    REMINDER_STORE,
+    WebhookSink(REMINDER_WEBHOOK_URL, get_http_session) if REMINDER_WEBHOOK_URL else LogSink(),
+    grace_seconds=int(os.environ.get("REMINDER_GRACE_SECONDS", 3600))
+)
+
+# Gemini food advice keyed by food, nutrition and sorted nutritional needs
+ADVICE_CACHE = TTLCache(
+    "advice",
+    ttl_seconds=int(os.environ.get("ADVICE_CACHE_TTL", 7 * 24 * 3600)),
+    max_entries=int(os.environ.get("ADVICE_CACHE_SIZE", 10000)),
+    db_path=CACHE_DB_PATH
+)
+
+# Chatbot conversations live server-side; the browser only sends its session id
+# and the new message. Verbatim turns past CHAT_HISTORY_TOKENS are folded into
+# a rolling summary of at most CHAT_SUMMARY_TOKENS.
+CHAT_SESSIONS = ChatSessionStore(
+    os.environ.get("CHAT_DB_PATH", os.path.join(DATA_DIR, "chat.sqlite3")),
+    ttl_seconds=int(os.environ.get("CHAT_SESSION_TTL", 24 * 3600)),
+    max_sessions=int(os.environ.get("CHAT_SESSION_MAX", 10000)),
+    history_tokens=int(os.environ.get("CHAT_HISTORY_TOKENS", 1000)),
+    summary_tokens=int(os.environ.get("CHAT_SUMMARY_TOKENS", 300)),
+    summarizer=extractive_summary
+)
+
+# Uploaded photos are shrunk to this before inference
+IMAGE_MAX_DIMENSION = int(os.environ.get("IMAGE_MAX_DIMENSION", 512))
+IMAGE_FORMAT = os.environ.get("IMAGE_FORMAT", "JPEG").upper()
+IMAGE_QUALITY = int(os.environ.get("IMAGE_QUALITY", 85))
+
+# Predictions keyed by image hash, so re-uploads and retries skip the Gradio Space
+PREDICTION_CACHE = TTLCache(
+    "predictions",
+    ttl_seconds=int(os.environ.get("PREDICTION_CACHE_TTL", 30 * 24 * 3600)),
+    max_entries=int(os.environ.get("PREDICTION_CACHE_SIZE", 5000)),
+    db_path=CACHE_DB_PATH
+)
+PREDICTION_CACHE_PERCEPTUAL = os.environ.get("PREDICTION_CACHE_PERCEPTUAL", "").lower() in ("1", "true", "yes")
+
+# Precomputed nutrition for CALORIE_NINJA_FOODS. Opt-in: not checked in, built per
+# deployment by `flask --app main warm-nutrition`; without it lookups use the API
+NUTRITION_TABLE_PATH = os.environ.get(
+    "NUTRITION_TABLE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "nutrition_table.json")
+)
+NUTRITION_FIELDS = [
+    'calories', 'protein_g', 'carbohydrates_total_g', 'fat_total_g',
+    'fiber_g', 'sugar_g', 'sodium_mg', 'serving_size_g'
+]
+
+def load_nutrition_table(path=NUTRITION_TABLE_PATH):
+    """Load the offline nutrition table into a {food: nutrition_dict} map"""
+    if not os.path.exists(path):
+        log.info("No offline nutrition table at %s; nutrition comes from CalorieNinja", path)
+        return {}
+    try:
+        with open(path) as f:
+            table = json.load(f)
+        fields = table.get('fields', NUTRITION_FIELDS)
+        return {
+            food: dict(zip(fields, values))
+            for food, values in table.get('foods', {}).items()
+        }
+    except Exception as e:
+        log.warning("Error loading nutrition table %s: %s", path, e)
+        return {}
+
+NUTRITION_TABLE = load_nutrition_table()
+
+# Worker threads for the /upload fan-out (created lazily, so safe with --preload)
+PIPELINE_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("PIPELINE_WORKERS", 16)),
+    thread_name_prefix="pipeline"
+)
+PREDICT_STAGE_TIMEOUT = float(os.environ.get("PREDICT_STAGE_TIMEOUT", 60))
+NUTRITION_STAGE_TIMEOUT = float(os.environ.get("NUTRITION_STAGE_TIMEOUT", 7))
+GEMINI_STAGE_TIMEOUT = float(os.environ.get("GEMINI_STAGE_TIMEOUT", 20))
+
+# Admission control per upstream: in-flight cap, token bucket (calls/s) and a
+# bounded wait queue, tuned with <NAME>_MAX_CONCURRENCY, _RATE, _BURST,
+# _MAX_QUEUE and _QUEUE_TIMEOUT. Over the limit, callers get a quick 503 or a
+# degraded response instead of piling up behind a slow upstream.
+LIMITERS = {
+    'gradio': limiter_from_env('gradio', max_concurrency=8, rate=0),
+    'calorieninja': limiter_from_env('calorieninja', max_concurrency=16, rate=40),
+    'gemini': limiter_from_env('gemini', max_concurrency=16, rate=25),
+}
+RETRY_AFTER_SECONDS = 2
 
-# Initialize Gradio client
-GRADIO_CLIENT = None
+# Identical concurrent upstream calls (same photo, food or advice prompt) share one request
+PREDICTION_FLIGHTS = SingleFlight('gradio')
+NUTRITION_FLIGHTS = SingleFlight('calorieninja')
+ADVICE_FLIGHTS = SingleFlight('gemini')
 
-def get_gradio_client():
-    """Lazy initialization of Gradio client"""
-    global GRADIO_CLIENT
-    if GRADIO_CLIENT is None:
+# Bulk meal-photo uploads: photos analyzed at once per request, and upload limits
+BATCH_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("BATCH_WORKERS", 4)),
+    thread_name_prefix="batch"
+)
+BATCH_MAX_IMAGES = int(os.environ.get("BATCH_MAX_IMAGES", 50))
+BATCH_MAX_IMAGE_BYTES = int(os.environ.get("BATCH_MAX_IMAGE_BYTES", 20 * 1024 * 1024))
+BATCH_IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp', '.heic', '.heif'}
+
+# Ingredient classifier backend: "gradio" (remote Space) or "local" (ONNX Runtime,
+# falls back to the Space on error)
+CLASSIFIER_BACKEND = os.environ.get("CLASSIFIER_BACKEND", "gradio").lower()
+LOCAL_MODEL_PATH = os.environ.get("LOCAL_MODEL_PATH", "models/ingredients.onnx")
+LOCAL_MODEL_LABELS = os.environ.get("LOCAL_MODEL_LABELS", "models/labels.json")
+LOCAL_CLASSIFIER = None
+LOCAL_CLASSIFIER_LOCK = threading.Lock()
+
+def create_gradio_client():
+    """Connect a new Gradio client to the Space (runs on the pool's builder thread)"""
+    from gradio_client import Client
+
+    log.info("Initializing Gradio client for %s...", GRADIO_SPACE)
+    client = Client(GRADIO_SPACE, verbose=False)
+    log.info("✓ Gradio client initialized successfully")
+    return client
+
+# Warm Gradio clients behind a circuit breaker; built in the background at worker start
+GRADIO_POOL = GradioPool(
+    create_gradio_client,
+    size=int(os.environ.get("GRADIO_POOL_SIZE", 2)),
+    failure_threshold=int(os.environ.get("GRADIO_FAILURE_THRESHOLD", 3)),
+    backoff_base=float(os.environ.get("GRADIO_BACKOFF_BASE", 1)),
+    backoff_max=float(os.environ.get("GRADIO_BACKOFF_MAX", 60)),
+    acquire_timeout=float(os.environ.get("GRADIO_ACQUIRE_TIMEOUT", 10))
+)
+
+def warm_up():
+    """Import the SDKs and open upstream clients before the first request needs them"""
+    started = time.perf_counter()
+    steps = [
+        ('gemini', lambda: get_model("gemini-2.5-flash")),
+        ('http', get_http_session),
+        ('pillow', lambda: __import__('PIL.ImageOps')),
+        ('numpy', lambda: __import__('glucose_predict')),
+    ]
+    if CLASSIFIER_BACKEND == "gradio":
+        steps.append(('gradio', GRADIO_POOL.start))
+    for name, step in steps:
         try:
-            print("Initializing Gradio client for fredsok/ingredientsmodel...")
-            GRADIO_CLIENT = Client("calcuplate/ingredientClassificationModel")
-            print("✓ Gradio client initialized successfully")
+            step()
         except Exception as e:
-            print(f"Error initializing Gradio client: {e}")
-            raise
-    return GRADIO_CLIENT
+            log.warning("Warm-up step %s failed: %s", name, e)
+    log.info("Warm-up finished in %.2fs", time.perf_counter() - started)
+
+def start_reminder_scheduler():
+    """Start this worker's reminder scheduler; only the lease holder delivers"""
+    if os.environ.get("REMINDER_SCHEDULER", "1").lower() in ("0", "false", "no"):
+        return
+    REMINDER_SCHEDULER.start()
+
+def start_warm_up():
+    """Run warm_up() in the background (called per worker, after the fork)"""
+    if os.environ.get("WARM_UP", "1").lower() in ("0", "false", "no"):
+        return
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
 
 # ============== HELPER FUNCTIONS ==============
 
@@ -67,122 +280,553 @@ def clean_ingredient_name(name):
     name = name.replace('_', ' ')
     return name.title()
 
+def normalize_food_key(name):
+    """Normalize a food name so Gradio labels and user input share cache keys"""
+    return " ".join(clean_ingredient_name(name.strip()).lower().split())
+
+def fetch_nutrition_calorieninja(food_name):
+    """Fetch nutrition for a food from the CalorieNinja API (no caching)"""
+    with LIMITERS['calorieninja'], span('calorieninja', upstream='calorieninja'):
+        resp = get_http_session().get(
+            CALORIENINJA_URL,
+            params={'query': food_name},
+            headers={'X-Api-Key': CALORIENINJA_API_KEY},
+            timeout=6
+        )
+    if resp.status_code != 200:
+        UPSTREAM_ERRORS.inc(upstream='calorieninja')
+        return None
+    items = resp.json().get('items', [])
+    if not items:
+        return None
+    item = items[0]
+    return {
+        'calories': item.get('calories', 0),
+        'protein_g': item.get('protein_g', 0),
+        'carbohydrates_total_g': item.get('carbohydrates_total_g', 0),
+        'fat_total_g': item.get('fat_total_g', 0),
+        'fiber_g': item.get('fiber_g', 0),
+        'sugar_g': item.get('sugar_g', 0),
+        'sodium_mg': item.get('sodium_mg', 0),
+        'serving_size_g': item.get('serving_size_g', 100)
+    }
+
+def get_nutrition(food_name):
+    """Get nutrition for a food: offline table, then shared cache, then CalorieNinja"""
+    key = normalize_food_key(food_name)
+    if not key:
+        return None
+
+    nutrition_data = NUTRITION_TABLE.get(key)
+    CACHE_REQUESTS.inc(cache='nutrition_table', result='miss' if nutrition_data is None else 'hit')
+    if nutrition_data is not None:
+        return dict(nutrition_data)
+
+    nutrition_data = NUTRITION_CACHE.get(key)
+    if nutrition_data is not None:
+        return nutrition_data
+
+    if not CALORIENINJA_API_KEY:
+        return None
+
+    def fetch_and_cache():
+        nutrition_data = fetch_nutrition_calorieninja(key)
+        if nutrition_data:
+            NUTRITION_CACHE.set(key, nutrition_data)
+        return nutrition_data
+
+    try:
+        return NUTRITION_FLIGHTS.do(key, fetch_and_cache)
+    except UpstreamSaturated:
+        raise
+    except Exception as e:
+        log.warning("CalorieNinja error: %s", e)
+        return None
+
+def build_advice_prompt(food_name, nutrition_data, nutritional_needs):
+    """Build the Gemini nutrition-advice prompt for a food"""
+    if not nutrition_data:
+        return (
+            f"You are a nutrition expert. The food identified is {food_name}. "
+            f"In 2-3 sentences, provide practical health advice about this food. "
+            f"Is this generally a good nutritional choice? What are the key benefits or concerns? "
+            f"Keep it conversational and supportive."
+        )
+
+    calories = nutrition_data['calories']
+    protein = nutrition_data['protein_g']
+    carbs = nutrition_data['carbohydrates_total_g']
+    fat = nutrition_data['fat_total_g']
+    fiber = nutrition_data['fiber_g']
+    sugar = nutrition_data['sugar_g']
+    sodium = nutrition_data['sodium_mg']
+
+    if nutritional_needs:
+        needs_str = ", ".join(sorted(nutritional_needs))
+        return (
+            f"You are a nutrition expert. The food identified is {food_name}. "
+            f"Nutritional information: {calories} calories, {protein}g protein, "
+            f"{carbs}g carbohydrates, {fat}g fat, {fiber}g fiber, {sugar}g sugar, {sodium}mg sodium. "
+            f"The person has the following nutritional needs/preferences: {needs_str}. "
+            f"In 2-3 sentences, provide practical, actionable advice about whether this food is a good choice for their needs. "
+            f"Be specific about how the nutritional content aligns (or doesn't align) with their requirements. "
+            f"Keep it conversational and supportive."
+        )
+
+    return (
+        f"You are a nutrition expert. The food identified is {food_name}. "
+        f"Nutritional information: {calories} calories, {protein}g protein, "
+        f"{carbs}g carbohydrates, {fat}g fat, {fiber}g fiber, {sugar}g sugar, {sodium}mg sodium. "
+        f"In 2-3 sentences, provide practical, actionable health advice about this food. "
+        f"Is this generally a good nutritional choice? What are the key benefits or concerns? "
+        f"Keep it conversational and supportive."
+    )
+
+def generate_food_advice(food_name, nutrition_data, nutritional_needs):
+    """Ask Gemini for short advice about a food"""
+    prompt = build_advice_prompt(food_name, nutrition_data, nutritional_needs)
+    log.debug("Prompt (first 100 chars): %s...", prompt[:100])
+
+    model = get_model(
+        "gemini-2.5-flash",
+        generation_config={
+            "response_mime_type": "text/plain"
+        }
+    )
+
+    with LIMITERS['gemini'], span('gemini_advice', upstream='gemini'):
+        gemini_response = model.generate_content(prompt)
+        gemini_advice = gemini_response.text.strip()
+    log.debug("Gemini advice received (%d characters): %s...", len(gemini_advice), gemini_advice[:100])
+    return gemini_advice
+
+def normalize_advice_inputs(food_name, nutritional_needs):
+    """(food, needs) as both the advice prompt and its cache key see them"""
+    needs = sorted(set(str(need).strip().lower() for need in nutritional_needs or []))
+    return normalize_food_key(food_name), [need for need in needs if need]
+
+def advice_fingerprint(food_name, nutrition_data, nutritional_needs):
+    """Stable cache key for everything the advice prompt depends on"""
+    food_name, nutritional_needs = normalize_advice_inputs(food_name, nutritional_needs)
+    fingerprint = json.dumps({
+        'food': food_name,
+        'nutrition': nutrition_data or None,
+        'needs': nutritional_needs
+    }, sort_keys=True)
+    return hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()
+
+def get_food_advice(food_name, nutrition_data, nutritional_needs, fresh=False):
+    """Gemini advice for a food, served from the advice cache unless fresh=True"""
+    # The prompt is built from the same normalized values as the key, so
+    # requests that share a cache entry would have sent the same prompt
+    food_name, nutritional_needs = normalize_advice_inputs(food_name, nutritional_needs)
+    key = advice_fingerprint(food_name, nutrition_data, nutritional_needs)
+    if not fresh:
+        cached = ADVICE_CACHE.get(key)
+        if cached:
+            log.debug("Advice cache hit for %s", food_name)
+            return cached
+
+    def generate_and_cache():
+        gemini_advice = generate_food_advice(food_name, nutrition_data, nutritional_needs)
+        if gemini_advice:
+            ADVICE_CACHE.set(key, gemini_advice)
+        return gemini_advice
+
+    if fresh:
+        return generate_and_cache()
+    return ADVICE_FLIGHTS.do(key, generate_and_cache)
+
+def busy_response(payload):
+    """503 telling the client to retry shortly (upstream saturated or unavailable)"""
+    return jsonify(payload), 503, {'Retry-After': str(RETRY_AFTER_SECONDS)}
+
+def wait_for_stage(future, timeout, stage):
+    """Wait for a pipeline stage, returning None if it fails or misses its deadline.
+
+    The future is left running: FoodLookups and ADVICE_FLIGHTS share it with
+    other photos and requests, and a late result still fills the caches.
+    """
+    try:
+        return future.result(timeout=max(timeout, 0))
+    except FuturesTimeoutError:
+        log.warning("%s stage timed out after %.1fs", stage, timeout)
+    except UpstreamSaturated as e:
+        log.warning("%s stage skipped: %s", stage, e)
+    except Exception as e:
+        log.exception("%s stage error: %s: %s", stage, type(e).__name__, e)
+    return None
+
+def prepare_image(image_bytes):
+    """EXIF-orient, downscale and re-encode an uploaded image for inference.
+
+    Returns (encoded_bytes, file_extension). Metadata is dropped because it is
+    never passed to the encoder.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        # Let the JPEG decoder skip detail we're about to throw away
+        img.draft('RGB', (IMAGE_MAX_DIMENSION, IMAGE_MAX_DIMENSION))
+        img = ImageOps.exif_transpose(img)
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        img.thumbnail((IMAGE_MAX_DIMENSION, IMAGE_MAX_DIMENSION), Image.LANCZOS)
+
+        output = io.BytesIO()
+        if IMAGE_FORMAT == 'WEBP':
+            img.save(output, format='WEBP', quality=IMAGE_QUALITY, method=4)
+            return output.getvalue(), '.webp'
+        img.save(output, format='JPEG', quality=IMAGE_QUALITY, optimize=True)
+        return output.getvalue(), '.jpg'
+
+def image_cache_keys(file_path):
+    """Content-addressed cache keys for an image: exact bytes, plus an optional perceptual hash"""
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            sha.update(chunk)
+    keys = [f"sha256:{sha.hexdigest()}"]
+
+    if PREDICTION_CACHE_PERCEPTUAL:
+        try:
+            from PIL import Image, ImageOps
+
+            # dHash: compare neighbouring pixels of a 9x8 grayscale thumbnail
+            with Image.open(file_path) as img:
+                img = ImageOps.exif_transpose(img)
+                pixels = list(img.convert('L').resize((9, 8), Image.LANCZOS).getdata())
+            bits = 0
+            for row in range(8):
+                for col in range(8):
+                    bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+            keys.append(f"dhash:{bits:016x}")
+        except Exception as e:
+            log.warning("Could not compute perceptual hash: %s", e)
+
+    return keys
+
+def classifier_identity(backend):
+    """Short tag for the model behind a backend, so cached predictions don't outlive a model swap"""
+    if backend == "local":
+        # A retrained model is usually dropped in at the same path
+        parts = ["local"]
+        for path in (LOCAL_MODEL_PATH, LOCAL_MODEL_LABELS):
+            try:
+                stat = os.stat(path)
+                parts.append(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}")
+            except OSError:
+                parts.append(os.path.abspath(path))
+        identity = "|".join(parts)
+    else:
+        identity = f"gradio|{GRADIO_SPACE}"
+    return hashlib.sha256(identity.encode('utf-8')).hexdigest()[:16]
+
+def normalize_predictions(result):
+    """Turn a raw classifier result into [{'name', 'value', 'raw_name'}, ...]"""
+    predictions = []
+    
+    # The result format depends on the model output
+    # Common formats: dict with 'label' and 'confidences', or list of tuples
+    if isinstance(result, dict):
+        # Format: {'label': 'apple', 'confidences': [{'label': 'apple', 'confidence': 0.95}, ...]}
+        if 'confidences' in result:
+            for item in result['confidences'][:5]:  # Top 5
+                clean_name = clean_ingredient_name(item.get('label', ''))
+                predictions.append({
+                    'name': clean_name,
+                    'value': item.get('confidence', 0),
+                    'raw_name': item.get('label', '')
+                })
+        elif 'label' in result:
+            # Single prediction format
+            clean_name = clean_ingredient_name(result['label'])
+            predictions.append({
+                'name': clean_name,
+                'value': result.get('confidence', 0.9),  # Default confidence if not provided
+                'raw_name': result['label']
+            })
+    elif isinstance(result, list):
+        # Format: [('apple', 0.95), ('banana', 0.03), ...]
+        for item in result[:5]:  # Top 5
+            if isinstance(item, tuple) and len(item) >= 2:
+                label, confidence = item[0], item[1]
+                clean_name = clean_ingredient_name(label)
+                predictions.append({
+                    'name': clean_name,
+                    'value': float(confidence),
+                    'raw_name': label
+                })
+            elif isinstance(item, dict):
+                clean_name = clean_ingredient_name(item.get('label', ''))
+                predictions.append({
+                    'name': clean_name,
+                    'value': item.get('score', 0) or item.get('confidence', 0),
+                    'raw_name': item.get('label', '')
+                })
+    elif isinstance(result, str):
+        # Single string result
+        clean_name = clean_ingredient_name(result)
+        predictions.append({
+            'name': clean_name,
+            'value': 0.9,  # Default confidence
+            'raw_name': result
+        })
+    
+    return predictions
+
 def predict_ingredients_gradio(file_path):
     """Predict ingredients from image file using Gradio model"""
+    from gradio_client import handle_file
+
+    # Call the prediction API with the file path directly
+    log.debug("Calling Gradio predict API...")
+    with LIMITERS['gradio'], span('gradio_predict', upstream='gradio'):
+        result = GRADIO_POOL.predict(
+            image=handle_file(file_path),
+            api_name="/predict"
+        )
+    
+    log.debug("Gradio API Result: %s", result)
+    
+    predictions = normalize_predictions(result)
+    if not predictions:
+        raise Exception(f"No predictions returned from Gradio API. Raw result: {result}")
+    return predictions
+
+def get_local_classifier():
+    """Lazy initialization of the in-process ONNX classifier"""
+    global LOCAL_CLASSIFIER
+    if LOCAL_CLASSIFIER is None:
+        with LOCAL_CLASSIFIER_LOCK:
+            if LOCAL_CLASSIFIER is None:
+                from classifier import LocalClassifier
+                LOCAL_CLASSIFIER = LocalClassifier(
+                    LOCAL_MODEL_PATH,
+                    LOCAL_MODEL_LABELS,
+                    input_size=int(os.environ.get("LOCAL_MODEL_INPUT_SIZE", 224)),
+                    max_batch_size=int(os.environ.get("LOCAL_MODEL_BATCH_SIZE", 8)),
+                    max_wait_ms=float(os.environ.get("LOCAL_MODEL_BATCH_WAIT_MS", 10)),
+                    num_threads=int(os.environ.get("LOCAL_MODEL_THREADS", 0)) or None
+                )
+    return LOCAL_CLASSIFIER
+
+def predict_ingredients_local(file_path):
+    """Predict ingredients with the local classifier (batched with concurrent requests)"""
+    with span('local_predict'):
+        result = get_local_classifier().predict(file_path, timeout=PREDICT_STAGE_TIMEOUT)
+    predictions = normalize_predictions(result)
+    if not predictions:
+        raise Exception(f"No predictions returned from local classifier. Raw result: {result}")
+    return predictions
+
+def predict_ingredients(file_path):
+    """Predict ingredients from an image file using the configured backend"""
     try:
-        print("=" * 50)
-        print("CALLING GRADIO MODEL API")
-        print(f"Image file path: {file_path}")
+        log.debug("Predicting ingredients (backend: %s) for %s", CLASSIFIER_BACKEND, file_path)
         
         # Verify file exists and has content
         if not os.path.exists(file_path):
             raise Exception("Image file does not exist")
         
         file_size = os.path.getsize(file_path)
-        print(f"Image file size: {file_size} bytes")
+        log.debug("Image file size: %d bytes", file_size)
         
         if file_size == 0:
             raise Exception("Image file is empty")
         
-        # Get Gradio client
-        client = get_gradio_client()
-        
-        # Call the prediction API with the file path directly
-        print("Calling Gradio predict API...")
-        result = client.predict(
-            image=handle_file(file_path),
-            api_name="/predict"
-        )
-        
-        print(f"Gradio API Result: {result}")
+        # Same photo uploaded again? Skip the model entirely. Keys carry the
+        # model too, so a new backend, Space or model file starts fresh
+        image_keys = image_cache_keys(file_path)
+        model = classifier_identity(CLASSIFIER_BACKEND)
+        cache_keys = [f"{key}:{model}" for key in image_keys]
+        for key in cache_keys:
+            cached = PREDICTION_CACHE.get(key)
+            if cached:
+                log.debug("Prediction cache hit (%s)", key.split(':')[0])
+                return cached
         
-        # Process results
-        predictions = []
-        
-        # The result format depends on the model output
-        # Common formats: dict with 'label' and 'confidences', or list of tuples
-        if isinstance(result, dict):
-            # Format: {'label': 'apple', 'confidences': [{'label': 'apple', 'confidence': 0.95}, ...]}
-            if 'confidences' in result:
-                for item in result['confidences'][:5]:  # Top 5
-                    clean_name = clean_ingredient_name(item.get('label', ''))
-                    predictions.append({
-                        'name': clean_name,
-                        'value': item.get('confidence', 0),
-                        'raw_name': item.get('label', '')
-                    })
-            elif 'label' in result:
-                # Single prediction format
-                clean_name = clean_ingredient_name(result['label'])
-                predictions.append({
-                    'name': clean_name,
-                    'value': result.get('confidence', 0.9),  # Default confidence if not provided
-                    'raw_name': result['label']
-                })
-        elif isinstance(result, list):
-            # Format: [('apple', 0.95), ('banana', 0.03), ...]
-            for item in result[:5]:  # Top 5
-                if isinstance(item, tuple) and len(item) >= 2:
-                    label, confidence = item[0], item[1]
-                    clean_name = clean_ingredient_name(label)
-                    predictions.append({
-                        'name': clean_name,
-                        'value': float(confidence),
-                        'raw_name': label
-                    })
-                elif isinstance(item, dict):
-                    clean_name = clean_ingredient_name(item.get('label', ''))
-                    predictions.append({
-                        'name': clean_name,
-                        'value': item.get('score', 0) or item.get('confidence', 0),
-                        'raw_name': item.get('label', '')
-                    })
-        elif isinstance(result, str):
-            # Single string result
-            clean_name = clean_ingredient_name(result)
-            predictions.append({
-                'name': clean_name,
-                'value': 0.9,  # Default confidence
-                'raw_name': result
-            })
-        
-        if not predictions:
-            raise Exception(f"No predictions returned from Gradio API. Raw result: {result}")
-        
-        print("=" * 50)
-        print("GRADIO MODEL PREDICTIONS:")
-        for i, pred in enumerate(predictions, 1):
-            print(f"{i}. {pred['name']}: {pred['value']*100:.2f}%")
-        print("=" * 50)
+        def run_model():
+            predictions = None
+            keys = cache_keys
+            if CLASSIFIER_BACKEND == "local":
+                try:
+                    predictions = predict_ingredients_local(file_path)
+                except Exception as e:
+                    # The Gradio Space stays available as a fallback
+                    log.warning("Local classifier error, falling back to Gradio: %s", e)
+            if predictions is None:
+                predictions = predict_ingredients_gradio(file_path)
+                model = classifier_identity("gradio")
+                keys = [f"{key}:{model}" for key in image_keys]
+            
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("Model predictions: %s", ", ".join(
+                    f"{pred['name']} {pred['value']*100:.2f}%" for pred in predictions
+                ))
+            
+            for key in keys:
+                PREDICTION_CACHE.set(key, predictions)
+            return predictions
         
-        return predictions
+        # The same photo uploaded by several people at once runs through the model once
+        return PREDICTION_FLIGHTS.do(cache_keys[0], run_model)
         
+    except (GradioUnavailable, UpstreamSaturated):
+        # Expected while the Space is down; the pool already logged why
+        raise
     except Exception as e:
-        print(f"Error in predict_ingredients_gradio: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error in predict_ingredients: %s", e)
         raise
 
-@app.route("/")
+@bp.route("/")
 def welcome():
     return render_template("welcome.html")
 
-@app.route("/home")
+@bp.route("/home")
 def home():
     return render_template("landing.html")
 
-@app.route("/reminders")
+@bp.route("/reminders")
 def reminder():
     return render_template("reminders.html")
 
-@app.route("/treatment_info")
+@bp.route("/treatment_info")
 def treatment_info():
     return render_template("treatment_info.html")    
     
-@app.route('/upload', methods=['GET', 'POST'])
+class StageTimeout(Exception):
+    """A pipeline stage missed its deadline"""
+
+class FoodLookups:
+    """Submits nutrition/advice lookups to the pipeline pool, sharing identical ones.
+
+    One instance per request (or per batch), so the same food appearing in
+    several candidate lists or photos is only looked up once.
+    """
+
+    def __init__(self):
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def _shared(self, key, fn, *args):
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None:
+                future = PIPELINE_EXECUTOR.submit(fn, *args)
+                self._futures[key] = future
+            return future
+
+    def nutrition(self, food_name):
+        return self._shared(('nutrition', normalize_food_key(food_name)), get_nutrition, food_name)
+
+    def advice(self, food_name, nutrition_data, nutritional_needs, fresh=False):
+        key = ('advice', advice_fingerprint(food_name, nutrition_data, nutritional_needs))
+        return self._shared(key, get_food_advice, food_name, nutrition_data, nutritional_needs, fresh)
+
+def remove_temp_file(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        log.warning("Error deleting temporary file: %s", e)
+
+def predict_and_remove(file_path):
+    """predict_ingredients on a temp file, deleting it once the model is done with it"""
+    try:
+        return predict_ingredients(file_path)
+    finally:
+        remove_temp_file(file_path)
+
+def parse_nutritional_needs(raw_needs):
+    try:
+        nutritional_needs = json.loads(raw_needs or "[]")
+    except ValueError:
+        return []
+    return nutritional_needs if isinstance(nutritional_needs, list) else []
+
+def analyze_food_image(image_bytes, filename, nutritional_needs, fresh_advice=False, lookups=None):
+    """Run one photo through predict -> nutrition -> advice.
+
+    Returns the Clarifai-style concepts list the upload page expects. Raises
+    StageTimeout if the classifier misses its deadline.
+    """
+    lookups = lookups or FoodLookups()
+    temp_file_path = None
+    try:
+        # Shrink the photo in memory before it goes anywhere near the model
+        try:
+            with span('image_prepare'):
+                image_bytes, ext = prepare_image(image_bytes)
+        except Exception as e:
+            # Pillow can't read it (e.g. HEIC); let the model try the original
+            log.info("Image preprocessing skipped: %s", e)
+            # Get file extension
+            _, ext = os.path.splitext(secure_filename(filename or ''))
+            if not ext:
+                ext = '.jpg'
+        
+        # Gradio uploads from a path, so write the (small) prepared image to a temp file
+        with span('temp_write'), tempfile.NamedTemporaryFile(delete=False, suffix=ext) as temp_file:
+            temp_file.write(image_bytes)
+            temp_file_path = temp_file.name
+        
+        log.debug("Image saved to temporary file: %s (%d bytes)", temp_file_path, len(image_bytes))
+
+        # ================== RUN GRADIO PREDICTOR ==================
+        # The task deletes the file itself, so a timeout here can't pull it out from under the model
+        predict_future = PIPELINE_EXECUTOR.submit(predict_and_remove, temp_file_path)
+        temp_file_path = None
+        try:
+            predictions = predict_future.result(timeout=PREDICT_STAGE_TIMEOUT)
+        except FuturesTimeoutError:
+            log.warning("Gradio stage timed out after %.1fs", PREDICT_STAGE_TIMEOUT)
+            raise StageTimeout("Food recognition timed out, please try again")
+
+        if not predictions:
+            return []
+
+        # Top prediction
+        top_food = predictions[0]['name']
+
+        # ================== CALORIE NINJA NUTRITION (fan-out) ==================
+        # Look up every candidate at once so the override options are filled in too
+        nutrition_deadline = time.monotonic() + NUTRITION_STAGE_TIMEOUT
+        nutrition_futures = [lookups.nutrition(pred['name']) for pred in predictions]
+        nutrition_data = wait_for_stage(
+            nutrition_futures[0], nutrition_deadline - time.monotonic(), "CalorieNinja"
+        )
+
+        # ================== GEMINI ADVICE (simple prompt) ==================
+        # Starts as soon as the top food's nutrition is in (or its deadline passes)
+        gemini_advice = None
+        if GOOGLE_API_KEY:
+            advice_future = lookups.advice(top_food, nutrition_data, nutritional_needs, fresh_advice)
+            gemini_advice = wait_for_stage(advice_future, GEMINI_STAGE_TIMEOUT, "Gemini")
+
+        candidate_nutrition = [nutrition_data] + [
+            wait_for_stage(future, nutrition_deadline - time.monotonic(), "CalorieNinja")
+            for future in nutrition_futures[1:]
+        ]
+
+        return [
+            {
+                'name': pred['name'],
+                'value': pred['value'],
+                'nutrition': candidate_nutrition[i],
+                'gemini_advice': gemini_advice if i == 0 else None
+            }
+            for i, pred in enumerate(predictions)
+        ]
+    finally:
+        # Only still set if the prediction task was never submitted
+        if temp_file_path:
+            remove_temp_file(temp_file_path)
+
+@bp.route('/upload', methods=['GET', 'POST'])
 def identify_food():
     if request.method == "POST":
-        temp_file_path = None
         try:
             # ================== ACCEPT multipart/form-data ==================
             if "image" not in request.files:
@@ -194,191 +838,351 @@ def identify_food():
                 return jsonify({'error': 'No selected file'}), 400
 
             # Optional: nutritional needs
-            raw_needs = request.form.get("nutritional_needs", "[]")
-            try:
-                nutritional_needs = json.loads(raw_needs)
-            except:
-                nutritional_needs = []
-
-            # Save uploaded file to temporary location
-            filename = secure_filename(file.filename)
-            # Get file extension
-            _, ext = os.path.splitext(filename)
-            if not ext:
-                ext = '.jpg'
-            
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as temp_file:
-                file.save(temp_file.name)
-                temp_file_path = temp_file.name
-            
-            print(f"Image saved to temporary file: {temp_file_path}")
-            print(f"File size: {os.path.getsize(temp_file_path)} bytes")
+            nutritional_needs = parse_nutritional_needs(request.form.get("nutritional_needs"))
 
-            # ================== RUN GRADIO PREDICTOR ==================
-            predictions = predict_ingredients_gradio(temp_file_path)
+            # Opt out of cached Gemini advice
+            fresh_advice = request.form.get("fresh_advice", "").lower() in ("1", "true", "yes")
 
-            if not predictions:
-                return jsonify({'error': 'No ingredients detected'}), 400
-
-            # Top prediction
-            top_prediction = predictions[0]
-            top_food = top_prediction['name']
-            max_confidence = top_prediction['value']
-
-            # ================== CALORIE NINJA NUTRITION ==================
-            nutrition_data = None
             try:
-                if CALORIENINJA_API_KEY:
-                    resp = requests.get(
-                        f'https://api.calorieninjas.com/v1/nutrition?query={top_food}',
-                        headers={'X-Api-Key': CALORIENINJA_API_KEY},
-                        timeout=6
-                    )
-                    if resp.status_code == 200:
-                        items = resp.json().get('items', [])
-                        if items:
-                            item = items[0]
-                            nutrition_data = {
-                                'calories': item.get('calories', 0),
-                                'protein_g': item.get('protein_g', 0),
-                                'carbohydrates_total_g': item.get('carbohydrates_total_g', 0),
-                                'fat_total_g': item.get('fat_total_g', 0),
-                                'fiber_g': item.get('fiber_g', 0),
-                                'sugar_g': item.get('sugar_g', 0),
-                                'sodium_mg': item.get('sodium_mg', 0),
-                                'serving_size_g': item.get('serving_size_g', 100)
-                            }
-            except Exception as e:
-                print("CalorieNinja error:", e)
+                concepts = analyze_food_image(file.read(), file.filename, nutritional_needs, fresh_advice)
+            except StageTimeout as e:
+                return jsonify({'error': str(e)}), 504
+            except (GradioUnavailable, UpstreamSaturated) as e:
+                log.warning("Upload rejected: %s", e)
+                return busy_response({'error': 'Food recognition is temporarily unavailable, please try again shortly'})
 
-            # ================== GEMINI ADVICE (simple prompt) ==================
-            gemini_advice = None
-            try:
-                if GOOGLE_API_KEY:
-                    if nutrition_data:
-                        calories = nutrition_data['calories']
-                        protein = nutrition_data['protein_g']
-                        carbs = nutrition_data['carbohydrates_total_g']
-                        fat = nutrition_data['fat_total_g']
-                        fiber = nutrition_data['fiber_g']
-                        sugar = nutrition_data['sugar_g']
-                        sodium = nutrition_data['sodium_mg']
-
-                        if nutritional_needs:
-                            needs_str = ", ".join(nutritional_needs)
-                            prompt = (
-                                f"You are a nutrition expert. The food identified is {top_food}. "
-                                f"Nutritional information: {calories} calories, {protein}g protein, "
-                                f"{carbs}g carbohydrates, {fat}g fat, {fiber}g fiber, {sugar}g sugar, {sodium}mg sodium. "
-                                f"The person has the following nutritional needs/preferences: {needs_str}. "
-                                f"In 2-3 sentences, provide practical, actionable advice about whether this food is a good choice for their needs. "
-                                f"Be specific about how the nutritional content aligns (or doesn't align) with their requirements. "
-                                f"Keep it conversational and supportive."
-                            )
-                        else:
-                            prompt = (
-                                f"You are a nutrition expert. The food identified is {top_food}. "
-                                f"Nutritional information: {calories} calories, {protein}g protein, "
-                                f"{carbs}g carbohydrates, {fat}g fat, {fiber}g fiber, {sugar}g sugar, {sodium}mg sodium. "
-                                f"In 2-3 sentences, provide practical, actionable health advice about this food. "
-                                f"Is this generally a good nutritional choice? What are the key benefits or concerns? "
-                                f"Keep it conversational and supportive."
-                            )
-                    else:
-                        prompt = (
-                            f"You are a nutrition expert. The food identified is {top_food}. "
-                            f"In 2-3 sentences, provide practical health advice about this food. "
-                            f"Is this generally a good nutritional choice? What are the key benefits or concerns? "
-                            f"Keep it conversational and supportive."
-                        )
-                
-                print(f"Prompt (first 100 chars): {prompt[:100]}...")
-                print("Calling Gemini API NOW...")
-                
-                model = genai.GenerativeModel(
-                    "gemini-2.5-flash",
-                    generation_config={
-                        "response_mime_type": "text/plain"
-                    }
-                )
-
-                gemini_response = model.generate_content(prompt)
-
-                
-                gemini_advice = gemini_response.text.strip()
-                print(f"SUCCESS! Gemini advice received ({len(gemini_advice)} characters)")
-                print(f"Advice preview: {gemini_advice[:100]}...")
-                print("=" * 50)
-                
-            except Exception as gemini_error:
-                print("=" * 50)
-                print(f"GEMINI ERROR: {str(gemini_error)}")
-                print("Error type:", type(gemini_error).__name__)
-                import traceback
-                traceback.print_exc()
-                print("=" * 50)
+            if not concepts:
+                return jsonify({'error': 'No ingredients detected'}), 400
             
             # Build response in Clarifai format for compatibility with frontend
             response_data = {
                 'outputs': [
                     {
                         'data': {
-                            'concepts': []
+                            'concepts': concepts
                         }
                     }
                 ]
             }
-            
-            # Add all predictions as concepts
-            for pred in predictions:
-                response_data['outputs'][0]['data']['concepts'].append({
-                    'name': pred['name'],
-                    'value': pred['value'],
-                    'nutrition': nutrition_data if pred == predictions[0] else None,
-                    'gemini_advice': gemini_advice if pred == predictions[0] else None
-                })
 
             return jsonify(response_data), 200
 
         except Exception as e:
-            print("UPLOAD ERROR:", e)
-            import traceback
-            traceback.print_exc()
+            log.exception("Upload error: %s", e)
             return jsonify({'error': str(e)}), 500
-        finally:
-            # Clean up temporary file
-            if temp_file_path and os.path.exists(temp_file_path):
-                try:
-                    os.unlink(temp_file_path)
-                    print(f"Temporary file deleted: {temp_file_path}")
-                except Exception as e:
-                    print(f"Error deleting temporary file: {e}")
 
     return render_template("upload.html")
 
+def read_batch_images(files, archives):
+    """Collect (filename, bytes) pairs from multipart images and zip archives"""
+    images = []
+    for file in files:
+        if file.filename:
+            images.append((file.filename, file.read()))
+    for archive in archives:
+        with zipfile.ZipFile(archive.stream) as zf:
+            for info in zf.infolist():
+                name = info.filename
+                if info.is_dir() or name.startswith('__MACOSX/') or os.path.basename(name).startswith('.'):
+                    continue
+                if os.path.splitext(name)[1].lower() not in BATCH_IMAGE_EXTENSIONS:
+                    continue
+                if info.file_size > BATCH_MAX_IMAGE_BYTES:
+                    raise ValueError(f"{name} is larger than {BATCH_MAX_IMAGE_BYTES} bytes")
+                images.append((name, zf.read(info)))
+                if len(images) > BATCH_MAX_IMAGES:
+                    break
+    if len(images) > BATCH_MAX_IMAGES:
+        raise ValueError(f"At most {BATCH_MAX_IMAGES} images can be uploaded at once")
+    return images
+
+@bp.route('/api/upload/batch', methods=['POST'])
+def identify_food_batch():
+    """Identify many meal photos at once, streaming one NDJSON line per photo as it finishes"""
+    try:
+        images = read_batch_images(request.files.getlist("images"), request.files.getlist("archive"))
+    except (ValueError, zipfile.BadZipFile) as e:
+        return jsonify({'error': str(e)}), 400
+    if not images:
+        return jsonify({'error': 'No images uploaded'}), 400
+
+    nutritional_needs = parse_nutritional_needs(request.form.get("nutritional_needs"))
+    fresh_advice = request.form.get("fresh_advice", "").lower() in ("1", "true", "yes")
+    log.info("Batch upload: %d images", len(images))
+
+    # Shared across the batch so repeated foods hit CalorieNinja/Gemini once
+    lookups = FoodLookups()
+    futures = {
+        BATCH_EXECUTOR.submit(
+            analyze_food_image, image_bytes, filename, nutritional_needs, fresh_advice, lookups
+        ): (index, filename)
+        for index, (filename, image_bytes) in enumerate(images)
+    }
 
+    def generate():
+        succeeded = 0
+        for future in as_completed(futures):
+            index, filename = futures[future]
+            result = {'index': index, 'filename': filename}
+            try:
+                concepts = future.result()
+                if concepts:
+                    succeeded += 1
+                    result.update(success=True, concepts=concepts)
+                else:
+                    result.update(success=False, error='No ingredients detected')
+            except Exception as e:
+                log.warning("Batch image %s failed: %s", filename, e)
+                result.update(success=False, error=str(e))
+            yield json.dumps(result) + "\n"
+        yield json.dumps({'done': True, 'count': len(images), 'succeeded': succeeded}) + "\n"
 
-@app.route("/symptomTracker")
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'X-Accel-Buffering': 'no'}
+    )
+
+
+
+@bp.route("/symptomTracker")
 def symptom():
     return render_template("symptomReport.html")
 
-@app.route("/glucose")
+@bp.route("/glucose")
 def glucose():
     return render_template("glucose.html")
 
-@app.route("/settings")
+# ============== GLUCOSE LOG API ==============
+
+def get_user_id():
+    """Anonymous per-browser user id, kept in the signed session cookie"""
+    if 'user_id' not in session:
+        session['user_id'] = uuid.uuid4().hex
+        session.permanent = True
+    return session['user_id']
+
+@bp.route("/api/glucose/entries", methods=['GET'])
+def list_glucose_entries():
+    """Glucose readings for the current user, newest first, paginated"""
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), 1000)
+    except ValueError:
+        return jsonify({'error': 'limit must be a number'}), 400
+
+    entries, next_cursor = GLUCOSE_STORE.list_entries(
+        get_user_id(),
+        start=request.args.get('start'),
+        end=request.args.get('end'),
+        limit=limit,
+        cursor=request.args.get('cursor'),
+        ascending=request.args.get('order') == 'asc'
+    )
+    return jsonify({
+        'success': True,
+        'entries': entries,
+        'next_cursor': next_cursor
+    })
+
+@bp.route("/api/glucose/entries", methods=['POST'])
+def add_glucose_entries():
+    """Save one entry, or a batch under 'entries' (used to migrate localStorage).
+
+    A single invalid entry is a 400. In a batch the valid entries are saved
+    and the invalid ones come back under 'rejected' with their index.
+    """
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({'error': 'Entry data is required'}), 400
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Entry data must be an object'}), 400
+
+    user_id = get_user_id()
+    if not isinstance(data.get('entries'), list):
+        try:
+            inserted = GLUCOSE_STORE.add_entries(user_id, [data])
+        except (ValueError, TypeError) as e:
+            return jsonify({'error': f'Invalid glucose entry: {e}'}), 400
+        return jsonify({'success': True, 'inserted': inserted}), 201
+
+    now = time.time()
+    rows = []
+    rejected = []
+    for index, entry in enumerate(data['entries']):
+        try:
+            rows.append(entry_to_row(user_id, entry, now))
+        except (ValueError, TypeError) as e:
+            rejected.append({'index': index, 'error': str(e)})
+    inserted = GLUCOSE_STORE.add_rows(user_id, rows) if rows else 0
+    return jsonify({'success': True, 'inserted': inserted, 'rejected': rejected}), 201
+
+@bp.route("/api/glucose/entries/<entry_id>", methods=['DELETE'])
+def delete_glucose_entry(entry_id):
+    if not GLUCOSE_STORE.delete_entry(get_user_id(), entry_id):
+        return jsonify({'error': 'Entry not found'}), 404
+    return jsonify({'success': True})
+
+@bp.route("/api/glucose/entries", methods=['DELETE'])
+def clear_glucose_entries():
+    deleted = GLUCOSE_STORE.clear(get_user_id())
+    return jsonify({'success': True, 'deleted': deleted})
+
+@bp.route("/api/glucose/stats")
+def glucose_stats():
+    """Averages, time-in-range, GMI/eA1C and variability from running aggregates"""
+    try:
+        days = min(max(int(request.args.get('days', 14)), 1), 90)
+        weeks = min(max(int(request.args.get('weeks', 12)), 1), 52)
+    except ValueError:
+        return jsonify({'error': 'days and weeks must be numbers'}), 400
+    return jsonify({'success': True, **GLUCOSE_STORE.stats(get_user_id(), days=days, weeks=weeks)})
+
+@bp.route("/api/glucose/forecast", methods=['POST'])
+def glucose_forecast():
+    """Forecast curve from the latest reading, e.g. every 5 minutes over 0-8h"""
+    from glucose_predict import build_inputs as build_glucose_inputs, forecast as glucose_forecast_curve, horizons_hours
+
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Invalid forecast parameters'}), 400
+    try:
+        hours = min(max(float(data.get('hours', 8)), 0), 8)
+        step_minutes = min(max(float(data.get('step_minutes', 5)), 1), 60)
+        # The browser sends its local wall-clock time; entries are stored in local time too
+        now = datetime.fromisoformat(data['now']) if data.get('now') else datetime.now()
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid forecast parameters'}), 400
+    if now.tzinfo is not None:
+        # e.g. Date.toISOString(), which ends in 'Z'; entries hold naive local times
+        now = now.astimezone().replace(tzinfo=None)
+    profile = data.get('profile') or {}
+    if not isinstance(profile, dict):
+        return jsonify({'error': 'Invalid forecast parameters'}), 400
+
+    latest, _ = GLUCOSE_STORE.list_entries(get_user_id(), limit=1)
+    if not latest:
+        return jsonify({'error': 'Add at least one glucose entry before making predictions'}), 400
+
+    horizons = horizons_hours(hours, step_minutes)
+    inputs = build_glucose_inputs([latest[0]], [profile], now)
+    curve = glucose_forecast_curve(inputs, horizons)[0]
+    if not all(math.isfinite(v) for v in curve):
+        # e.g. an entry saved through the API without an insulin dose
+        return jsonify({'error': 'The latest entry is missing values needed for a prediction'}), 400
+    return jsonify({
+        'success': True,
+        'entry': latest[0],
+        'minutes': [round(h * 60) for h in horizons],
+        'predictions': [int(v) for v in curve]
+    })
+
+@bp.route("/api/glucose/summary")
+def glucose_summary():
+    """Entry count, average and latest reading for the stats cards"""
+    return jsonify({'success': True, **GLUCOSE_STORE.summary(get_user_id())})
+
+@bp.route("/api/reminders", methods=['GET'])
+def list_reminders():
+    """The current user's reminders, each with its next occurrence"""
+    return jsonify({'success': True, 'reminders': REMINDER_STORE.list_reminders(get_user_id())})
+
+@bp.route("/api/reminders", methods=['POST'])
+def save_reminders():
+    """Create or update one reminder, or a batch under 'reminders' (used to sync localStorage)"""
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({'error': 'Reminder data is required'}), 400
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Reminder data must be an object'}), 400
+
+    reminders = data['reminders'] if isinstance(data.get('reminders'), list) else [data]
+    try:
+        saved = REMINDER_STORE.upsert(get_user_id(), reminders)
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': f'Invalid reminder: {e}'}), 400
+
+    if saved:
+        REMINDER_SCHEDULER.wake()
+    return jsonify({'success': True, 'saved': saved}), 201
+
+@bp.route("/api/reminders", methods=['DELETE'])
+def clear_reminders():
+    deleted = REMINDER_STORE.clear(get_user_id())
+    return jsonify({'success': True, 'deleted': deleted})
+
+@bp.route("/api/reminders/<reminder_id>", methods=['DELETE'])
+def delete_reminder(reminder_id):
+    if not REMINDER_STORE.delete(get_user_id(), reminder_id):
+        return jsonify({'error': 'Reminder not found'}), 404
+    return jsonify({'success': True})
+
+# ============== DATA EXPORT / IMPORT ==============
+
+@bp.route("/api/export")
+def export_data():
+    """Stream everything the server holds for the user, gzipped by default.
+
+    format=ndjson (glucose readings and reminders) or csv (glucose readings);
+    gzip=0 for plain text. Rows are read and compressed a page at a time.
+    """
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in ('ndjson', 'csv'):
+        return jsonify({'error': 'format must be ndjson or csv'}), 400
+    compress = request.args.get('gzip', '1').lower() not in ('0', 'false', 'no')
+
+    user_id = get_user_id()
+    if fmt == 'csv':
+        lines = export_csv(GLUCOSE_STORE, user_id)
+        mimetype = 'text/csv'
+    else:
+        lines = export_ndjson(GLUCOSE_STORE, REMINDER_STORE, user_id)
+        mimetype = 'application/x-ndjson'
+    filename = f"glycogenie-{datetime.now().strftime('%Y-%m-%d')}.{fmt}"
+    if compress:
+        filename += '.gz'
+        mimetype = 'application/gzip'
+
+    return Response(
+        stream_with_context(encode_chunks(lines, compress=compress)),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'Cache-Control': 'no-store',
+            'X-Accel-Buffering': 'no',
+        }
+    )
+
+@bp.route("/api/import", methods=['POST'])
+def import_data():
+    """Load an export (NDJSON or CSV, gzipped or not) from the request body.
+
+    The body is read in chunks as it arrives, so chunked uploads of any size
+    work; ids the user already has are skipped.
+    """
+    stream = request.stream
+    chunks = iter(lambda: stream.read(64 * 1024), b'')
+    result = import_records(chunks, GLUCOSE_STORE, REMINDER_STORE, get_user_id())
+    if result['reminders_inserted']:
+        REMINDER_SCHEDULER.wake()
+    log.info("Import: %d records, %d glucose and %d reminders added, %d duplicates, %d invalid",
+             result['records'], result['glucose_inserted'], result['reminders_inserted'],
+             result['duplicates'], result['invalid'])
+    if result['error']:
+        return jsonify({'success': False, **result}), 400
+    return jsonify({'success': True, **result})
+
+@bp.route("/settings")
 def settings():
     return render_template("settings.html")
 
-@app.route("/test-gemini")
+@bp.route("/test-gemini")
 def test_gemini():
     """Test endpoint to verify Gemini is working"""
     try:
         if not GOOGLE_API_KEY:
             return jsonify({'error': 'GOOGLE_API_KEY not set'}), 500
         
-        model = genai.GenerativeModel("gemini-2.5-flash")
+        model = get_model("gemini-2.5-flash")
         response = model.generate_content("Say hello in one sentence")
         
         return jsonify({
@@ -392,32 +1196,116 @@ def test_gemini():
             'error': str(e)
         }), 500
 
-@app.route("/test-gradio")
+@bp.route("/test-clients")
+def test_clients():
+    """Report model and HTTP connection reuse and upstream admission for this worker"""
+    return jsonify({
+        'success': True,
+        'stats': client_stats(),
+        'limiters': {name: limiter.stats() for name, limiter in LIMITERS.items()}
+    })
+
+# Fingerprinted CSS/JS bundles and WebP images, built from static/ on first use
+# (gunicorn builds them once at startup, `flask --app main build-assets` ahead of time)
+ASSETS = AssetPipeline(output_dir=os.environ.get("ASSETS_DIR"))
+ASSET_MAX_AGE = 365 * 24 * 3600
+
+@bp.app_template_global()
+def asset_url(name):
+    """URL of a built asset ('app.js', 'logo-120.webp'), with its content hash in the name"""
+    return url_for('main.dist_asset', filename=ASSETS.filename(name))
+
+@bp.route("/static/dist/<path:filename>")
+def dist_asset(filename):
+    """Serve a built asset, precompressed when the browser accepts it, cached for a year"""
+    encodings = ASSETS.available_encodings(filename)
+    if encodings is None:
+        abort(404)
+    suffixes = dict(ENCODINGS)
+    encoding = next((e for e in encodings if request.accept_encodings[e]), None)
+    response = send_from_directory(
+        ASSETS.output_dir,
+        filename + suffixes[encoding] if encoding else filename,
+        mimetype=mimetypes.guess_type(filename)[0],
+        max_age=ASSET_MAX_AGE
+    )
+    # The name changes whenever the content does, so browsers never need to revalidate
+    response.headers['Cache-Control'] = f'public, max-age={ASSET_MAX_AGE}, immutable'
+    if encodings:
+        response.vary.add('Accept-Encoding')
+    if encoding:
+        response.content_encoding = encoding
+    return response
+
+@bp.route("/metrics")
+def metrics():
+    """Prometheus metrics: stage latency, cache hit/miss, upstream errors"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@bp.route("/test-reminders")
+def test_reminders():
+    """Reminder scheduler state for this worker (only the lease holder has a queue)"""
+    return jsonify({'success': True, 'scheduler': REMINDER_SCHEDULER.stats()})
+
+@bp.route("/test-gradio")
 def test_gradio():
-    """Test endpoint to verify Gradio API is working"""
-    try:
-        client = get_gradio_client()
-        
-        return jsonify({
-            'success': True,
-            'message': 'Gradio client initialized successfully',
-            'model': 'fredsok/ingredientsmodel'
-        })
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    """Gradio client pool health for this worker (doesn't connect anything itself)"""
+    health = GRADIO_POOL.health()
+    healthy = health['ready'] > 0 and health['state'] != 'open'
+    return jsonify({
+        'success': healthy,
+        'model': GRADIO_SPACE,
+        'pool': health
+    }), 200 if healthy else 503
+
+def food_search_names():
+    """Everything the override picker can suggest: the food list, the offline table and classifier labels"""
+    names = list(CALORIE_NINJA_FOODS) + list(NUTRITION_TABLE)
+    if os.path.exists(LOCAL_MODEL_LABELS):
+        try:
+            from classifier import load_labels
+            names += [clean_ingredient_name(label) for label in load_labels(LOCAL_MODEL_LABELS)]
+        except (OSError, ValueError) as e:
+            log.warning("Could not load classifier labels for food search: %s", e)
+    return names
 
-@app.route("/api/food-list")
+# Built once per process; the list never changes while the app runs
+FOOD_INDEX = FoodIndex(food_search_names())
+FOOD_LIST_BODY = json.dumps({'success': True, 'foods': sorted(CALORIE_NINJA_FOODS)})
+FOOD_LIST_ETAG = hashlib.sha256(FOOD_LIST_BODY.encode('utf-8')).hexdigest()[:32]
+FOOD_SEARCH_MAX_RESULTS = 20
+
+def cached_json(body, etag, max_age):
+    """JSON response with a strong ETag and Cache-Control, answering If-None-Match with 304"""
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    return response.make_conditional(request)
+
+@bp.route("/api/food-list")
 def get_food_list():
     """Return list of supported food items"""
-    return jsonify({
+    return cached_json(FOOD_LIST_BODY, FOOD_LIST_ETAG, max_age=86400)
+
+@bp.route("/api/food-search")
+def food_search():
+    """Ranked, typo-tolerant autocomplete for the override picker"""
+    query = request.args.get('q', '')[:100]
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), FOOD_SEARCH_MAX_RESULTS)
+    except ValueError:
+        return jsonify({'error': 'limit must be a number'}), 400
+    body = json.dumps({
         'success': True,
-        'foods': sorted(CALORIE_NINJA_FOODS)
+        'query': query,
+        'results': [{'name': name, 'score': score} for name, score in FOOD_INDEX.search(query, limit)]
     })
+    # Same query, same answer until the next deploy
+    etag = hashlib.sha256(f"{FOOD_LIST_ETAG}:{body}".encode('utf-8')).hexdigest()[:32]
+    return cached_json(body, etag, max_age=3600)
 
-@app.route("/api/override-food", methods=['POST'])
+@bp.route("/api/override-food", methods=['POST'])
 def override_food():
     """Override detected food with user-selected food"""
     try:
@@ -429,33 +1317,14 @@ def override_food():
         food_name = data['food_name'].strip().lower()
         nutritional_needs = data.get('nutritional_needs', [])
         
-        print(f"Override request for food: {food_name}")
+        log.debug("Override request for food: %s", food_name)
         
         # Get nutrition data from Calorie Ninja
-        nutrition_data = None
         try:
-            if CALORIENINJA_API_KEY:
-                resp = requests.get(
-                    f'https://api.calorieninjas.com/v1/nutrition?query={food_name}',
-                    headers={'X-Api-Key': CALORIENINJA_API_KEY},
-                    timeout=6
-                )
-                if resp.status_code == 200:
-                    items = resp.json().get('items', [])
-                    if items:
-                        item = items[0]
-                        nutrition_data = {
-                            'calories': item.get('calories', 0),
-                            'protein_g': item.get('protein_g', 0),
-                            'carbohydrates_total_g': item.get('carbohydrates_total_g', 0),
-                            'fat_total_g': item.get('fat_total_g', 0),
-                            'fiber_g': item.get('fiber_g', 0),
-                            'sugar_g': item.get('sugar_g', 0),
-                            'sodium_mg': item.get('sodium_mg', 0),
-                            'serving_size_g': item.get('serving_size_g', 100)
-                        }
-        except Exception as e:
-            print(f"CalorieNinja error: {e}")
+            nutrition_data = get_nutrition(food_name)
+        except UpstreamSaturated as e:
+            log.warning("Override rejected: %s", e)
+            return busy_response({'error': 'Nutrition lookups are busy right now, please try again shortly'})
         
         if not nutrition_data:
             return jsonify({'error': 'Could not fetch nutrition data for this food'}), 400
@@ -464,51 +1333,11 @@ def override_food():
         gemini_advice = None
         try:
             if GOOGLE_API_KEY:
-                calories = nutrition_data['calories']
-                protein = nutrition_data['protein_g']
-                carbs = nutrition_data['carbohydrates_total_g']
-                fat = nutrition_data['fat_total_g']
-                fiber = nutrition_data['fiber_g']
-                sugar = nutrition_data['sugar_g']
-                sodium = nutrition_data['sodium_mg']
-
-                if nutritional_needs:
-                    needs_str = ", ".join(nutritional_needs)
-                    prompt = (
-                        f"You are a nutrition expert. The food identified is {food_name}. "
-                        f"Nutritional information: {calories} calories, {protein}g protein, "
-                        f"{carbs}g carbohydrates, {fat}g fat, {fiber}g fiber, {sugar}g sugar, {sodium}mg sodium. "
-                        f"The person has the following nutritional needs/preferences: {needs_str}. "
-                        f"In 2-3 sentences, provide practical, actionable advice about whether this food is a good choice for their needs. "
-                        f"Be specific about how the nutritional content aligns (or doesn't align) with their requirements. "
-                        f"Keep it conversational and supportive."
-                    )
-                else:
-                    prompt = (
-                        f"You are a nutrition expert. The food identified is {food_name}. "
-                        f"Nutritional information: {calories} calories, {protein}g protein, "
-                        f"{carbs}g carbohydrates, {fat}g fat, {fiber}g fiber, {sugar}g sugar, {sodium}mg sodium. "
-                        f"In 2-3 sentences, provide practical, actionable health advice about this food. "
-                        f"Is this generally a good nutritional choice? What are the key benefits or concerns? "
-                        f"Keep it conversational and supportive."
-                    )
-            
-                print(f"Calling Gemini for override advice...")
-                
-                model = genai.GenerativeModel(
-                    "gemini-2.5-flash",
-                    generation_config={
-                        "response_mime_type": "text/plain"
-                    }
+                gemini_advice = get_food_advice(
+                    food_name, nutrition_data, nutritional_needs, fresh=bool(data.get('fresh_advice'))
                 )
-
-                gemini_response = model.generate_content(prompt)
-                gemini_advice = gemini_response.text.strip()
-                
-                print(f"Gemini advice received: {gemini_advice[:100]}...")
-                
         except Exception as gemini_error:
-            print(f"Gemini error: {str(gemini_error)}")
+            log.warning("Gemini error: %s", gemini_error)
         
         # Build response
         response_data = {
@@ -523,30 +1352,16 @@ def override_food():
         return jsonify(response_data), 200
         
     except Exception as e:
-        print(f"Override error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Override error: %s", e)
         return jsonify({'error': str(e)}), 500
 
-@app.route("/api/chatbot", methods=['POST'])
-def chatbot():
-    """Diabetes assistant chatbot endpoint"""
-    try:
-        data = request.get_json()
-        
-        if not data or 'message' not in data:
-            return jsonify({'error': 'Message is required'}), 400
-        
-        user_message = data['message'].strip()
-        conversation_history = data.get('history', [])
-        
-        if not user_message:
-            return jsonify({'error': 'Message cannot be empty'}), 400
-        
-        print(f"Chatbot request: {user_message}")
-        
-        # System prompt to keep conversation on-topic
-        system_prompt = """You are a helpful diabetes assistant specialized in helping diabetic patients. 
+# Chatbot relevance gate: "local" answers confident cases in-process and escalates
+# the ambiguous band to Gemini; "llm" always asks Gemini
+RELEVANCE_GATE = os.environ.get("RELEVANCE_GATE", "local").lower()
+RELEVANCE_LOW = float(os.environ.get("RELEVANCE_LOW", 0.2))
+RELEVANCE_HIGH = float(os.environ.get("RELEVANCE_HIGH", 0.8))
+
+CHATBOT_SYSTEM_PROMPT = """You are a helpful diabetes assistant specialized in helping diabetic patients. 
 You can answer questions about:
 - Glucose monitoring and blood sugar management
 - Nutrition, diet planning, and food choices for diabetics
@@ -564,67 +1379,277 @@ IMPORTANT GUIDELINES:
 
 If the user asks about something unrelated to diabetes, politely say: "I'm specialized in diabetes care and can help with questions about glucose monitoring, nutrition, medications, and diabetes management. Is there anything diabetes-related I can help you with?"
 """
-        
-        # Build conversation context
-        messages = []
-        
-        # Add recent history (last 5 exchanges to keep context manageable)
-        recent_history = conversation_history[-10:] if len(conversation_history) > 10 else conversation_history
-        for msg in recent_history:
-            messages.append({
-                'role': msg['role'],
-                'parts': [msg['content']]
-            })
-        
-        # Check if the question is diabetes-related
-        relevance_check = genai.GenerativeModel("gemini-2.5-flash")
-        check_prompt = f"""Is this question related to diabetes, glucose, nutrition for diabetics, diabetes medications, or diabetes care?
+
+OFF_TOPIC_RESPONSE = "I'm specialized in diabetes care and can help with questions about glucose monitoring, nutrition, medications, and diabetes management. Is there anything diabetes-related I can help you with?"
+CHATBOT_BUSY_MESSAGE = "I'm getting a lot of questions right now. Please try again in a moment."
+
+def parse_chat_request(data):
+    """Validate a chatbot request body, returning (message, session_id, history, error)"""
+    if not isinstance(data, dict) or 'message' not in data:
+        return None, None, None, 'Message is required'
+    if not isinstance(data['message'], str):
+        return None, None, None, 'Message must be a string'
+    
+    user_message = data['message'].strip()
+    if not user_message:
+        return None, None, None, 'Message cannot be empty'
+    
+    # history is only sent by pages loaded before chat sessions moved server-side
+    return user_message, data.get('session_id'), data.get('history'), None
+
+def summarize_chat(summary, turns, max_tokens):
+    """Fold older chat turns into the rolling summary with Gemini"""
+    transcript = "\n".join(
+        f"{'User' if turn['role'] == 'user' else 'Assistant'}: {turn['content']}" for turn in turns
+    )
+    prompt = f"""Update the running summary of a conversation between a diabetic patient and a diabetes assistant.
+Keep facts about the patient (diabetes type, medications, glucose readings, foods, goals) and any advice already given.
+Write plain sentences, under {max_tokens * 3 // 4} words.
+
+Current summary:
+{summary or "(none)"}
+
+New messages:
+{transcript}
+
+Updated summary:"""
+    model = get_model("gemini-2.5-flash", generation_config={"temperature": 0.2})
+    with LIMITERS['gemini'], span('chat_summary', upstream='gemini'):
+        return model.generate_content(prompt).text
+
+# "gemini" writes the rolling summary with the model (falling back to the
+# extractive one on errors); "extractive" never spends a call on it
+if os.environ.get("CHAT_SUMMARIZER", "gemini").lower() == "gemini":
+    CHAT_SESSIONS.summarizer = summarize_chat
+
+def is_diabetes_related(user_message):
+    """Decide whether a chat message is on-topic, asking Gemini only when unsure"""
+    with span('relevance_gate'):
+        if RELEVANCE_GATE != "llm":
+            decision = classify_relevance(user_message, RELEVANCE_LOW, RELEVANCE_HIGH)
+            if decision is not None:
+                return decision
+        return is_diabetes_related_llm(user_message)
+
+def is_diabetes_related_llm(user_message):
+    """Ask Gemini whether a chat message is on-topic"""
+    relevance_check = get_model("gemini-2.5-flash")
+    check_prompt = f"""Is this question related to diabetes, glucose, nutrition for diabetics, diabetes medications, or diabetes care?
 Question: "{user_message}"
 
 Answer with just "YES" or "NO"."""
-        
+    
+    with LIMITERS['gemini'], span('relevance_llm', upstream='gemini'):
         relevance_response = relevance_check.generate_content(check_prompt)
-        is_relevant = "YES" in relevance_response.text.upper()
+    return "YES" in relevance_response.text.upper()
+
+def start_diabetes_chat(chat_session):
+    """Create a Gemini chat session primed with the system prompt and the session's history"""
+    model = get_model(
+        "gemini-2.5-flash",
+        generation_config={
+            "response_mime_type": "text/plain",
+            "temperature": 0.7,
+        },
+        system_instruction=CHATBOT_SYSTEM_PROMPT
+    )
+    return model.start_chat(history=CHAT_SESSIONS.history(chat_session))
+
+def record_chat_turn(session_id, user_message, reply):
+    """Save an exchange, compacting the session's history in the background when it's over budget"""
+    if CHAT_SESSIONS.append(session_id, user_message, reply):
+        PIPELINE_EXECUTOR.submit(CHAT_SESSIONS.compact, session_id)
+
+def sse_event(data, event=None):
+    """Format one Server-Sent Event"""
+    payload = f"data: {json.dumps(data)}\n\n"
+    if event:
+        payload = f"event: {event}\n" + payload
+    return payload
+
+@bp.route("/api/chatbot", methods=['POST'])
+def chatbot():
+    """Diabetes assistant chatbot endpoint"""
+    try:
+        user_message, session_id, seed_history, error = parse_chat_request(request.get_json(silent=True))
+        if error:
+            return jsonify({'error': error}), 400
+        
+        log.debug("Chatbot request: %s", user_message)
+        session_id, chat_session = CHAT_SESSIONS.get_or_create(session_id, seed_history)
         
-        if not is_relevant:
-            response_text = "I'm specialized in diabetes care and can help with questions about glucose monitoring, nutrition, medications, and diabetes management. Is there anything diabetes-related I can help you with?"
+        # Check if the question is diabetes-related
+        if not is_diabetes_related(user_message):
+            record_chat_turn(session_id, user_message, OFF_TOPIC_RESPONSE)
             return jsonify({
                 'success': True,
-                'response': response_text
+                'response': OFF_TOPIC_RESPONSE,
+                'session_id': session_id
             }), 200
         
-        # Generate response using Gemini
-        model = genai.GenerativeModel(
-            "gemini-2.5-flash",
-            generation_config={
-                "response_mime_type": "text/plain",
-                "temperature": 0.7,
-            },
-            system_instruction=system_prompt
-        )
-        
         # Create chat session with history
-        chat = model.start_chat(history=messages)
+        chat = start_diabetes_chat(chat_session)
         
         # Send the user's message
-        response = chat.send_message(user_message)
-        response_text = response.text.strip()
+        with LIMITERS['gemini'], span('chat_send', upstream='gemini'):
+            response = chat.send_message(user_message)
+            response_text = response.text.strip()
         
-        print(f"Chatbot response: {response_text[:100]}...")
+        log.debug("Chatbot response: %s...", response_text[:100])
+        record_chat_turn(session_id, user_message, response_text)
         
         return jsonify({
             'success': True,
-            'response': response_text
+            'response': response_text,
+            'session_id': session_id
         }), 200
         
+    except UpstreamSaturated as e:
+        log.warning("Chatbot rejected: %s", e)
+        return busy_response({
+            'success': False,
+            'error': CHATBOT_BUSY_MESSAGE
+        })
     except Exception as e:
-        print(f"Chatbot error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Chatbot error: %s", e)
         return jsonify({
             'success': False,
             'error': 'An error occurred while processing your request'
         }), 500
 
+@bp.route("/api/chatbot/stream", methods=['POST'])
+def chatbot_stream():
+    """Diabetes assistant chatbot, streamed token by token as Server-Sent Events"""
+    user_message, session_id, seed_history, error = parse_chat_request(request.get_json(silent=True))
+    if error:
+        return jsonify({'error': error}), 400
+    
+    log.debug("Chatbot stream request: %s", user_message)
+    session_id, chat_session = CHAT_SESSIONS.get_or_create(session_id, seed_history)
+    
+    def generate():
+        try:
+            if not is_diabetes_related(user_message):
+                record_chat_turn(session_id, user_message, OFF_TOPIC_RESPONSE)
+                yield sse_event({'token': OFF_TOPIC_RESPONSE})
+                yield sse_event({'response': OFF_TOPIC_RESPONSE, 'session_id': session_id}, event='done')
+                return
+            
+            chat = start_diabetes_chat(chat_session)
+            response_text = ""
+            with LIMITERS['gemini'], span('chat_stream', upstream='gemini'):
+                for chunk in chat.send_message(user_message, stream=True):
+                    try:
+                        token = chunk.text
+                    except ValueError:
+                        # Chunks without text parts (e.g. the final finish_reason chunk)
+                        continue
+                    if token:
+                        response_text += token
+                        yield sse_event({'token': token})
+            
+            log.debug("Chatbot response: %s...", response_text[:100])
+            record_chat_turn(session_id, user_message, response_text.strip())
+            yield sse_event({'response': response_text.strip(), 'session_id': session_id}, event='done')
+        
+        except UpstreamSaturated as e:
+            log.warning("Chatbot stream rejected: %s", e)
+            yield sse_event({'error': CHATBOT_BUSY_MESSAGE, 'retry_after': RETRY_AFTER_SECONDS}, event='error')
+        except Exception as e:
+            log.exception("Chatbot stream error: %s", e)
+            yield sse_event({'error': 'An error occurred while processing your request'}, event='error')
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+@bp.cli.command("build-assets")
+def build_assets():
+    """Build the fingerprinted CSS/JS bundles, their gzip/brotli copies and WebP images"""
+    manifest = ASSETS.build()
+    for name, filename in sorted(manifest['files'].items()):
+        variants = ", ".join(manifest['encodings'][filename]) or "-"
+        click.echo(f"{name:<22} {filename:<36} {variants}")
+    click.echo(f"Wrote {len(manifest['files'])} assets to {ASSETS.output_dir}")
+
+@bp.cli.command("warm-nutrition")
+@click.option("--output", default=NUTRITION_TABLE_PATH, show_default=True,
+              help="Where to write the nutrition table")
+@click.option("--delay", default=0.2, show_default=True,
+              help="Seconds to wait between CalorieNinja calls")
+@click.option("--refresh", is_flag=True, help="Re-fetch foods already in the table")
+def warm_nutrition(output, delay, refresh):
+    """Fetch nutrition for every CALORIE_NINJA_FOODS item into the offline table"""
+    if not CALORIENINJA_API_KEY:
+        raise click.ClickException("CALORIENINJA_API_KEY is not set")
+
+    table = {} if refresh else load_nutrition_table(output)
+    missing = []
+    for food in sorted(set(normalize_food_key(f) for f in CALORIE_NINJA_FOODS)):
+        if food in table:
+            continue
+        try:
+            nutrition_data = fetch_nutrition_calorieninja(food)
+        except Exception as e:
+            nutrition_data = None
+            click.echo(f"CalorieNinja error for {food}: {e}", err=True)
+        if nutrition_data:
+            table[food] = nutrition_data
+            NUTRITION_CACHE.set(food, nutrition_data)
+            click.echo(f"✓ {food}")
+        else:
+            missing.append(food)
+            click.echo(f"✗ {food}")
+        time.sleep(delay)
+
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    compact = {
+        'fields': NUTRITION_FIELDS,
+        'foods': {
+            food: [nutrition.get(field, 0) for field in NUTRITION_FIELDS]
+            for food, nutrition in sorted(table.items())
+        }
+    }
+    tmp_path = output + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(compact, f, separators=(",", ":"))
+    os.replace(tmp_path, output)
+
+    click.echo(f"Wrote {len(table)} foods to {output}")
+    if missing:
+        click.echo(f"No nutrition found for: {', '.join(missing)}")
+
+def create_app(config=None):
+    """Build the Flask app.
+
+    Cheap by design: the Gemini, Gradio, Pillow and NumPy imports happen on
+    first use (or in the background via start_warm_up()), so new workers come
+    up fast.
+    """
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = os.environ.get("SECRET_KEY")
+    app.permanent_session_lifetime = timedelta(days=365)
+    if config:
+        app.config.update(config)
+    if not app.secret_key:
+        if not (app.debug or app.testing):
+            raise RuntimeError("SECRET_KEY must be set (it signs the session cookie that holds user ids)")
+        # Sessions only last as long as this dev server
+        app.secret_key = secrets.token_hex(32)
+        log.warning("SECRET_KEY is not set; using a random key for this debug session")
+    app.register_blueprint(bp)
+    return app
+
+# For `gunicorn main:app` and `flask --app main`; `python main.py` is the debug server
+app = create_app({'DEBUG': True} if __name__ == "__main__" else None)
+
 if __name__ == "__main__":
+    start_reminder_scheduler()
     app.run(host="0.0.0.0", port=5000, debug=True)
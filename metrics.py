@@ -0,0 +1,316 @@
+import glob
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+log = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from cache hits up to the slowest Gradio calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class _Metric:
+    def __init__(self, registry, name, documentation, labelnames):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def reset(self):
+        self._values = {}
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            self._values[key] = self._values.get(key, 0) + amount
+        self.registry.touch()
+
+    def snapshot(self):
+        return {json.dumps(key): value for key, value in self._values.items()}
+
+    @staticmethod
+    def merge(into, value):
+        return (into or 0) + value
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames, buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            state = self._values.get(key)
+            if state is None:
+                # per-bucket counts (last one is +Inf), then sum
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    break
+            else:
+                i = len(self.buckets)
+            state[i] += 1
+            state[-1] += value
+        self.registry.touch()
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        return {json.dumps(key): list(value) for key, value in self._values.items()}
+
+    @staticmethod
+    def merge(into, value):
+        if into is None:
+            return list(value)
+        return [a + b for a, b in zip(into, value)]
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class Registry:
+    """Counters and histograms in Prometheus text format.
+
+    Values live in process memory. With gunicorn each worker keeps its own, so
+    when multiproc_dir is set every process also dumps a snapshot there every
+    few seconds and render() sums all of them - any worker answering /metrics
+    then reports totals for the whole server. A worker's snapshot is removed
+    when it exits (remove_process, from gunicorn's child_exit hook), and
+    snapshots of processes that are no longer running are skipped and cleaned
+    up, so restarted workers don't leave stale counts behind.
+    """
+
+    def __init__(self, multiproc_dir=None, flush_interval=5):
+        self.multiproc_dir = multiproc_dir
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self._metrics = []
+        self._pid = os.getpid()
+        self._flusher = None
+        self._flusher_lock = threading.Lock()
+        if multiproc_dir:
+            os.makedirs(multiproc_dir, exist_ok=True)
+
+    def counter(self, name, documentation, labelnames=()):
+        metric = Counter(self, name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(self, name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    # ---------- multi-process snapshots ----------
+
+    def touch(self):
+        """Called on every update; (re)starts the snapshot thread in this process"""
+        if not self.multiproc_dir:
+            return
+        if self._pid != os.getpid():
+            # A forked worker starts from zero; its parent's counts are in the parent's file
+            with self.lock:
+                self._pid = os.getpid()
+                self._flusher = None
+                for metric in self._metrics:
+                    metric.reset()
+        if self._flusher is None:
+            with self._flusher_lock:
+                if self._flusher is None:
+                    self._flusher = threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True)
+                    self._flusher.start()
+
+    def _flush_loop(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def _snapshot(self):
+        with self.lock:
+            return {metric.name: metric.snapshot() for metric in self._metrics}
+
+    def flush(self):
+        """Write this process's values to multiproc_dir"""
+        if not self.multiproc_dir:
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.multiproc_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self._snapshot(), f)
+            os.replace(tmp_path, os.path.join(self.multiproc_dir, f"{os.getpid()}.json"))
+        except OSError as e:
+            log.warning("Metrics flush error: %s", e)
+
+    def remove_process(self, pid):
+        """Drop an exited process's snapshot"""
+        if not self.multiproc_dir:
+            return
+        try:
+            os.remove(os.path.join(self.multiproc_dir, f"{pid}.json"))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            log.warning("Metrics snapshot cleanup error: %s", e)
+
+    def _collect(self):
+        """Merged values of every live process, keyed by metric name then label key"""
+        snapshots = []
+        if self.multiproc_dir:
+            own = os.path.join(self.multiproc_dir, f"{os.getpid()}.json")
+            for path in glob.glob(os.path.join(self.multiproc_dir, '*.json')):
+                if path == own:
+                    continue
+                try:
+                    pid = int(os.path.basename(path)[:-len('.json')])
+                except ValueError:
+                    continue
+                if not _pid_alive(pid):
+                    self.remove_process(pid)
+                    continue
+                try:
+                    with open(path) as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        snapshots.append(self._snapshot())
+
+        merged = {}
+        for metric in self._metrics:
+            values = merged.setdefault(metric.name, {})
+            for snapshot in snapshots:
+                for key, value in snapshot.get(metric.name, {}).items():
+                    values[key] = metric.merge(values.get(key), value)
+        return merged
+
+    # ---------- exposition ----------
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        merged = self._collect()
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for key, value in sorted(merged[metric.name].items()):
+                labels = list(zip(metric.labelnames, json.loads(key)))
+                if metric.type == 'counter':
+                    lines.append(f"{metric.name}{_labels(labels)} {_number(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(metric.buckets + (float('inf'),), value[:-1]):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else _number(bound)
+                    lines.append(f"{metric.name}_bucket{_labels(labels + [('le', le)])} {cumulative}")
+                lines.append(f"{metric.name}_sum{_labels(labels)} {_number(value[-1])}")
+                lines.append(f"{metric.name}_count{_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    escaped = []
+    for name, value in pairs:
+        value = value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{name}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+
+def _number(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+# ---------- the app's metrics ----------
+
+REGISTRY = Registry(
+    multiproc_dir=os.environ.get("METRICS_DIR"),
+    flush_interval=float(os.environ.get("METRICS_FLUSH_SECONDS", 5)),
+)
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "glycogenie_stage_seconds",
+    "Time spent in each pipeline stage",
+    ["stage"],
+)
+UPSTREAM_REQUESTS = REGISTRY.counter(
+    "glycogenie_upstream_requests_total",
+    "Calls to Gradio, CalorieNinja and Gemini",
+    ["upstream"],
+)
+UPSTREAM_ERRORS = REGISTRY.counter(
+    "glycogenie_upstream_errors_total",
+    "Upstream calls that raised or returned an error",
+    ["upstream"],
+)
+UPSTREAM_REJECTED = REGISTRY.counter(
+    "glycogenie_upstream_rejected_total",
+    "Upstream calls refused by admission control (concurrency, rate or queue limit)",
+    ["upstream"],
+)
+SINGLEFLIGHT_SHARED = REGISTRY.counter(
+    "glycogenie_singleflight_shared_total",
+    "Calls that reused an identical in-flight upstream call instead of making their own",
+    ["upstream"],
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "glycogenie_cache_requests_total",
+    "Cache lookups by cache and result (hit/miss)",
+    ["cache", "result"],
+)
+REMINDER_DELIVERIES = REGISTRY.counter(
+    "glycogenie_reminder_deliveries_total",
+    "Reminder occurrences by outcome (delivered, failed, missed)",
+    ["result"],
+)
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "glycogenie_http_request_seconds",
+    "Request latency by endpoint and status",
+    ["endpoint", "method", "status"],
+)
+
+
+@contextmanager
+def span(stage, upstream=None):
+    """Time a pipeline stage; for upstream calls also count requests and errors"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        if upstream:
+            UPSTREAM_ERRORS.inc(upstream=upstream)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
+        if upstream:
+            UPSTREAM_REQUESTS.inc(upstream=upstream)
@@ -0,0 +1,105 @@
+import math
+import re
+
+# Weighted vocabulary for the chatbot's diabetes relevance gate. Positive terms
+# pull a message on-topic, negative terms push it off-topic. Multi-word terms
+# are matched as phrases. Words are compared after a light plural strip.
+TERM_WEIGHTS = {
+    # Core diabetes terms: any one of these is enough on its own
+    "diabetes": 4.0, "diabetic": 4.0, "prediabetes": 4.0, "prediabetic": 4.0,
+    "insulin": 4.0, "glucose": 4.0, "blood sugar": 4.0, "a1c": 4.0, "hba1c": 4.0,
+    "hypoglycemia": 4.0, "hyperglycemia": 4.0, "hypo": 3.0, "hyper": 2.0,
+    "metformin": 4.0, "ozempic": 4.0, "semaglutide": 4.0, "jardiance": 4.0,
+    "glipizide": 4.0, "januvia": 4.0, "trulicity": 4.0, "mounjaro": 4.0,
+    "glp-1": 4.0, "sglt2": 4.0, "cgm": 4.0, "dexcom": 4.0, "libre": 3.0,
+    "glucometer": 4.0, "lancet": 3.0, "bolus": 4.0, "basal": 4.0,
+    "ketone": 4.0, "ketoacidosis": 4.0, "dka": 4.0, "type 1": 3.0, "type 2": 3.0,
+    "t1d": 4.0, "t2d": 4.0, "endocrinologist": 4.0, "pancrea": 3.0,
+    "carb": 3.0, "carbohydrate": 3.0, "glycemic": 4.0, "sugar level": 4.0,
+    "fasting sugar": 4.0, "sugar spike": 4.0, "mg/dl": 4.0, "mmol": 4.0,
+    "neuropathy": 3.5, "retinopathy": 3.5, "nephropathy": 3.5,
+
+    # Related care topics: on-topic in context, weaker alone
+    "sugar": 1.5, "diet": 1.5, "meal": 1.5, "food": 1.2, "eat": 1.2, "eating": 1.2,
+    "nutrition": 1.5, "snack": 1.5, "breakfast": 1.2, "lunch": 1.0, "dinner": 1.0,
+    "fiber": 1.5, "protein": 1.0, "calorie": 1.2, "sweetener": 2.0, "fruit": 1.0,
+    "dessert": 1.2, "weight": 1.2, "exercise": 1.2, "workout": 1.0, "walk": 0.5,
+    "medication": 1.5, "medicine": 1.2, "dose": 1.5, "pill": 1.0, "injection": 2.0,
+    "pump": 1.5, "doctor": 1.0, "symptom": 1.5, "thirst": 2.0, "thirsty": 2.0,
+    "urination": 2.0, "pee": 1.0, "numb": 2.0, "numbness": 2.0, "tingling": 2.0,
+    "foot": 1.0, "feet": 1.0, "wound": 1.5, "heal": 1.0, "blurry": 1.5, "vision": 1.0,
+    "kidney": 1.5, "heart": 0.8, "cholesterol": 1.5, "blood pressure": 1.5,
+    "tired": 1.0, "fatigue": 1.0, "dizzy": 1.2, "shaky": 1.5, "sweaty": 1.0,
+    "reading": 1.0, "level": 0.8, "monitor": 1.5, "test": 0.5, "check": 0.5,
+    "healthy": 1.0, "health": 1.0, "low": 0.5, "high": 0.5,
+
+    # Clearly unrelated topics
+    "weather": -3.0, "movie": -3.0, "film": -2.5, "song": -3.0, "music": -2.5,
+    "football": -3.0, "soccer": -3.0, "basketball": -3.0, "baseball": -3.0,
+    "game": -2.0, "video game": -3.0, "stock": -2.5, "bitcoin": -3.0, "crypto": -3.0,
+    "python": -3.0, "javascript": -3.0, "code": -2.0, "programming": -3.0,
+    "capital": -2.0, "president": -2.5, "election": -3.0, "politics": -3.0,
+    "homework": -2.5, "essay": -2.0, "poem": -3.0, "joke": -3.0, "story": -2.0,
+    "car": -2.0, "travel": -1.5, "vacation": -1.5,
+    "history": -1.5, "math": -2.5, "translate": -3.0, "celebrity": -3.0,
+}
+
+# Logistic model over the summed weights: p = sigmoid(BIAS + SCALE * score)
+BIAS = -1.0
+SCALE = 1.0
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9/\-]*")
+
+
+def _normalize(word):
+    """Very light stemming so 'carbs' matches 'carb' and 'symptoms' matches 'symptom'"""
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+_SINGLE_TERMS = {_normalize(t): w for t, w in TERM_WEIGHTS.items() if " " not in t}
+_PHRASE_TERMS = {
+    " " + " ".join(_normalize(w) for w in t.split()) + " ": w
+    for t, w in TERM_WEIGHTS.items() if " " in t
+}
+# Prefix terms like "pancrea" match pancreas/pancreatic
+_PREFIX_TERMS = {"pancrea": TERM_WEIGHTS["pancrea"]}
+
+
+def relevance_score(message):
+    """Probability (0-1) that a chat message is diabetes-related"""
+    text = message.lower()
+    words = [_normalize(w) for w in TOKEN_RE.findall(text)]
+    joined = " " + " ".join(words) + " "
+
+    score = 0.0
+    seen = set()
+    for word in words:
+        if word in seen:
+            continue
+        seen.add(word)
+        weight = _SINGLE_TERMS.get(word)
+        if weight is None:
+            for prefix, prefix_weight in _PREFIX_TERMS.items():
+                if word.startswith(prefix):
+                    weight = prefix_weight
+                    break
+        if weight:
+            score += weight
+
+    for phrase, weight in _PHRASE_TERMS.items():
+        if phrase in joined:
+            score += weight
+
+    return 1.0 / (1.0 + math.exp(-(BIAS + SCALE * score)))
+
+
+def classify_relevance(message, low=0.2, high=0.8):
+    """True/False when the local model is confident, None when the LLM should decide"""
+    probability = relevance_score(message)
+    if probability >= high:
+        return True
+    if probability <= low:
+        return False
+    return None
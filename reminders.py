@@ -0,0 +1,511 @@
+import calendar
+import heapq
+import itertools
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from datetime import date as date_cls, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from db import SQLiteDB
+from metrics import REMINDER_DELIVERIES
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reminders (
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    note TEXT NOT NULL,
+    date TEXT NOT NULL,               -- first occurrence, local 'YYYY-MM-DD'
+    time TEXT,                        -- local 'HH:MM', NULL for all-day
+    tz TEXT NOT NULL,                 -- IANA zone of the browser that saved it
+    repeat TEXT NOT NULL,             -- none | daily | weekly | monthly
+    next_fire_at REAL,                -- UTC epoch of the next occurrence, NULL when done
+    version INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (user_id, id)
+);
+CREATE INDEX IF NOT EXISTS idx_reminders_next
+    ON reminders (next_fire_at) WHERE next_fire_at IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_reminders_updated ON reminders (updated_at);
+
+-- Which process runs the scheduler; a lease so exactly one worker delivers
+CREATE TABLE IF NOT EXISTS scheduler_lease (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+REPEATS = ('none', 'daily', 'weekly', 'monthly')
+
+# All-day reminders go off at this local time
+DEFAULT_TIME = os.environ.get("REMINDER_DEFAULT_TIME", "09:00")
+
+COLUMNS = "id, title, note, date, time, tz, repeat, next_fire_at"
+
+
+def _zone(name):
+    try:
+        return ZoneInfo(name or 'UTC')
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo('UTC')
+
+
+def _add_months(day, months):
+    """Same day of the month, clamped to the month's length (Jan 31 -> Feb 28)"""
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return day.replace(year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def next_occurrence(reminder, after):
+    """UTC epoch of the first occurrence strictly after `after`, or None.
+
+    Computed arithmetically from the first date and the repeat rule, so a
+    daily reminder set years ago costs the same as a new one; occurrences are
+    never materialized. Wall-clock times are kept across DST changes.
+    """
+    zone = _zone(reminder.get('tz'))
+    first_day = date_cls.fromisoformat(reminder['date'])
+    hour, minute = (int(part) for part in (reminder.get('time') or DEFAULT_TIME)[:5].split(':'))
+    repeat = reminder.get('repeat') or 'none'
+
+    def at(day):
+        return datetime(day.year, day.month, day.day, hour, minute, tzinfo=zone).timestamp()
+
+    if repeat == 'none':
+        fire_at = at(first_day)
+        return fire_at if fire_at > after else None
+
+    after_day = datetime.fromtimestamp(after, zone).date()
+    if repeat == 'monthly':
+        months = max((after_day.year - first_day.year) * 12 + after_day.month - first_day.month - 1, 0)
+        candidates = (_add_months(first_day, months + i) for i in range(3))
+    else:
+        step = 1 if repeat == 'daily' else 7
+        steps = max((after_day - first_day).days // step - 1, 0)
+        candidates = (first_day + timedelta(days=(steps + i) * step) for i in range(4))
+    for day in candidates:
+        fire_at = at(day)
+        if fire_at > after:
+            return fire_at
+    return None
+
+
+def reminder_to_row(user_id, reminder, now):
+    """Validate a reminders.html reminder dict and turn it into a table row"""
+    if not isinstance(reminder, dict):
+        raise ValueError("each reminder must be an object")
+    for field in ('id', 'title', 'note', 'date', 'time', 'tz', 'repeat'):
+        if reminder.get(field) is not None and not isinstance(reminder[field], str):
+            raise ValueError(f"{field} must be a string")
+    reminder_id = str(reminder.get('id') or '').strip()
+    title = str(reminder.get('title') or '').strip()
+    day = str(reminder.get('date') or '').strip()
+    if not reminder_id or not title or not day:
+        raise ValueError("id, title and date are required")
+    date_cls.fromisoformat(day)
+    time_of_day = str(reminder.get('time') or '').strip()[:5] or None
+    if time_of_day:
+        datetime.strptime(time_of_day, "%H:%M")
+    repeat = reminder.get('repeat') or 'none'
+    if repeat not in REPEATS:
+        raise ValueError(f"repeat must be one of {', '.join(REPEATS)}")
+    tz = _zone(reminder.get('tz')).key
+
+    values = {'date': day, 'time': time_of_day, 'tz': tz, 'repeat': repeat}
+    return (
+        user_id, reminder_id, title, str(reminder.get('note') or '').strip(),
+        day, time_of_day, tz, repeat, next_occurrence(values, now), now,
+    )
+
+
+def row_to_reminder(row):
+    reminder_id, title, note, day, time_of_day, tz, repeat, next_fire_at = row
+    return {
+        'id': reminder_id,
+        'title': title,
+        'note': note,
+        'date': day,
+        'time': time_of_day or '',
+        'tz': tz,
+        'repeat': repeat,
+        'next_at': datetime.fromtimestamp(next_fire_at, timezone.utc).isoformat() if next_fire_at else None,
+    }
+
+
+class ReminderStore:
+    """Per-user reminders in SQLite, with each one's next occurrence precomputed and indexed"""
+
+    def __init__(self, db_path):
+        self.db = SQLiteDB(db_path, schema=SCHEMA)
+
+    def list_reminders(self, user_id):
+        rows = self.db.execute(
+            f"SELECT {COLUMNS} FROM reminders WHERE user_id = ? ORDER BY date, time", (user_id,)
+        ).fetchall()
+        return [row_to_reminder(row) for row in rows]
+
+    def upsert(self, user_id, reminders, now=None, replace=True):
+        """Insert or replace reminders, recomputing their next occurrence; returns how many.
+
+        Reminders whose fields haven't changed are left alone (keeping their
+        version and pending retries) and not counted. With replace=False, ids
+        the user already has are never updated.
+        """
+        now = now if now is not None else time.time()
+        rows = [reminder_to_row(user_id, reminder, now) for reminder in reminders]
+        on_conflict = (
+            "DO UPDATE SET title = excluded.title, note = excluded.note, "
+            "date = excluded.date, time = excluded.time, tz = excluded.tz, repeat = excluded.repeat, "
+            "next_fire_at = excluded.next_fire_at, version = reminders.version + 1, "
+            "updated_at = excluded.updated_at "
+            "WHERE (title, note, date, time, tz, repeat) IS NOT "
+            "(excluded.title, excluded.note, excluded.date, excluded.time, excluded.tz, excluded.repeat)"
+        ) if replace else "DO NOTHING"
+        with self.db.transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT INTO reminders (user_id, id, title, note, date, time, tz, repeat, "
+                "next_fire_at, version, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 1, ?) "
+                f"ON CONFLICT (user_id, id) {on_conflict}",
+                rows
+            )
+            return conn.total_changes - before
+
+    def clear(self, user_id):
+        cursor = self.db.execute("DELETE FROM reminders WHERE user_id = ?", (user_id,))
+        return cursor.rowcount
+
+    def delete(self, user_id, reminder_id):
+        cursor = self.db.execute(
+            "DELETE FROM reminders WHERE user_id = ? AND id = ?", (user_id, reminder_id)
+        )
+        return cursor.rowcount > 0
+
+    # ---------- scheduler queries ----------
+
+    def active(self):
+        """(next_fire_at, user_id, id, version) for every reminder with an occurrence left"""
+        return self.db.execute(
+            "SELECT next_fire_at, user_id, id, version FROM reminders WHERE next_fire_at IS NOT NULL"
+        ).fetchall()
+
+    def changed_since(self, since):
+        return self.db.execute(
+            "SELECT next_fire_at, user_id, id, version, updated_at FROM reminders "
+            "WHERE updated_at >= ? AND next_fire_at IS NOT NULL",
+            (since,)
+        ).fetchall()
+
+    def get_for_delivery(self, user_id, reminder_id):
+        row = self.db.execute(
+            f"SELECT {COLUMNS}, version FROM reminders WHERE user_id = ? AND id = ?",
+            (user_id, reminder_id)
+        ).fetchone()
+        if row is None:
+            return None
+        reminder = dict(zip(('id', 'title', 'note', 'date', 'time', 'tz', 'repeat', 'next_fire_at', 'version'), row))
+        reminder['user_id'] = user_id
+        return reminder
+
+    def advance(self, rows):
+        """Set next_fire_at for (next_fire_at, user_id, id, version) rows in one transaction.
+
+        Rows whose version changed meanwhile (edited since they were read) are
+        left alone; the edit already scheduled them.
+        """
+        with self.db.transaction() as conn:
+            conn.executemany(
+                "UPDATE reminders SET next_fire_at = ? WHERE user_id = ? AND id = ? AND version = ?",
+                rows
+            )
+
+    def acquire_lease(self, name, holder, seconds, now=None):
+        """Take or renew a named lease; True if `holder` has it"""
+        now = now if now is not None else time.time()
+        try:
+            with self.db.transaction() as conn:
+                row = conn.execute(
+                    "SELECT holder, expires_at FROM scheduler_lease WHERE name = ?", (name,)
+                ).fetchone()
+                if row is not None and row[0] != holder and row[1] > now:
+                    return False
+                conn.execute(
+                    "INSERT OR REPLACE INTO scheduler_lease (name, holder, expires_at) VALUES (?, ?, ?)",
+                    (name, holder, now + seconds)
+                )
+            return True
+        except sqlite3.Error as e:
+            log.warning("Reminder lease error: %s", e)
+            return False
+
+    def release_lease(self, name, holder):
+        self.db.execute("DELETE FROM scheduler_lease WHERE name = ? AND holder = ?", (name, holder))
+
+
+# ---------- delivery sinks ----------
+
+def delivery_payload(reminder, scheduled_for):
+    zone = _zone(reminder['tz'])
+    return {
+        'user_id': reminder['user_id'],
+        'id': reminder['id'],
+        'title': reminder['title'],
+        'note': reminder['note'],
+        'repeat': reminder['repeat'],
+        'scheduled_for': datetime.fromtimestamp(scheduled_for, timezone.utc).isoformat(),
+        'local_time': datetime.fromtimestamp(scheduled_for, zone).isoformat(),
+    }
+
+
+class LogSink:
+    """Logs each due reminder at INFO; the default until a real channel is configured.
+
+    Only the reminder's id and time are logged, never who it's for or what it says.
+    """
+
+    def deliver(self, payload):
+        log.info("Reminder %s due at %s", payload['id'], payload['local_time'])
+
+
+class WebhookSink:
+    """POSTs each due reminder as JSON; any non-2xx response counts as a failed delivery"""
+
+    def __init__(self, url, session_factory, timeout=5):
+        self.url = url
+        self.session_factory = session_factory
+        self.timeout = timeout
+
+    def deliver(self, payload):
+        response = self.session_factory().post(self.url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+
+
+class MemorySink:
+    """Keeps deliveries in a list, for benchmarks and local testing"""
+
+    def __init__(self):
+        self.delivered = []
+
+    def deliver(self, payload):
+        self.delivered.append(payload)
+
+
+# ---------- scheduler ----------
+
+class ReminderScheduler:
+    """Fires due reminders from a min-heap of next occurrences.
+
+    The heap holds one (due_at, seq, user_id, id, version, fire_at) entry
+    per active reminder (due_at is fire_at, or later for a retry), so waking up and popping the next due one is O(log n) however
+    many are scheduled. When a reminder fires, its following occurrence is
+    computed and pushed; recurring reminders never expand into a list.
+
+    Edits and deletes don't touch the heap. Every popped entry is checked
+    against the database (same version and next_fire_at) before delivery,
+    and stale entries are simply dropped. Changes saved by other workers are
+    picked up by polling updated_at.
+
+    Only the worker holding the 'reminders' lease runs the loop, so each
+    occurrence is delivered once however many gunicorn workers there are.
+    Delivery is at least once: a failed delivery is retried after
+    retry_delay up to max_attempts times before moving on. Occurrences more
+    than grace_seconds late (the server was down) are skipped, not sent.
+    """
+
+    LEASE_NAME = 'reminders'
+
+    def __init__(self, store, sink, clock=time.time, poll_interval=1.0, grace_seconds=3600,
+                 lease_seconds=15, retry_delay=60, max_attempts=3):
+        self.store = store
+        self.sink = sink
+        self.clock = clock
+        self.poll_interval = poll_interval
+        self.grace_seconds = grace_seconds
+        self.lease_seconds = lease_seconds
+        self.retry_delay = retry_delay
+        self.max_attempts = max_attempts
+        self._reset()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self.holder = f"{socket.gethostname()}:{os.getpid()}"
+        self._heap = []
+        self._seq = itertools.count()
+        self._attempts = {}
+        self._synced_at = None
+        self._last_synced = {}
+        self._leader = False
+        self._thread = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._stats = {'delivered': 0, 'failed': 0, 'missed': 0, 'stale': 0}
+
+    def _push(self, fire_at, user_id, reminder_id, version, due_at=None):
+        heapq.heappush(self._heap, (
+            due_at if due_at is not None else fire_at, next(self._seq), user_id, reminder_id, version, fire_at
+        ))
+
+    def load(self):
+        """Rebuild the heap from every active reminder (heapify is O(n))"""
+        now = self.clock()
+        self._heap = [
+            (fire_at, next(self._seq), user_id, reminder_id, version, fire_at)
+            for fire_at, user_id, reminder_id, version in self.store.active()
+        ]
+        heapq.heapify(self._heap)
+        self._synced_at = now
+        return len(self._heap)
+
+    def sync(self):
+        """Push reminders created or edited since the last load/sync"""
+        if self._synced_at is None:
+            return self.load()
+        now = self.clock()
+        # Overlap by a second so a write landing during the previous query isn't
+        # missed, skipping rows the previous sync already pushed
+        rows = self.store.changed_since(self._synced_at - 1)
+        synced = {}
+        pushed = 0
+        for fire_at, user_id, reminder_id, version, _ in rows:
+            key = (user_id, reminder_id)
+            synced[key] = version
+            if self._last_synced.get(key) != version:
+                self._push(fire_at, user_id, reminder_id, version)
+                pushed += 1
+        self._last_synced = synced
+        self._synced_at = now
+        return pushed
+
+    def run_due(self, now=None):
+        """Deliver everything due at `now`; returns how many were delivered"""
+        now = now if now is not None else self.clock()
+        delivered = 0
+        # Next occurrences are written in one transaction at the end; until then
+        # the database is behind, so reminders fired in this run are checked
+        # against `advanced` instead
+        advanced = {}
+        try:
+            while self._heap and self._heap[0][0] <= now:
+                _, _, user_id, reminder_id, version, fire_at = heapq.heappop(self._heap)
+                key = (user_id, reminder_id)
+                if key in advanced:
+                    reminder = advanced[key][0]
+                else:
+                    reminder = self.store.get_for_delivery(user_id, reminder_id)
+                if reminder is None or reminder['version'] != version or reminder['next_fire_at'] != fire_at:
+                    self._stats['stale'] += 1
+                    continue
+
+                if now - fire_at > self.grace_seconds:
+                    self._stats['missed'] += 1
+                    REMINDER_DELIVERIES.inc(result='missed')
+                elif not self._deliver(reminder, fire_at, now):
+                    continue
+                else:
+                    delivered += 1
+
+                next_fire_at = next_occurrence(reminder, max(fire_at, now - self.grace_seconds))
+                advanced[key] = (dict(reminder, next_fire_at=next_fire_at), next_fire_at)
+                if next_fire_at is not None:
+                    self._push(next_fire_at, user_id, reminder_id, version)
+        finally:
+            if advanced:
+                self.store.advance([
+                    (next_fire_at, user_id, reminder_id, reminder['version'])
+                    for (user_id, reminder_id), (reminder, next_fire_at) in advanced.items()
+                ])
+        return delivered
+
+    def _deliver(self, reminder, fire_at, now):
+        """Send one occurrence; False if it was rescheduled for a retry"""
+        key = (reminder['user_id'], reminder['id'], fire_at)
+        try:
+            self.sink.deliver(delivery_payload(reminder, fire_at))
+        except Exception as e:
+            attempts = self._attempts.get(key, 0) + 1
+            self._stats['failed'] += 1
+            REMINDER_DELIVERIES.inc(result='failed')
+            log.warning("Reminder delivery failed (attempt %d): %s", attempts, e)
+            if attempts < self.max_attempts:
+                self._attempts[key] = attempts
+                # Same fire_at, so the entry still matches the row when it comes back round
+                self._push(fire_at, reminder['user_id'], reminder['id'], reminder['version'],
+                           due_at=now + self.retry_delay)
+                return False
+            self._attempts.pop(key, None)
+            return True
+        self._attempts.pop(key, None)
+        self._stats['delivered'] += 1
+        REMINDER_DELIVERIES.inc(result='delivered')
+        return True
+
+    def next_fire_at(self):
+        return self._heap[0][0] if self._heap else None
+
+    # ---------- background loop ----------
+
+    def start(self):
+        """Run the scheduler loop in a daemon thread (idempotent)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="reminder-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._leader:
+            self.store.release_lease(self.LEASE_NAME, self.holder)
+            self._leader = False
+
+    def wake(self):
+        """Re-check the database now (called after this worker saves a reminder)"""
+        self._wake.set()
+
+    def _loop(self):
+        lease_renewed = 0.0
+        while not self._stop.is_set():
+            now = self.clock()
+            if now - lease_renewed >= self.lease_seconds / 3:
+                leader = self.store.acquire_lease(self.LEASE_NAME, self.holder, self.lease_seconds, now)
+                lease_renewed = now
+                if leader and not self._leader:
+                    self.load()
+                elif not leader:
+                    self._heap = []
+                    self._synced_at = None
+                self._leader = leader
+            if not self._leader:
+                self._stop.wait(self.lease_seconds / 3)
+                continue
+
+            try:
+                self.sync()
+                self.run_due(now)
+            except Exception:
+                log.exception("Reminder scheduler error")
+
+            next_fire_at = self.next_fire_at()
+            wait = self.poll_interval
+            if next_fire_at is not None:
+                wait = min(wait, max(next_fire_at - self.clock(), 0))
+            self._wake.wait(wait)
+            self._wake.clear()
+
+    def stats(self):
+        return dict(
+            self._stats,
+            pid=os.getpid(),
+            leader=self._leader,
+            scheduled=len(self._heap),
+            next_fire_at=self.next_fire_at(),
+        )
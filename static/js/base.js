@@ -0,0 +1,141 @@
+// Initialize Lucide icons once
+lucide.createIcons();
+
+// Custom notification system
+window.showNotification = function(options) {
+  const modal = document.getElementById('customNotificationModal');
+  const content = document.getElementById('customNotificationContent');
+  const icon = document.getElementById('customNotificationIcon');
+  const title = document.getElementById('customNotificationTitle');
+  const message = document.getElementById('customNotificationMessage');
+  const buttons = document.getElementById('customNotificationButtons');
+
+  // Set content
+  title.textContent = options.title || 'Notification';
+  message.textContent = options.message || '';
+
+  // Set icon
+  icon.innerHTML = '';
+  const iconElement = document.createElement('div');
+  iconElement.innerHTML = options.icon || '<i data-lucide="info" style="width: 32px; height: 32px;"></i>';
+  icon.appendChild(iconElement);
+
+  // Set icon background color
+  const iconColors = {
+    success: 'linear-gradient(135deg, #dcfce7 0%, #bbf7d0 100%)',
+    error: 'linear-gradient(135deg, #fee2e2 0%, #fecaca 100%)',
+    warning: 'linear-gradient(135deg, #fef3c7 0%, #fde68a 100%)',
+    info: 'linear-gradient(135deg, #dbeafe 0%, #bfdbfe 100%)'
+  };
+  icon.style.background = iconColors[options.type] || iconColors.info;
+
+  // Create buttons
+  buttons.innerHTML = '';
+  if (options.buttons && options.buttons.length > 0) {
+    options.buttons.forEach(btn => {
+      const button = document.createElement('button');
+      button.textContent = btn.text;
+      button.className = 'notification-btn';
+      if (btn.type === 'secondary') button.classList.add('notification-btn-secondary');
+      if (btn.type === 'danger') button.classList.add('notification-btn-danger');
+      button.onclick = () => {
+        modal.style.display = 'none';
+        if (btn.onClick) btn.onClick();
+      };
+      buttons.appendChild(button);
+    });
+  } else {
+    const okButton = document.createElement('button');
+    okButton.textContent = 'OK';
+    okButton.className = 'notification-btn';
+    okButton.onclick = () => {
+      modal.style.display = 'none';
+      if (options.onClose) options.onClose();
+    };
+    buttons.appendChild(okButton);
+  }
+
+  // Show modal
+  modal.style.display = 'flex';
+
+  // Reinitialize Lucide icons
+  lucide.createIcons();
+};
+
+// Custom confirm dialog
+window.showConfirm = function(options) {
+  return new Promise((resolve) => {
+    window.showNotification({
+      title: options.title || 'Confirm',
+      message: options.message || 'Are you sure?',
+      type: options.type || 'warning',
+      icon: options.icon || '<i data-lucide="alert-triangle" style="width: 32px; height: 32px; color: #f59e0b;"></i>',
+      buttons: [
+        {
+          text: options.confirmText || 'Confirm',
+          type: options.confirmType || 'primary',
+          onClick: () => resolve(true)
+        },
+        {
+          text: options.cancelText || 'Cancel',
+          type: 'secondary',
+          onClick: () => resolve(false)
+        }
+      ]
+    });
+  });
+};
+
+// Custom alert (for simple messages)
+window.showAlert = function(message, type = 'info', title = null) {
+  const icons = {
+    success: '<i data-lucide="check-circle" style="width: 32px; height: 32px; color: #22c55e;"></i>',
+    error: '<i data-lucide="x-circle" style="width: 32px; height: 32px; color: #ef4444;"></i>',
+    warning: '<i data-lucide="alert-triangle" style="width: 32px; height: 32px; color: #f59e0b;"></i>',
+    info: '<i data-lucide="info" style="width: 32px; height: 32px; color: #3b82f6;"></i>'
+  };
+
+  const titles = {
+    success: 'Success',
+    error: 'Error',
+    warning: 'Warning',
+    info: 'Information'
+  };
+
+  window.showNotification({
+    title: title || titles[type] || 'Notification',
+    message: message,
+    type: type,
+    icon: icons[type] || icons.info
+  });
+};
+
+const menuToggle = document.getElementById('menuToggle');
+const sidebar = document.getElementById('sidebar');
+const overlay = document.getElementById('sidebarOverlay');
+const navLinks = document.querySelectorAll('.nav-links a');
+
+function toggleSidebar() {
+  sidebar.classList.toggle('open');
+  overlay.classList.toggle('active');
+  menuToggle.classList.toggle('active');
+}
+
+function closeSidebar() {
+  sidebar.classList.remove('open');
+  overlay.classList.remove('active');
+  menuToggle.classList.remove('active');
+}
+
+menuToggle.addEventListener('click', toggleSidebar);
+overlay.addEventListener('click', closeSidebar);
+
+navLinks.forEach(link => {
+  link.addEventListener('click', closeSidebar);
+});
+
+document.addEventListener('keydown', (e) => {
+  if (e.key === 'Escape' && sidebar.classList.contains('open')) {
+    closeSidebar();
+  }
+});
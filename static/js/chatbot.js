@@ -0,0 +1,192 @@
+(function() {
+  const chatbotToggle = document.getElementById('chatbot-toggle');
+  const chatbotWindow = document.getElementById('chatbot-window');
+  const chatbotClose = document.getElementById('chatbot-close');
+  const chatbotInput = document.getElementById('chatbot-input');
+  const chatbotSend = document.getElementById('chatbot-send');
+  const chatbotMessages = document.getElementById('chatbot-messages');
+  const chatbotLoading = document.getElementById('chatbot-loading');
+
+  // The conversation is kept server-side; the page only remembers which one it is
+  let chatSessionId = null;
+
+  // Toggle chatbot window
+  chatbotToggle.addEventListener('click', function() {
+    chatbotWindow.classList.toggle('active');
+    if (chatbotWindow.classList.contains('active')) {
+      chatbotInput.focus();
+    }
+    // Reinitialize icons when window opens
+    setTimeout(() => lucide.createIcons(), 100);
+  });
+
+  // Close chatbot
+  chatbotClose.addEventListener('click', function() {
+    chatbotWindow.classList.remove('active');
+  });
+
+  // Auto-resize textarea
+  chatbotInput.addEventListener('input', function() {
+    this.style.height = 'auto';
+    this.style.height = Math.min(this.scrollHeight, 120) + 'px';
+  });
+
+  // Send message on Enter (Shift+Enter for new line)
+  chatbotInput.addEventListener('keydown', function(e) {
+    if (e.key === 'Enter' && !e.shiftKey) {
+      e.preventDefault();
+      sendMessage();
+    }
+  });
+
+  // Send message on button click
+  chatbotSend.addEventListener('click', sendMessage);
+
+  function formatMessage(content) {
+    // Convert markdown-style formatting to HTML
+    let formattedContent = content
+      .replace(/\*\*(.*?)\*\*/g, '<strong>$1</strong>')
+      .replace(/\n\n/g, '</p><p>')
+      .replace(/\n/g, '<br>');
+
+    return `<p>${formattedContent}</p>`;
+  }
+
+  function addMessage(content, isUser = false) {
+    const messageDiv = document.createElement('div');
+    messageDiv.className = `chatbot-message ${isUser ? 'user-message' : 'bot-message'}`;
+
+    const avatar = document.createElement('div');
+    avatar.className = 'message-avatar';
+    avatar.innerHTML = `<i data-lucide="${isUser ? 'user' : 'bot'}"></i>`;
+
+    const contentDiv = document.createElement('div');
+    contentDiv.className = 'message-content';
+
+    if (typeof content === 'string') {
+      contentDiv.innerHTML = formatMessage(content);
+    } else {
+      contentDiv.appendChild(content);
+    }
+
+    messageDiv.appendChild(avatar);
+    messageDiv.appendChild(contentDiv);
+    chatbotMessages.appendChild(messageDiv);
+
+    // Scroll to bottom
+    chatbotMessages.scrollTop = chatbotMessages.scrollHeight;
+
+    // Reinitialize Lucide icons
+    lucide.createIcons();
+
+    return contentDiv;
+  }
+
+  // Read a text/event-stream response, calling onEvent(eventName, data) per event
+  async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const rawEvent = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+
+        let eventName = 'message';
+        let data = '';
+        rawEvent.split('\n').forEach(line => {
+          if (line.startsWith('event: ')) eventName = line.slice(7);
+          else if (line.startsWith('data: ')) data += line.slice(6);
+        });
+        if (data) onEvent(eventName, JSON.parse(data));
+      }
+    }
+  }
+
+  async function sendMessage() {
+    const message = chatbotInput.value.trim();
+    if (!message) return;
+
+    // Disable input and button
+    chatbotInput.disabled = true;
+    chatbotSend.disabled = true;
+
+    // Add user message
+    addMessage(message, true);
+
+    // Clear input
+    chatbotInput.value = '';
+    chatbotInput.style.height = 'auto';
+
+    // Show loading
+    chatbotLoading.style.display = 'block';
+
+    try {
+      const response = await fetch('/api/chatbot/stream', {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({
+          message: message,
+          session_id: chatSessionId
+        })
+      });
+
+      if (!response.ok || !response.body) {
+        throw new Error(`Chatbot request failed (${response.status})`);
+      }
+
+      // Render tokens into a single bot message as they arrive
+      let botContent = null;
+      let responseText = '';
+      let failed = false;
+      let errorMessage = null;
+
+      await readEventStream(response, (eventName, data) => {
+        if (eventName === 'error') {
+          failed = true;
+          errorMessage = data.error || null;
+          return;
+        }
+        if (eventName === 'done') {
+          responseText = data.response || responseText;
+          chatSessionId = data.session_id || chatSessionId;
+        } else if (data.token) {
+          responseText += data.token;
+        }
+        if (!botContent) {
+          chatbotLoading.style.display = 'none';
+          botContent = addMessage(responseText, false);
+        } else {
+          botContent.innerHTML = formatMessage(responseText);
+          chatbotMessages.scrollTop = chatbotMessages.scrollHeight;
+        }
+      });
+
+      if (failed || !responseText) {
+        addMessage(errorMessage || 'I apologize, but I encountered an error. Please try again.', false);
+      }
+    } catch (error) {
+      console.error('Chatbot error:', error);
+      addMessage('I apologize, but I\'m having trouble connecting right now. Please try again in a moment.', false);
+    } finally {
+      // Hide loading
+      chatbotLoading.style.display = 'none';
+
+      // Re-enable input and button
+      chatbotInput.disabled = false;
+      chatbotSend.disabled = false;
+      chatbotInput.focus();
+    }
+  }
+
+  // Initialize Lucide icons for chatbot
+  lucide.createIcons();
+})();
@@ -0,0 +1,955 @@
+// Initialize Lucide icons
+lucide.createIcons();
+
+// Set default date and time to now
+const now = new Date();
+document.getElementById('logDate').valueAsDate = now;
+document.getElementById('logTime').value = now.toTimeString().slice(0, 5);
+
+// Generate unique ID
+function generateId() {
+  return 'glucose_' + Date.now() + '_' + Math.random().toString(36).substr(2, 9);
+}
+
+// ============== GLUCOSE API ==============
+// Entries live on the server; the page only fetches the window it renders.
+const LOG_PAGE_SIZE = 50;
+let logCursor = null;
+
+async function glucoseApi(path, options = {}) {
+  const response = await fetch('/api/glucose' + path, {
+    headers: { 'Content-Type': 'application/json' },
+    ...options
+  });
+  const data = await response.json();
+  if (!response.ok) {
+    throw new Error(data.error || 'Glucose API request failed');
+  }
+  return data;
+}
+
+// Fetch entries, newest first unless order is 'asc'
+async function fetchEntries({ start = null, end = null, limit = LOG_PAGE_SIZE, cursor = null, order = 'desc' } = {}) {
+  const params = new URLSearchParams({ limit: limit, order: order });
+  if (start) params.set('start', start);
+  if (end) params.set('end', end);
+  if (cursor) params.set('cursor', cursor);
+  return glucoseApi('/entries?' + params.toString());
+}
+
+async function fetchSummary() {
+  return glucoseApi('/summary');
+}
+
+// 'YYYY-MM-DDTHH:MM' in local time, matching how entries are stored
+function toLocalIso(d) {
+  const pad = n => String(n).padStart(2, '0');
+  return `${d.getFullYear()}-${pad(d.getMonth() + 1)}-${pad(d.getDate())}T${pad(d.getHours())}:${pad(d.getMinutes())}`;
+}
+
+// One-time move of entries saved by older versions of this page
+async function migrateLocalEntries() {
+  const localEntries = JSON.parse(localStorage.getItem('glucoseEntries') || '[]');
+  if (localEntries.length === 0) return;
+
+  let result;
+  try {
+    result = await glucoseApi('/entries', {
+      method: 'POST',
+      body: JSON.stringify({ entries: localEntries })
+    });
+  } catch (error) {
+    console.error('Could not migrate local glucose entries:', error);
+    return;
+  }
+
+  // Entries the server refused are set aside rather than retried on every load
+  const rejected = (result.rejected || []).map(r => localEntries[r.index]);
+  localStorage.removeItem('glucoseEntries');
+  if (rejected.length > 0) {
+    const kept = JSON.parse(localStorage.getItem('glucoseEntriesRejected') || '[]');
+    localStorage.setItem('glucoseEntriesRejected', JSON.stringify(kept.concat(rejected)));
+    console.warn('Glucose entries not migrated:', result.rejected);
+    showAlert(
+      `${rejected.length} of ${localEntries.length} entries saved in this browser were incomplete and could not be moved to your account. They are still stored in this browser.`,
+      'warning', 'Some Entries Not Migrated'
+    );
+  }
+}
+
+async function refreshGlucoseViews() {
+  await Promise.all([displayLogs(), updateStats(), updateChart()]);
+}
+
+// Format date/time for display
+function formatDateTime(date, time) {
+  const d = new Date(date + 'T' + time);
+  return d.toLocaleString('en-US', {
+    month: 'short',
+    day: 'numeric',
+    year: 'numeric',
+    hour: 'numeric',
+    minute: '2-digit',
+    hour12: true
+  });
+}
+
+// Get insulin action parameters
+function getInsulinParams(type) {
+  const params = {
+    rapid: { 
+      onset: 0.17,
+      peak: 1.0,
+      duration: 5,
+      peakEffect: 1.0,
+      shape: 'biexponential'
+    },
+    short: { 
+      onset: 0.5,
+      peak: 2.5,
+      duration: 8,
+      peakEffect: 0.85,
+      shape: 'gaussian'
+    },
+    intermediate: { 
+      onset: 1.5,
+      peak: 6,
+      duration: 18,
+      peakEffect: 0.6,
+      shape: 'plateau'
+    },
+    long: { 
+      onset: 2,
+      peak: -1,
+      duration: 24,
+      peakEffect: 0.25,
+      shape: 'flat'
+    }
+  };
+  return params[type] || params.rapid;
+}
+
+// Calculate insulin activity
+function calculateInsulinActivity(hours, params) {
+  if (hours < params.onset) return 0;
+  if (hours > params.duration) return 0;
+
+  const effectiveTime = hours - params.onset;
+  const effectiveDuration = params.duration - params.onset;
+
+  let activity = 0;
+
+  if (params.shape === 'flat') {
+    if (effectiveTime < 2) {
+      activity = (effectiveTime / 2) * params.peakEffect;
+    } else if (effectiveTime > effectiveDuration - 2) {
+      activity = ((effectiveDuration - effectiveTime) / 2) * params.peakEffect;
+    } else {
+      activity = params.peakEffect;
+    }
+  } else if (params.shape === 'plateau') {
+    const peakStart = params.peak - 2;
+    const peakEnd = params.peak + 3;
+
+    if (effectiveTime < peakStart) {
+      activity = (effectiveTime / peakStart) * params.peakEffect;
+    } else if (effectiveTime <= peakEnd) {
+      activity = params.peakEffect;
+    } else {
+      const fallProgress = (effectiveTime - peakEnd) / (effectiveDuration - peakEnd);
+      activity = params.peakEffect * (1 - fallProgress);
+    }
+  } else if (params.shape === 'gaussian') {
+    const sigma = effectiveDuration / 6;
+    const mu = params.peak - params.onset;
+    const gaussian = Math.exp(-Math.pow(effectiveTime - mu, 2) / (2 * Math.pow(sigma, 2)));
+    activity = params.peakEffect * gaussian;
+  } else {
+    const peakTime = params.peak - params.onset;
+
+    if (effectiveTime <= peakTime) {
+      const progress = effectiveTime / peakTime;
+      activity = params.peakEffect * (1 - Math.pow(1 - progress, 2));
+    } else {
+      const decayTime = effectiveTime - peakTime;
+      const decayDuration = effectiveDuration - peakTime;
+      const decayRate = 3 / decayDuration;
+      activity = params.peakEffect * Math.exp(-decayRate * decayTime);
+    }
+  }
+
+  return activity;
+}
+
+// Get user profile
+function getUserProfile() {
+  return JSON.parse(localStorage.getItem('userProfile') || '{}');
+}
+
+// Calculate personalized ISF
+function calculatePersonalizedISF(profile, currentGlucose) {
+  let baseISF = 40;
+
+  if (profile.weight) {
+    const estimatedTDD = parseFloat(profile.weight) * 0.5;
+    baseISF = 1800 / estimatedTDD;
+  }
+
+  if (profile.age) {
+    const age = parseInt(profile.age);
+    if (age < 18) {
+      baseISF *= 1.2;
+    } else if (age > 65) {
+      baseISF *= 1.15;
+    }
+  }
+
+  if (profile.exerciseLevel) {
+    const exerciseMultipliers = {
+      'Sedentary': 0.9,
+      'Lightly active': 1.0,
+      'Moderately active': 1.1,
+      'Very active': 1.2,
+      'Extremely active': 1.3
+    };
+    baseISF *= (exerciseMultipliers[profile.exerciseLevel] || 1.0);
+  }
+
+  if (profile.bmi) {
+    const bmi = parseFloat(profile.bmi);
+    if (bmi > 30) {
+      baseISF *= 0.8;
+    } else if (bmi < 18.5) {
+      baseISF *= 1.1;
+    }
+  }
+
+  if (currentGlucose > 250) {
+    baseISF *= 0.9;
+  }
+
+  return Math.max(20, Math.min(80, baseISF));
+}
+
+// NEW: Calculate carbohydrate impact
+function calculateCarbImpact(carbsConsumed, hours, profile) {
+  if (!carbsConsumed || carbsConsumed <= 0) return 0;
+
+  // Carb absorption curve (peaks at ~30-45 minutes, complete by 2-3 hours)
+  const peakTime = 0.75; // 45 minutes
+  const duration = 2.5; // 2.5 hours for most carbs
+
+  if (hours < 0) return 0;
+  if (hours > duration) return 0;
+
+  // Gaussian curve for carb absorption
+  const sigma = duration / 4;
+  const absorption = Math.exp(-Math.pow(hours - peakTime, 2) / (2 * Math.pow(sigma, 2)));
+
+  // Calculate carb-to-glucose ratio (typically 1g carb = 3-5 mg/dL rise)
+  let carbRatio = 4; // Default 4 mg/dL per gram
+
+  // Adjust based on insulin sensitivity
+  if (profile.bmi) {
+    const bmi = parseFloat(profile.bmi);
+    if (bmi > 30) {
+      carbRatio = 5; // Higher BMI = larger glucose rise per carb
+    } else if (bmi < 20) {
+      carbRatio = 3;
+    }
+  }
+
+  // Total glucose rise from carbs
+  const maxRise = carbsConsumed * carbRatio;
+  return maxRise * absorption;
+}
+
+// NEW: Calculate activity impact
+function calculateActivityImpact(activityLevel, hours) {
+  if (!activityLevel || activityLevel === 'none') return 0;
+
+  const impacts = {
+    'light': 15,      // Light activity reduces glucose by ~15 mg/dL
+    'moderate': 30,   // Moderate activity reduces by ~30 mg/dL
+    'intense': 50     // Intense activity reduces by ~50 mg/dL
+  };
+
+  const maxReduction = impacts[activityLevel] || 0;
+
+  // Activity effect diminishes over time (half-life ~2 hours)
+  const decay = Math.exp(-0.35 * hours);
+  return maxReduction * decay;
+}
+
+// NEW: Calculate stress/illness impact
+function calculateFactorImpacts(factors) {
+  let totalImpact = 0;
+
+  if (!factors || factors.length === 0) return 0;
+
+  // Each factor can raise glucose
+  if (factors.includes('stress')) totalImpact += 30; // Stress hormones raise glucose
+  if (factors.includes('illness')) totalImpact += 40; // Illness significantly raises glucose
+  if (factors.includes('menstruation')) totalImpact += 20; // Hormonal changes
+  if (factors.includes('alcohol')) totalImpact -= 15; // Alcohol can lower glucose (delayed)
+
+  return totalImpact;
+}
+
+// Calculate basal glucose change
+function calculateBasalGlucoseChange(hours, profile, currentGlucose) {
+  let netChange = 0;
+
+  let glucoseProduction = 2.0;
+  let glucoseUtilization = 1.5;
+
+  if (profile.exerciseLevel) {
+    const activityMultipliers = {
+      'Sedentary': 0.8,
+      'Lightly active': 1.0,
+      'Moderately active': 1.2,
+      'Very active': 1.4,
+      'Extremely active': 1.6
+    };
+    glucoseUtilization *= (activityMultipliers[profile.exerciseLevel] || 1.0);
+  }
+
+  if (profile.age) {
+    const age = parseInt(profile.age);
+    if (age > 60) {
+      glucoseUtilization *= 0.9;
+    }
+  }
+
+  if (profile.conditions) {
+    if (profile.conditions.includes('Obesity')) {
+      glucoseProduction *= 1.2;
+      glucoseUtilization *= 0.8;
+    }
+    if (profile.conditions.includes('Kidney Disease')) {
+      glucoseUtilization *= 0.85;
+    }
+  }
+
+  netChange = (glucoseProduction - glucoseUtilization) * hours;
+
+  const projectedGlucose = currentGlucose + netChange;
+  if (projectedGlucose < 70) {
+    const hypoglycemiaResponse = (70 - projectedGlucose) * 0.4;
+    netChange += hypoglycemiaResponse;
+  }
+
+  const now = new Date();
+  const currentHour = now.getHours();
+  const targetHour = (currentHour + hours) % 24;
+  if (targetHour >= 4 && targetHour <= 8) {
+    netChange += 10;
+  }
+
+  return netChange;
+}
+
+// Generate personalized advice
+function generatePersonalizedAdvice(predictedGlucose, profile, entry) {
+  let advice = '';
+
+  if (predictedGlucose < 70) {
+    advice = '⚠️ <strong>Risk of hypoglycemia detected.</strong> ';
+    advice += 'Consume 15g of fast-acting carbohydrates (4 glucose tablets, 4oz juice, or 1 tablespoon honey). ';
+    advice += 'Recheck in 15 minutes with your glucose meter.';
+
+    if (profile.conditions && profile.conditions.includes('Heart Disease')) {
+      advice += '<br><br><strong>Important:</strong> Monitor closely due to heart condition - severe hypoglycemia can strain the heart.';
+    }
+
+    if (entry && entry.recentActivity && entry.recentActivity !== 'none') {
+      advice += '<br><br><strong>Note:</strong> Recent physical activity increases hypoglycemia risk. Consider having a snack before further activity.';
+    }
+  } else if (predictedGlucose < 100) {
+    advice = '✓ Your glucose is predicted to be in a healthy range. Continue monitoring regularly.';
+
+    if (profile.exerciseLevel === 'Very active' || profile.exerciseLevel === 'Extremely active') {
+      advice += '<br><br>As an active individual, consider a small snack if planning exercise.';
+    }
+  } else if (predictedGlucose < 140) {
+    advice = 'Slightly elevated glucose predicted.';
+
+    if (profile.exerciseLevel !== 'Sedentary') {
+      advice += ' A 15-20 minute walk could help lower levels.';
+    } else {
+      advice += ' Consider light physical activity if possible.';
+    }
+
+    if (profile.diet && (profile.diet.includes('Low-carb') || profile.diet.includes('Ketogenic'))) {
+      advice += '<br><br>Your low-carb diet should help manage this elevation.';
+    }
+  } else if (predictedGlucose < 180) {
+    advice = '⚠️ <strong>Elevated glucose - needs attention.</strong> Monitor closely with your glucose meter.';
+
+    if (profile.medications && profile.medications.toLowerCase().includes('metformin')) {
+      advice += '<br><br>Ensure you\'ve taken your Metformin as prescribed.';
+    }
+
+    advice += '<br><br>Stay hydrated and avoid additional carbohydrates. Contact your healthcare provider if levels remain elevated.';
+
+    if (entry && entry.factors && entry.factors.includes('illness')) {
+      advice += '<br><br><strong>Note:</strong> Illness is affecting your glucose. Monitor more frequently and contact your doctor if needed.';
+    }
+  } else {
+    advice = '🚨 <strong>High glucose level predicted.</strong> Check with your glucose meter immediately.';
+
+    if (profile.conditions && profile.conditions.includes('Diabetes')) {
+      advice += '<br><br>Check for ketones, especially if you have Type 1 diabetes.';
+    }
+
+    advice += '<br><br>Stay hydrated, monitor frequently, and contact your healthcare provider for guidance.';
+  }
+
+  return advice;
+}
+
+// Calculate confidence score
+function calculateConfidence(hoursElapsed, hours, profile, entryCount, entry) {
+  let confidence = 100;
+
+  // Reduce confidence for stale readings
+  if (hoursElapsed > 2) confidence -= 10;
+  if (hoursElapsed > 4) confidence -= 15;
+  if (hoursElapsed > 6) confidence -= 20;
+
+  // Reduce confidence for long predictions
+  if (hours > 4) confidence -= 10;
+  if (hours > 6) confidence -= 15;
+
+  // Increase confidence if we have profile data
+  if (profile.weight) confidence += 5;
+  if (profile.exerciseLevel) confidence += 5;
+  if (profile.conditions && profile.conditions.length > 0) confidence += 5;
+
+  // Increase confidence if we have carb data
+  if (entry && entry.carbsConsumed) confidence += 10;
+
+  // Reduce confidence if factors are present
+  if (entry && entry.factors && entry.factors.length > 0) confidence -= 10;
+
+  // Increase confidence if we have historical data
+  if (entryCount > 10) confidence += 10;
+  if (entryCount > 30) confidence += 10;
+
+  return Math.max(20, Math.min(95, confidence));
+}
+
+// Predict glucose level
+async function predictGlucose() {
+  let summary;
+  try {
+    summary = await fetchSummary();
+  } catch (error) {
+    showAlert('Could not load your glucose entries. Please try again.', 'error', 'Connection Error');
+    return;
+  }
+  if (summary.count === 0) {
+    showAlert('Please add at least one glucose entry before making predictions.', 'warning', 'No Entries Found');
+    return;
+  }
+
+  const hoursInput = document.getElementById('predictionHours').value;
+  const hours = parseFloat(hoursInput);
+
+  if (!hoursInput || isNaN(hours) || hours <= 0) {
+    showAlert('Please enter a valid number of hours greater than 0.', 'error', 'Invalid Input');
+    return;
+  }
+
+  if (hours > 8) {
+    showAlert('Please enter a time period up to 8 hours for more accurate predictions. Longer predictions have too many unknown variables.', 'warning', 'Time Period Too Long');
+    return;
+  }
+
+  const profile = getUserProfile();
+
+  const latest = summary.latest;
+  const entryTime = new Date(latest.date + 'T' + latest.time);
+  const now = new Date();
+  const hoursElapsed = (now - entryTime) / (1000 * 60 * 60);
+  const totalHours = hoursElapsed + hours;
+
+  const params = getInsulinParams(latest.insulinType);
+  const currentGlucose = parseFloat(latest.currentGlucose);
+  const insulinDose = parseFloat(latest.insulinDose);
+
+  const isf = calculatePersonalizedISF(profile, currentGlucose);
+
+  const insulinActivity = calculateInsulinActivity(totalHours, params);
+  const maxGlucoseReduction = insulinDose * isf;
+  const glucoseDrop = maxGlucoseReduction * insulinActivity;
+
+  const basalChange = calculateBasalGlucoseChange(hours, profile, currentGlucose);
+
+  // NEW: Add carb impact
+  const carbImpact = calculateCarbImpact(
+    latest.carbsConsumed ? parseFloat(latest.carbsConsumed) : 0,
+    hours,
+    profile
+  );
+
+  // NEW: Add activity impact
+  const activityImpact = calculateActivityImpact(
+    latest.recentActivity || 'none',
+    hours
+  );
+
+  // NEW: Add factor impacts
+  const factorImpact = calculateFactorImpacts(latest.factors || []);
+
+  // Final prediction with all factors
+  let predictedGlucose = currentGlucose - glucoseDrop + basalChange + carbImpact - activityImpact + factorImpact;
+  predictedGlucose = Math.max(40, Math.round(predictedGlucose));
+
+  const confidence = calculateConfidence(hoursElapsed, hours, profile, summary.count, latest);
+
+  document.getElementById('predictedValue').textContent = predictedGlucose + ' mg/dL';
+
+  let rangeText = '';
+  if (predictedGlucose < 70) {
+    rangeText = '🔴 Low - Risk of hypoglycemia';
+  } else if (predictedGlucose < 100) {
+    rangeText = '🟢 Normal - Good control';
+  } else if (predictedGlucose < 140) {
+    rangeText = '🟡 Slightly elevated';
+  } else if (predictedGlucose < 180) {
+    rangeText = '🟠 Elevated - Needs attention';
+  } else {
+    rangeText = '🔴 High - Medical attention recommended';
+  }
+
+  const advice = generatePersonalizedAdvice(predictedGlucose, profile, latest);
+
+  let personalizationNotes = [];
+  if (profile.weight) personalizationNotes.push('weight');
+  if (profile.exerciseLevel) personalizationNotes.push('activity level');
+  if (profile.bmi) personalizationNotes.push('BMI');
+  if (profile.conditions && profile.conditions.length > 0) personalizationNotes.push('medical conditions');
+
+  let personalizationText = '';
+  if (personalizationNotes.length > 0) {
+    personalizationText = `<br><br><strong>Personalized factors:</strong> This prediction considers your ${personalizationNotes.join(', ')}.`;
+  } else {
+    personalizationText = '<br><br><em>💡 Tip: Complete your profile in Settings for more accurate predictions!</em>';
+  }
+
+  // Build factor breakdown
+  let factorBreakdown = '<br><br><strong>Prediction Breakdown:</strong><br>';
+  factorBreakdown += `• Starting glucose: ${currentGlucose} mg/dL<br>`;
+  factorBreakdown += `• Insulin effect: -${glucoseDrop.toFixed(0)} mg/dL<br>`;
+  factorBreakdown += `• Basal metabolic change: ${basalChange > 0 ? '+' : ''}${basalChange.toFixed(0)} mg/dL<br>`;
+
+  if (carbImpact > 0) {
+    factorBreakdown += `• Carbohydrate impact: +${carbImpact.toFixed(0)} mg/dL (${latest.carbsConsumed}g consumed)<br>`;
+  }
+
+  if (activityImpact > 0) {
+    factorBreakdown += `• Activity impact: -${activityImpact.toFixed(0)} mg/dL (${latest.recentActivity} activity)<br>`;
+  }
+
+  if (factorImpact !== 0) {
+    factorBreakdown += `• Other factors: ${factorImpact > 0 ? '+' : ''}${factorImpact.toFixed(0)} mg/dL<br>`;
+    if (latest.factors && latest.factors.length > 0) {
+      factorBreakdown += `  (${latest.factors.join(', ')})<br>`;
+    }
+  }
+
+  let confidenceNote = '';
+  if (hoursElapsed > 4) {
+    confidenceNote = '<br><br><strong>⚠️ Note:</strong> This prediction is based on a reading from ' + 
+                     hoursElapsed.toFixed(1) + ' hours ago. For better accuracy, take a new glucose reading with your meter.';
+  }
+
+  document.getElementById('predictionDetails').innerHTML = `
+    <strong>${rangeText}</strong><br><br>
+    ${advice}
+    ${personalizationText}
+    ${factorBreakdown}
+    <br><strong>Prediction Confidence:</strong> ${confidence}%
+    ${confidenceNote}<br><br>
+    <em>⚠️ <strong>IMPORTANT:</strong> This is a mathematical estimate and should NOT replace blood glucose monitoring. Individual responses vary significantly. Always verify with your glucose meter and consult your healthcare provider before making any treatment decisions.</em>
+  `;
+
+  const resultDiv = document.getElementById('predictionResult');
+  resultDiv.style.display = 'block';
+
+  lucide.createIcons();
+
+  resultDiv.scrollIntoView({ behavior: 'smooth', block: 'nearest' });
+}
+
+// Update statistics
+async function updateStats() {
+  let summary;
+  try {
+    summary = await fetchSummary();
+  } catch (error) {
+    console.error('Error loading glucose summary:', error);
+    return;
+  }
+
+  document.getElementById('totalEntries').textContent = summary.count;
+
+  if (summary.count > 0) {
+    document.getElementById('avgGlucose').textContent = Math.round(summary.average);
+
+    const lastDate = new Date(summary.latest.date + 'T' + summary.latest.time);
+    const now = new Date();
+    const diffMs = now - lastDate;
+    const diffMins = Math.floor(diffMs / (1000 * 60));
+    const diffHours = Math.floor(diffMs / (1000 * 60 * 60));
+    const diffDays = Math.floor(diffMs / (1000 * 60 * 60 * 24));
+
+    let timeText;
+    if (diffMins < 1) {
+      timeText = 'Just now';
+    } else if (diffMins < 60) {
+      timeText = diffMins + 'm ago';
+    } else if (diffHours < 24) {
+      timeText = diffHours + 'h ago';
+    } else if (diffDays === 1) {
+      timeText = '1 day ago';
+    } else {
+      timeText = diffDays + ' days ago';
+    }
+
+    document.getElementById('lastEntry').textContent = timeText;
+  } else {
+    document.getElementById('avgGlucose').textContent = '--';
+    document.getElementById('lastEntry').textContent = '--';
+  }
+}
+
+// Display log entries (append=true loads the next page)
+async function displayLogs(append = false) {
+  const listDiv = document.getElementById('logList');
+
+  let page;
+  try {
+    page = await fetchEntries({ cursor: append ? logCursor : null });
+  } catch (error) {
+    console.error('Error loading glucose entries:', error);
+    return;
+  }
+  const entries = page.entries;
+  logCursor = page.next_cursor;
+
+  if (!append && entries.length === 0) {
+    listDiv.innerHTML = '<div class="empty-state">No entries logged yet. Add your first entry to get started!</div>';
+    return;
+  }
+
+  let html = '';
+  entries.forEach(entry => {
+    let details = `Glucose: ${entry.currentGlucose} mg/dL | Insulin: ${entry.insulinDose} units (${entry.insulinType})`;
+
+    if (entry.carbsConsumed) {
+      details += ` | Carbs: ${entry.carbsConsumed}g`;
+    }
+
+    if (entry.recentActivity && entry.recentActivity !== 'none') {
+      details += ` | Activity: ${entry.recentActivity}`;
+    }
+
+    if (entry.notes) {
+      details += ` | ${entry.notes}`;
+    }
+
+    html += `
+      <div class="log-item">
+        <div class="log-info">
+          <div class="log-time">${formatDateTime(entry.date, entry.time)}</div>
+          <div class="log-details">${details}</div>
+        </div>
+        <div class="log-actions">
+          <button class="icon-btn delete" onclick="deleteEntry('${entry.id}')">
+            <i data-lucide="trash-2"></i>
+          </button>
+        </div>
+      </div>
+    `;
+  });
+
+  const loadMore = document.getElementById('loadMoreLogs');
+  if (loadMore) loadMore.remove();
+  if (logCursor) {
+    html += `
+      <button type="button" id="loadMoreLogs" class="btn btn-secondary" style="width: 100%; margin-top: 12px;" onclick="displayLogs(true)">
+        Load older entries
+      </button>
+    `;
+  }
+
+  if (append) {
+    listDiv.insertAdjacentHTML('beforeend', html);
+  } else {
+    listDiv.innerHTML = html;
+  }
+  lucide.createIcons();
+}
+
+// Delete entry
+async function deleteEntry(id) {
+  const confirmed = await showConfirm({
+    title: 'Delete Entry?',
+    message: 'Are you sure you want to delete this entry? This action cannot be undone.',
+    type: 'warning',
+    icon: '<i data-lucide="trash-2" style="width: 32px; height: 32px; color: #ef4444;"></i>',
+    confirmText: 'Delete',
+    confirmType: 'danger',
+    cancelText: 'Cancel'
+  });
+
+  if (!confirmed) return;
+
+  try {
+    await glucoseApi('/entries/' + encodeURIComponent(id), { method: 'DELETE' });
+  } catch (error) {
+    showAlert('Could not delete the entry. Please try again.', 'error', 'Delete Failed');
+    return;
+  }
+
+  await refreshGlucoseViews();
+}
+
+// Form submission
+document.getElementById('glucoseForm').addEventListener('submit', async function(e) {
+  e.preventDefault();
+
+  const currentGlucose = document.getElementById('currentGlucose').value;
+  const insulinDose = document.getElementById('insulinDose').value;
+  const insulinType = document.getElementById('insulinType').value;
+  const logDate = document.getElementById('logDate').value;
+  const logTime = document.getElementById('logTime').value;
+
+  if (!currentGlucose || !insulinDose || !insulinType || !logDate || !logTime) {
+    showAlert('Please fill in all required fields before saving.', 'warning', 'Missing Fields');
+    return;
+  }
+
+  const glucoseValue = parseFloat(currentGlucose);
+  if (isNaN(glucoseValue) || glucoseValue < 20 || glucoseValue > 600) {
+    showAlert('Please enter a valid glucose level between 20 and 600 mg/dL.', 'error', 'Invalid Glucose Value');
+    return;
+  }
+
+  const doseValue = parseFloat(insulinDose);
+  if (isNaN(doseValue) || doseValue < 0 || doseValue > 100) {
+    showAlert('Please enter a valid insulin dose between 0 and 100 units.', 'error', 'Invalid Insulin Dose');
+    return;
+  }
+
+  // Collect factors
+  const factors = [];
+  if (document.getElementById('factorStress').checked) factors.push('stress');
+  if (document.getElementById('factorIllness').checked) factors.push('illness');
+  if (document.getElementById('factorMenstruation').checked) factors.push('menstruation');
+  if (document.getElementById('factorAlcohol').checked) factors.push('alcohol');
+
+  const entry = {
+    id: generateId(),
+    currentGlucose: currentGlucose,
+    insulinDose: insulinDose,
+    insulinType: insulinType,
+    date: logDate,
+    time: logTime,
+    carbsConsumed: document.getElementById('carbsConsumed').value || null,
+    recentActivity: document.getElementById('recentActivity').value || 'none',
+    factors: factors,
+    notes: document.getElementById('notes').value.trim()
+  };
+
+  try {
+    await glucoseApi('/entries', { method: 'POST', body: JSON.stringify(entry) });
+  } catch (error) {
+    showAlert('Could not save your entry. Please try again.', 'error', 'Save Failed');
+    return;
+  }
+
+  // Reset form
+  this.reset();
+  const now = new Date();
+  document.getElementById('logDate').valueAsDate = now;
+  document.getElementById('logTime').value = now.toTimeString().slice(0, 5);
+
+  await refreshGlucoseViews();
+
+  showAlert('Your glucose entry has been saved successfully!', 'success', 'Entry Saved');
+
+  document.getElementById('logList').scrollIntoView({ behavior: 'smooth', block: 'nearest' });
+});
+
+// Chart
+let glucoseChart = null;
+
+async function updateChart() {
+  const sevenDaysAgo = new Date();
+  sevenDaysAgo.setDate(sevenDaysAgo.getDate() - 7);
+
+  // The server returns just this window, already in time order; a week of
+  // CGM readings is more than one page, so follow the cursor to the newest
+  const recentEntries = [];
+  try {
+    let cursor = null;
+    do {
+      const page = await fetchEntries({ start: toLocalIso(sevenDaysAgo), limit: 1000, cursor: cursor, order: 'asc' });
+      recentEntries.push(...page.entries);
+      cursor = page.next_cursor;
+    } while (cursor);
+  } catch (error) {
+    console.error('Error loading chart data:', error);
+    return;
+  }
+
+  const labels = recentEntries.map(e => {
+    const d = new Date(e.date + 'T' + e.time);
+    return d.toLocaleDateString('en-US', { month: 'short', day: 'numeric', hour: 'numeric' });
+  });
+
+  const data = recentEntries.map(e => parseFloat(e.currentGlucose));
+
+  const ctx = document.getElementById('glucoseChart').getContext('2d');
+
+  if (glucoseChart) {
+    glucoseChart.destroy();
+  }
+
+  glucoseChart = new Chart(ctx, {
+    type: 'line',
+    data: {
+      labels: labels,
+      datasets: [{
+        label: 'Blood Glucose (mg/dL)',
+        data: data,
+        borderColor: '#3b82f6',
+        backgroundColor: 'rgba(59, 130, 246, 0.1)',
+        tension: 0.4,
+        fill: true,
+        pointRadius: 5,
+        pointHoverRadius: 7
+      }]
+    },
+    options: {
+      responsive: true,
+      maintainAspectRatio: false,
+      plugins: {
+        legend: {
+          display: true,
+          position: 'top'
+        },
+        tooltip: {
+          backgroundColor: 'rgba(0, 0, 0, 0.8)',
+          padding: 12,
+          titleFont: {
+            size: 14,
+            weight: 'bold'
+          },
+          bodyFont: {
+            size: 13
+          }
+        }
+      },
+      scales: {
+        y: {
+          beginAtZero: false,
+          min: 50,
+          max: 250,
+          grid: {
+            color: 'rgba(0, 0, 0, 0.05)'
+          },
+          ticks: {
+            callback: function(value) {
+              return value + ' mg/dL';
+            }
+          }
+        },
+        x: {
+          grid: {
+            display: false
+          }
+        }
+      }
+    }
+  });
+}
+
+// Export data: the server streams the log as gzipped CSV straight to disk
+async function exportData() {
+  let summary;
+  try {
+    summary = await fetchSummary();
+  } catch (error) {
+    showAlert('Could not load your glucose data. Please try again.', 'error', 'Export Failed');
+    return;
+  }
+
+  if (summary.count === 0) {
+    showAlert('No data available to export. Please add some glucose entries first.', 'warning', 'No Data');
+    return;
+  }
+
+  const link = document.createElement('a');
+  link.href = '/api/export?format=csv';
+  document.body.appendChild(link);
+  link.click();
+  document.body.removeChild(link);
+}
+
+// Clear all data
+async function clearAllData() {
+  const summary = await fetchSummary();
+
+  if (summary.count === 0) {
+    showAlert('No data to clear. Your glucose tracker is already empty.', 'info', 'No Data');
+    return;
+  }
+
+  const confirmed = await showConfirm({
+    title: '⚠️ Delete All Data?',
+    message: `This will permanently delete all ${summary.count} glucose entries. This action cannot be undone!`,
+    type: 'error',
+    icon: '<i data-lucide="alert-triangle" style="width: 32px; height: 32px; color: #ef4444;"></i>',
+    confirmText: 'Yes, Delete All',
+    confirmType: 'danger',
+    cancelText: 'Cancel'
+  });
+
+  if (!confirmed) return;
+
+  const doubleConfirm = await showConfirm({
+    title: 'Final Confirmation',
+    message: 'Are you absolutely sure? This is your last chance to cancel!',
+    type: 'error',
+    icon: '<i data-lucide="alert-octagon" style="width: 32px; height: 32px; color: #dc2626;"></i>',
+    confirmText: 'Yes, Delete All',
+    confirmType: 'danger',
+    cancelText: 'No, Go Back'
+  });
+
+  if (!doubleConfirm) return;
+
+  try {
+    await glucoseApi('/entries', { method: 'DELETE' });
+  } catch (error) {
+    showAlert('Could not clear your glucose data. Please try again.', 'error', 'Delete Failed');
+    return;
+  }
+
+  await refreshGlucoseViews();
+
+  document.getElementById('predictionResult').style.display = 'none';
+
+  showAlert('All glucose data has been cleared successfully.', 'success', 'Data Cleared');
+}
+
+// Initialize on page load
+document.addEventListener('DOMContentLoaded', async () => {
+  lucide.createIcons();
+  await migrateLocalEntries();
+  await refreshGlucoseViews();
+});
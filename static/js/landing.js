@@ -0,0 +1,104 @@
+// Initialize Lucide icons
+lucide.createIcons();
+
+function getTodayDate() {
+    const t = new Date();
+    return `${t.getFullYear()}-${String(t.getMonth() + 1).padStart(2,'0')}-${String(t.getDate()).padStart(2,'0')}`;
+}
+
+function loadSymptoms() {
+    return JSON.parse(localStorage.getItem('symptomHistory') || '{}');
+}
+
+function loadReminders() {
+    return JSON.parse(localStorage.getItem('reminders') || '[]');
+}
+
+// The server's list, which includes reminders added on other devices or by import
+let serverReminders = null;
+
+async function fetchReminders() {
+    try {
+        const response = await fetch('/api/reminders');
+        if (!response.ok) return;
+        serverReminders = (await response.json()).reminders;
+        displayTodaysReminders();
+    } catch (error) {
+        console.error('Could not load reminders:', error);
+    }
+}
+
+function displayTodaysSymptoms() {
+    const today = getTodayDate();
+    const s = loadSymptoms();
+    const contentDiv = document.getElementById('todaysSymptomsContent');
+
+    if (s[today]) {
+        const dt = s[today];
+        let html = '';
+        if (dt.feeling) html += `<div class="symptom-item"><div class="item-label">Overall Feeling</div><div class="item-value">${dt.feeling}</div></div>`;
+        if (dt.fever) html += `<div class="symptom-item"><div class="item-label">Fever</div><div class="item-value">${dt.fever === 'Yes' ? dt.feverSeverity : 'None'}</div></div>`;
+        if (dt.cough) html += `<div class="symptom-item"><div class="item-label">Cough</div><div class="item-value">${dt.cough === 'Yes' ? dt.coughSeverity : 'None'}</div></div>`;
+        if (dt.fatigue) html += `<div class="symptom-item"><div class="item-label">Fatigue</div><div class="item-value">${dt.fatigue === 'Yes' ? dt.fatigueSeverity : 'None'}</div></div>`;
+        if (dt.other) html += `<div class="symptom-item"><div class="item-label">Other</div><div class="item-value">${dt.other}</div></div>`;
+        contentDiv.innerHTML = html;
+    } else {
+        contentDiv.innerHTML = '<div class="widget-empty">No symptoms recorded today.</div>';
+    }
+}
+
+// Same rule as occursOn() in reminders.js
+function reminderOccursOn(reminder, day) {
+    if (reminder.date === day) return true;
+    const repeat = reminder.repeat || 'none';
+    if (repeat === 'none' || day < reminder.date) return false;
+    if (repeat === 'daily') return true;
+    const start = new Date(reminder.date + 'T00:00:00');
+    const target = new Date(day + 'T00:00:00');
+    if (repeat === 'weekly') return start.getDay() === target.getDay();
+    const lastDay = new Date(target.getFullYear(), target.getMonth() + 1, 0).getDate();
+    return target.getDate() === Math.min(start.getDate(), lastDay);
+}
+
+function displayTodaysReminders() {
+    const today = getTodayDate();
+    const reminders = (serverReminders || loadReminders()).filter(r => reminderOccursOn(r, today));
+    const contentDiv = document.getElementById('todaysRemindersContent');
+
+    if (reminders.length > 0) {
+        let html = '';
+        reminders.forEach(r => {
+            let timeStr = '';
+            if (r.time) {
+                const [hourStr, minStr] = r.time.split(':');
+                let hour = parseInt(hourStr);
+                const min = minStr;
+                const ampm = hour >= 12 ? 'PM' : 'AM';
+                if (hour === 0) hour = 12;
+                else if (hour > 12) hour -= 12;
+                timeStr = ` at ${hour}:${min} ${ampm}`;
+            }
+            html += `<div class="reminder-item">`;
+            html += `<div class="item-label">${r.title}</div>`;
+            if (timeStr) html += `<div class="item-value">${timeStr.trim()}</div>`;
+            if (r.note) html += `<div class="item-value" style="margin-top:6px;font-size:0.875rem;">${r.note}</div>`;
+            html += `</div>`;
+        });
+        contentDiv.innerHTML = html;
+    } else {
+        contentDiv.innerHTML = '<div class="widget-empty">No reminders for today.</div>';
+    }
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    displayTodaysSymptoms();
+    displayTodaysReminders();
+    fetchReminders();
+});
+
+window.addEventListener('storage', () => {
+    // The reminders page keeps localStorage in step with the server
+    serverReminders = null;
+    displayTodaysSymptoms();
+    displayTodaysReminders();
+});
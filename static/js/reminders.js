@@ -0,0 +1,398 @@
+// Initialize Lucide icons
+lucide.createIcons();
+
+const monthNames = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October", "November", "December"];
+
+let currentMonth = new Date().getMonth();
+let currentYear = new Date().getFullYear();
+let editingReminderId = null;
+let viewingReminderId = null;
+
+const monthTabs = document.getElementById("monthTabs");
+const calendarBody = document.getElementById("calendarBody");
+const popup = document.getElementById("popupForm");
+const viewPopup = document.getElementById("viewReminderPopup");
+const addBtn = document.getElementById("addReminderBtn");
+const closePopup = document.getElementById("closePopup");
+const closeViewPopup = document.getElementById("closeViewPopup");
+const saveReminder = document.getElementById("saveReminder");
+const editReminderBtn = document.getElementById("editReminderBtn");
+const deleteReminderBtn = document.getElementById("deleteReminderBtn");
+
+function generateId() {
+  return 'reminder_' + Date.now() + '_' + Math.random().toString(36).substr(2, 9);
+}
+
+function getTodayDate() {
+  const today = new Date();
+  return `${today.getFullYear()}-${String(today.getMonth() + 1).padStart(2, '0')}-${String(today.getDate()).padStart(2, '0')}`;
+}
+
+// ============== REMINDER API ==============
+// The server holds the reminders and delivers them even when no page is open;
+// localStorage is this page's copy of its list, refreshed on every load.
+const TIME_ZONE = Intl.DateTimeFormat().resolvedOptions().timeZone;
+const REPEAT_LABELS = { daily: 'Every day', weekly: 'Every week', monthly: 'Every month' };
+const REMINDER_FIELDS = ['title', 'note', 'date', 'time', 'tz', 'repeat'];
+
+async function reminderApi(path, options = {}) {
+  const response = await fetch('/api/reminders' + path, {
+    headers: { 'Content-Type': 'application/json' },
+    ...options
+  });
+  const data = await response.json();
+  if (!response.ok) {
+    const error = new Error(data.error || 'Reminder API request failed');
+    error.status = response.status;
+    throw error;
+  }
+  return data;
+}
+
+// Changes the server hasn't confirmed yet, as { id: 'save' | 'delete' }
+function loadPendingReminders() {
+  return JSON.parse(localStorage.getItem('reminderPending') || '{}');
+}
+
+function setPendingReminder(id, action) {
+  const pending = loadPendingReminders();
+  if (action) pending[id] = action;
+  else delete pending[id];
+  localStorage.setItem('reminderPending', JSON.stringify(pending));
+}
+
+function withTimeZone(reminder) {
+  return { ...reminder, tz: reminder.tz || TIME_ZONE, repeat: reminder.repeat || 'none' };
+}
+
+function sameReminder(a, b) {
+  a = withTimeZone(a);
+  b = withTimeZone(b);
+  return REMINDER_FIELDS.every(field => (a[field] || '') === (b[field] || ''));
+}
+
+// Load the server's list, first sending it only what actually changed here:
+// edits and deletes that didn't reach it, and reminders made before it kept them
+async function syncReminders() {
+  let serverReminders;
+  try {
+    serverReminders = (await reminderApi('')).reminders;
+  } catch (error) {
+    console.error('Could not load reminders:', error);
+    return;
+  }
+
+  const local = JSON.parse(localStorage.getItem("reminders") || "[]");
+  const pending = loadPendingReminders();
+  const migrating = !localStorage.getItem('remindersOnServer');
+  const onServer = new Map(serverReminders.map(r => [r.id, r]));
+
+  for (const [id, action] of Object.entries(pending)) {
+    if (action !== 'delete') continue;
+    try {
+      if (onServer.has(id)) await reminderApi('/' + encodeURIComponent(id), { method: 'DELETE' });
+      onServer.delete(id);
+      setPendingReminder(id, null);
+    } catch (error) {
+      if (error.status === 404) setPendingReminder(id, null);
+      else onServer.delete(id);
+    }
+  }
+
+  const changed = local.filter(r => {
+    const server = onServer.get(r.id);
+    if (!server) return migrating || pending[r.id] === 'save';
+    return pending[r.id] === 'save' && !sameReminder(r, server);
+  });
+  let uploaded = true;
+  if (changed.length > 0) {
+    try {
+      await reminderApi('', {
+        method: 'POST',
+        body: JSON.stringify({ reminders: changed.map(withTimeZone) })
+      });
+    } catch (error) {
+      uploaded = false;
+      console.error('Could not sync reminders:', error);
+    }
+  }
+  changed.forEach(r => onServer.set(r.id, r));
+  if (uploaded) {
+    Object.keys(pending).filter(id => pending[id] === 'save').forEach(id => setPendingReminder(id, null));
+    localStorage.setItem('remindersOnServer', '1');
+  }
+
+  localStorage.setItem("reminders", JSON.stringify([...onServer.values()]));
+  renderCalendar();
+  window.dispatchEvent(new Event('storage'));
+}
+
+function saveReminderOnServer(reminder) {
+  setPendingReminder(reminder.id, 'save');
+  reminderApi('', { method: 'POST', body: JSON.stringify(reminder) })
+    .then(() => setPendingReminder(reminder.id, null))
+    .catch(error => console.error('Could not save reminder:', error));
+}
+
+function deleteReminderOnServer(reminderId) {
+  setPendingReminder(reminderId, 'delete');
+  reminderApi('/' + encodeURIComponent(reminderId), { method: 'DELETE' })
+    .then(() => setPendingReminder(reminderId, null))
+    .catch(error => {
+      if (error.status === 404) setPendingReminder(reminderId, null);
+      else console.error('Could not delete reminder:', error);
+    });
+}
+
+// Whether a reminder, possibly repeating, falls on 'YYYY-MM-DD'
+function occursOn(reminder, day) {
+  if (reminder.date === day) return true;
+  const repeat = reminder.repeat || 'none';
+  if (repeat === 'none' || day < reminder.date) return false;
+  if (repeat === 'daily') return true;
+
+  const start = new Date(reminder.date + 'T00:00:00');
+  const target = new Date(day + 'T00:00:00');
+  if (repeat === 'weekly') return start.getDay() === target.getDay();
+  // Monthly: same day of the month, or the last day of a shorter month
+  const lastDay = new Date(target.getFullYear(), target.getMonth() + 1, 0).getDate();
+  return target.getDate() === Math.min(start.getDate(), lastDay);
+}
+
+function formatTime(time24) {
+  if (!time24) return '';
+  const [hourStr, minStr] = time24.split(':');
+  let hour = parseInt(hourStr);
+  const min = minStr;
+  const ampm = hour >= 12 ? 'PM' : 'AM';
+  if (hour === 0) hour = 12;
+  else if (hour > 12) hour -= 12;
+  return `${hour}:${min} ${ampm}`;
+}
+
+addBtn.onclick = () => {
+  editingReminderId = null;
+  document.getElementById("popupTitle").textContent = "Create Reminder";
+  document.getElementById("reminderTitle").value = "";
+  document.getElementById("reminderDate").value = "";
+  document.getElementById("reminderTime").value = "";
+  document.getElementById("reminderRepeat").value = "none";
+  document.getElementById("reminderNote").value = "";
+  popup.style.display = "flex";
+};
+
+closePopup.onclick = () => {
+  popup.style.display = "none";
+  editingReminderId = null;
+};
+
+closeViewPopup.onclick = () => {
+  viewPopup.style.display = "none";
+  viewingReminderId = null;
+};
+
+monthNames.forEach((month, index) => {
+  const btn = document.createElement("button");
+  btn.textContent = month;
+  btn.classList.toggle("active", index === currentMonth);
+  btn.onclick = () => {
+    currentMonth = index;
+    renderCalendar();
+    document.querySelectorAll(".month-tabs button").forEach(b => b.classList.remove("active"));
+    btn.classList.add("active");
+  };
+  monthTabs.appendChild(btn);
+});
+
+function renderCalendar() {
+  calendarBody.innerHTML = "";
+  const firstDay = new Date(currentYear, currentMonth, 1);
+  const lastDay = new Date(currentYear, currentMonth + 1, 0);
+  const startDay = firstDay.getDay();
+  const totalDays = lastDay.getDate();
+  const today = getTodayDate();
+
+  let date = 1;
+  for (let i = 0; i < 6; i++) {
+    const row = document.createElement("tr");
+    for (let j = 0; j < 7; j++) {
+      const cell = document.createElement("td");
+      if (i === 0 && j < startDay) {
+        cell.innerHTML = "";
+      } else if (date > totalDays) {
+        break;
+      } else {
+        const fullDate = `${currentYear}-${String(currentMonth + 1).padStart(2, '0')}-${String(date).padStart(2, '0')}`;
+
+        if (fullDate === today) {
+          cell.innerHTML = `<div class="today-marker">${date}</div>`;
+        } else {
+          cell.innerHTML = `<div class="date">${date}</div>`;
+        }
+
+        const reminders = JSON.parse(localStorage.getItem("reminders") || "[]").filter(r => occursOn(r, fullDate));
+
+        reminders.forEach(reminder => {
+          const eventDiv = document.createElement("div");
+          eventDiv.className = "event";
+          let eventText = reminder.title;
+          if (reminder.time) {
+            eventText += ` (${formatTime(reminder.time)})`;
+          }
+          eventDiv.textContent = eventText;
+          eventDiv.onclick = () => viewReminder(reminder.id);
+          cell.appendChild(eventDiv);
+        });
+
+        date++;
+      }
+      row.appendChild(cell);
+    }
+    calendarBody.appendChild(row);
+    if (date > totalDays) break;
+  }
+}
+
+saveReminder.onclick = () => {
+  const title = document.getElementById("reminderTitle").value.trim();
+  const date = document.getElementById("reminderDate").value;
+  const time = document.getElementById("reminderTime").value;
+  const note = document.getElementById("reminderNote").value.trim();
+  const repeat = document.getElementById("reminderRepeat").value;
+
+  if (!title || !date) {
+    showAlert('Please enter both a title and date for your reminder.', 'warning', 'Missing Information');
+    return;
+  }
+
+  const reminders = JSON.parse(localStorage.getItem("reminders") || "[]");
+
+  const reminder = { id: editingReminderId || generateId(), title, date, time, note, repeat, tz: TIME_ZONE };
+
+  if (editingReminderId) {
+    const index = reminders.findIndex(r => r.id === editingReminderId);
+    if (index !== -1) {
+      reminders[index] = reminder;
+    }
+  } else {
+    reminders.push(reminder);
+  }
+
+  localStorage.setItem("reminders", JSON.stringify(reminders));
+  saveReminderOnServer(reminder);
+  popup.style.display = "none";
+  editingReminderId = null;
+  renderCalendar();
+  window.dispatchEvent(new Event('storage'));
+};
+
+function viewReminder(reminderId) {
+  const reminders = JSON.parse(localStorage.getItem("reminders") || "[]");
+  const reminder = reminders.find(r => r.id === reminderId);
+
+  if (!reminder) return;
+
+  viewingReminderId = reminderId;
+
+  let detailsHTML = `
+    <div class="reminder-detail">
+      <strong>Title</strong>
+      <div class="reminder-detail-value">${reminder.title}</div>
+    </div>
+    <div class="reminder-detail">
+      <strong>Date</strong>
+      <div class="reminder-detail-value">${new Date(reminder.date + 'T00:00:00').toLocaleDateString('en-US', { weekday: 'long', year: 'numeric', month: 'long', day: 'numeric' })}</div>
+    </div>
+  `;
+
+  if (reminder.time) {
+    detailsHTML += `
+      <div class="reminder-detail">
+        <strong>Time</strong>
+        <div class="reminder-detail-value">${formatTime(reminder.time)}</div>
+      </div>
+    `;
+  }
+
+  if (REPEAT_LABELS[reminder.repeat]) {
+    detailsHTML += `
+      <div class="reminder-detail">
+        <strong>Repeats</strong>
+        <div class="reminder-detail-value">${REPEAT_LABELS[reminder.repeat]}</div>
+      </div>
+    `;
+  }
+
+  if (reminder.note) {
+    detailsHTML += `
+      <div class="reminder-detail">
+        <strong>Notes</strong>
+        <div class="reminder-detail-value">${reminder.note}</div>
+      </div>
+    `;
+  }
+
+  document.getElementById("reminderDetails").innerHTML = detailsHTML;
+  viewPopup.style.display = "flex";
+}
+
+editReminderBtn.onclick = () => {
+  const reminders = JSON.parse(localStorage.getItem("reminders") || "[]");
+  const reminder = reminders.find(r => r.id === viewingReminderId);
+
+  if (!reminder) return;
+
+  editingReminderId = viewingReminderId;
+  document.getElementById("popupTitle").textContent = "Edit Reminder";
+  document.getElementById("reminderTitle").value = reminder.title;
+  document.getElementById("reminderDate").value = reminder.date;
+  document.getElementById("reminderTime").value = reminder.time || "";
+  document.getElementById("reminderRepeat").value = reminder.repeat || "none";
+  document.getElementById("reminderNote").value = reminder.note || "";
+
+  viewPopup.style.display = "none";
+  popup.style.display = "flex";
+};
+
+deleteReminderBtn.onclick = async () => {
+  const confirmed = await showConfirm({
+    title: 'Delete Reminder?',
+    message: 'Are you sure you want to delete this reminder? This action cannot be undone.',
+    type: 'warning',
+    icon: '<i data-lucide="trash-2" style="width: 32px; height: 32px; color: #ef4444;"></i>',
+    confirmText: 'Delete',
+    confirmType: 'danger',
+    cancelText: 'Cancel'
+  });
+
+  if (!confirmed) return;
+
+  let reminders = JSON.parse(localStorage.getItem("reminders") || "[]");
+  reminders = reminders.filter(r => r.id !== viewingReminderId);
+  localStorage.setItem("reminders", JSON.stringify(reminders));
+  deleteReminderOnServer(viewingReminderId);
+
+  viewPopup.style.display = "none";
+  viewingReminderId = null;
+  renderCalendar();
+  window.dispatchEvent(new Event('storage'));
+
+  showAlert('Reminder deleted successfully.', 'success', 'Reminder Deleted');
+};
+
+popup.onclick = (e) => {
+  if (e.target === popup) {
+    popup.style.display = "none";
+    editingReminderId = null;
+  }
+};
+
+viewPopup.onclick = (e) => {
+  if (e.target === viewPopup) {
+    viewPopup.style.display = "none";
+    viewingReminderId = null;
+  }
+};
+
+renderCalendar();
+syncReminders();
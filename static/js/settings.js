@@ -0,0 +1,473 @@
+// Initialize Lucide icons
+lucide.createIcons();
+
+// ============== USER PROFILE MANAGEMENT ==============
+function loadUserProfile() {
+  const profile = JSON.parse(localStorage.getItem('userProfile') || '{}');
+
+  // Load age
+  if (profile.age) {
+    document.getElementById('userAge').value = profile.age;
+  }
+
+  // Load gender
+  if (profile.gender) {
+    document.getElementById('userGender').value = profile.gender;
+  }
+
+  // Load physical measurements
+  if (profile.height) {
+    document.getElementById('userHeight').value = profile.height;
+  }
+
+  if (profile.weight) {
+    document.getElementById('userWeight').value = profile.weight;
+  }
+
+  // Update BMI display if available
+  updateBMIDisplay();
+
+  // Load conditions
+  if (profile.conditions && Array.isArray(profile.conditions)) {
+    profile.conditions.forEach(condition => {
+      const checkbox = document.querySelector(`input[value="${condition}"]`);
+      if (checkbox) {
+        checkbox.checked = true;
+      }
+    });
+  }
+
+  // Load medications
+  if (profile.medications) {
+    document.getElementById('userMedications').value = profile.medications;
+  }
+
+  // Load allergies
+  if (profile.allergies) {
+    document.getElementById('userAllergies').value = profile.allergies;
+  }
+
+  // Load diet
+  if (profile.diet) {
+    document.getElementById('userDiet').value = profile.diet;
+  }
+
+  // Load exercise level
+  if (profile.exerciseLevel) {
+    document.getElementById('userExerciseLevel').value = profile.exerciseLevel;
+  }
+
+  // Load smoking status
+  if (profile.smokingStatus) {
+    document.getElementById('userSmokingStatus').value = profile.smokingStatus;
+  }
+
+  // Load family history
+  if (profile.familyHistory) {
+    document.getElementById('userFamilyHistory').value = profile.familyHistory;
+  }
+
+  // Load goals
+  if (profile.goals) {
+    document.getElementById('userGoals').value = profile.goals;
+  }
+
+  // Load other conditions
+  if (profile.otherConditions) {
+    document.getElementById('userOtherConditions').value = profile.otherConditions;
+  }
+}
+
+function updateBMIDisplay() {
+  const height = document.getElementById('userHeight').value;
+  const weight = document.getElementById('userWeight').value;
+
+  if (height && weight) {
+    const heightInMeters = parseFloat(height) / 100;
+    const bmi = (parseFloat(weight) / (heightInMeters * heightInMeters)).toFixed(1);
+
+    document.getElementById('bmiValue').textContent = bmi;
+    document.getElementById('bmiDisplay').style.display = 'flex';
+
+    // Add BMI category color coding
+    const bmiElement = document.getElementById('bmiValue');
+    let bgColor, textColor;
+
+    if (bmi < 18.5) {
+      bgColor = 'linear-gradient(135deg, #fef3c7 0%, #fde68a 100%)';
+      textColor = '#92400e';
+    } else if (bmi >= 18.5 && bmi < 25) {
+      bgColor = 'linear-gradient(135deg, #dcfce7 0%, #bbf7d0 100%)';
+      textColor = '#15803d';
+    } else if (bmi >= 25 && bmi < 30) {
+      bgColor = 'linear-gradient(135deg, #fed7aa 0%, #fdba74 100%)';
+      textColor = '#9a3412';
+    } else {
+      bgColor = 'linear-gradient(135deg, #fecaca 0%, #fca5a5 100%)';
+      textColor = '#991b1b';
+    }
+
+    bmiElement.style.background = bgColor;
+    bmiElement.style.color = textColor;
+  } else {
+    document.getElementById('bmiDisplay').style.display = 'none';
+  }
+}
+
+function saveUserProfile() {
+  const age = document.getElementById('userAge').value;
+  const gender = document.getElementById('userGender').value;
+  const height = document.getElementById('userHeight').value;
+  const weight = document.getElementById('userWeight').value;
+
+  // Calculate BMI if both height and weight are provided
+  let bmi = null;
+  if (height && weight) {
+    const heightInMeters = parseFloat(height) / 100;
+    bmi = (parseFloat(weight) / (heightInMeters * heightInMeters)).toFixed(1);
+  }
+
+  // Get selected conditions
+  const conditionCheckboxes = document.querySelectorAll('.condition-checkbox-label input[type="checkbox"]:checked');
+  const selectedConditions = Array.from(conditionCheckboxes).map(cb => cb.value);
+
+  // Get medications
+  const medications = document.getElementById('userMedications').value.trim();
+
+  // Get allergies
+  const allergies = document.getElementById('userAllergies').value.trim();
+
+  // Get diet
+  const diet = document.getElementById('userDiet').value;
+
+  // Get exercise level
+  const exerciseLevel = document.getElementById('userExerciseLevel').value;
+
+  // Get smoking status
+  const smokingStatus = document.getElementById('userSmokingStatus').value;
+
+  // Get family history
+  const familyHistory = document.getElementById('userFamilyHistory').value.trim();
+
+  // Get goals
+  const goals = document.getElementById('userGoals').value.trim();
+
+  // Get other conditions
+  const otherConditions = document.getElementById('userOtherConditions').value.trim();
+
+  // Get existing profile to preserve other fields
+  const existingProfile = JSON.parse(localStorage.getItem('userProfile') || '{}');
+
+  // Create updated profile
+  const userProfile = {
+    ...existingProfile,
+    age: age || null,
+    gender: gender || null,
+    height: height || null,
+    weight: weight || null,
+    bmi: bmi,
+    conditions: selectedConditions,
+    medications: medications,
+    allergies: allergies,
+    diet: diet,
+    exerciseLevel: exerciseLevel,
+    smokingStatus: smokingStatus,
+    familyHistory: familyHistory,
+    goals: goals,
+    otherConditions: otherConditions,
+    updatedAt: new Date().toISOString(),
+    skipped: false // Mark as not skipped if user manually saves
+  };
+
+  localStorage.setItem('userProfile', JSON.stringify(userProfile));
+
+  showAlert('Your profile has been updated successfully!', 'success', 'Profile Saved');
+}
+
+// ============== THEME MANAGEMENT ==============
+function applyTheme(theme) {
+  let actualTheme = theme;
+
+  // Handle auto theme detection
+  if (theme === 'auto') {
+    const prefersDark = window.matchMedia('(prefers-color-scheme: dark)').matches;
+    actualTheme = prefersDark ? 'dark' : 'light';
+  }
+
+  if (actualTheme === 'dark') {
+    document.body.classList.add('dark-theme');
+    document.body.classList.remove('light-theme');
+    document.documentElement.classList.add('dark-theme');
+    document.documentElement.classList.remove('light-theme');
+  } else {
+    document.body.classList.add('light-theme');
+    document.body.classList.remove('dark-theme');
+    document.documentElement.classList.add('light-theme');
+    document.documentElement.classList.remove('dark-theme');
+  }
+}
+
+// Listen for system theme changes when using auto mode
+window.matchMedia('(prefers-color-scheme: dark)').addEventListener('change', (e) => {
+  const settings = JSON.parse(localStorage.getItem('appSettings') || '{}');
+  if (settings.theme === 'auto') {
+    applyTheme('auto');
+  }
+});
+
+// ============== COMPACT MODE ==============
+function applyCompactMode(enabled) {
+  if (enabled) {
+    document.body.classList.add('compact-mode');
+  } else {
+    document.body.classList.remove('compact-mode');
+  }
+}
+
+// ============== SETTINGS MANAGEMENT ==============
+function loadSettings() {
+  const settings = JSON.parse(localStorage.getItem('appSettings') || '{}');
+
+  // Set default values
+  const defaultSettings = {
+    theme: 'light',
+    compactMode: false,
+    autoSave: true
+  };
+
+  const mergedSettings = { ...defaultSettings, ...settings };
+
+  // Apply theme
+  if (mergedSettings.theme) {
+    document.getElementById('themeSelect').value = mergedSettings.theme;
+    applyTheme(mergedSettings.theme);
+  }
+
+  // Apply compact mode
+  if (mergedSettings.compactMode !== undefined) {
+    document.getElementById('compactModeToggle').checked = mergedSettings.compactMode;
+    applyCompactMode(mergedSettings.compactMode);
+  }
+
+  // Apply auto-save
+  if (mergedSettings.autoSave !== undefined) {
+    document.getElementById('autoSaveToggle').checked = mergedSettings.autoSave;
+  }
+}
+
+function saveSettings() {
+  const settings = {
+    theme: document.getElementById('themeSelect').value,
+    compactMode: document.getElementById('compactModeToggle').checked,
+    autoSave: document.getElementById('autoSaveToggle').checked
+  };
+
+  localStorage.setItem('appSettings', JSON.stringify(settings));
+
+  // Apply settings immediately
+  applyTheme(settings.theme);
+  applyCompactMode(settings.compactMode);
+
+  showSuccessMessage();
+}
+
+function showSuccessMessage() {
+  const message = document.getElementById('successMessage');
+  message.classList.add('show');
+  setTimeout(() => {
+    message.classList.remove('show');
+  }, 3000);
+}
+
+// ============== DATA STATISTICS ==============
+function updateDataStats() {
+  const symptoms = JSON.parse(localStorage.getItem('symptomHistory') || '{}');
+  const reminders = JSON.parse(localStorage.getItem('reminders') || '[]');
+
+  const symptomCount = Object.keys(symptoms).length;
+  const reminderCount = reminders.length;
+
+  document.getElementById('symptomCount').textContent = symptomCount;
+  document.getElementById('reminderCount').textContent = reminderCount;
+}
+
+// ============== DATA MANAGEMENT ==============
+function exportData() {
+  const data = {
+    symptoms: JSON.parse(localStorage.getItem('symptomHistory') || '{}'),
+    reminders: JSON.parse(localStorage.getItem('reminders') || '[]'),
+    settings: JSON.parse(localStorage.getItem('appSettings') || '{}'),
+    userProfile: JSON.parse(localStorage.getItem('userProfile') || '{}'),
+    exportDate: new Date().toISOString(),
+    version: '1.0.0'
+  };
+
+  const dataStr = JSON.stringify(data, null, 2);
+  const dataBlob = new Blob([dataStr], { type: 'application/json' });
+  const url = URL.createObjectURL(dataBlob);
+  const link = document.createElement('a');
+  link.href = url;
+  link.download = `glycogenie-data-${new Date().toISOString().split('T')[0]}.json`;
+  document.body.appendChild(link);
+  link.click();
+  document.body.removeChild(link);
+  URL.revokeObjectURL(url);
+
+  showSuccessMessage();
+}
+
+// Glucose readings and reminders live on the server, which streams them as
+// gzipped NDJSON straight to disk and reads imports as they upload
+function exportHistory() {
+  const link = document.createElement('a');
+  link.href = '/api/export?format=ndjson';
+  document.body.appendChild(link);
+  link.click();
+  document.body.removeChild(link);
+}
+
+async function importHistory(file) {
+  const button = document.getElementById('importHistoryBtn');
+  button.disabled = true;
+  try {
+    const response = await fetch('/api/import', { method: 'POST', body: file });
+    const result = await response.json();
+    if (!response.ok) {
+      throw new Error(result.error || 'Import failed');
+    }
+    const added = result.glucose_inserted + result.reminders_inserted;
+    let message = `Added ${added} records (${result.glucose_inserted} glucose entries, ${result.reminders_inserted} reminders).`;
+    if (result.duplicates) message += ` ${result.duplicates} were already here.`;
+    if (result.invalid) message += ` ${result.invalid} could not be read.`;
+    showAlert(message, result.invalid ? 'warning' : 'success', 'Import Complete');
+  } catch (error) {
+    showAlert(`Could not import ${file.name}: ${error.message}`, 'error', 'Import Failed');
+  } finally {
+    button.disabled = false;
+  }
+}
+
+async function clearAllData() {
+  const confirmed = await showConfirm({
+    title: '⚠️ Clear All Data?',
+    message: 'Are you sure you want to clear all data? This action cannot be undone.',
+    type: 'warning',
+    icon: '<i data-lucide="alert-triangle" style="width: 32px; height: 32px; color: #ef4444;"></i>',
+    confirmText: 'Yes, Clear All',
+    confirmType: 'danger',
+    cancelText: 'Cancel'
+  });
+
+  if (!confirmed) return;
+
+  const doubleConfirm = await showConfirm({
+    title: 'Final Confirmation',
+    message: 'This will delete all symptoms, reminders, settings, and your profile. Continue?',
+    type: 'error',
+    icon: '<i data-lucide="alert-octagon" style="width: 32px; height: 32px; color: #dc2626;"></i>',
+    confirmText: 'Yes, Delete Everything',
+    confirmType: 'danger',
+    cancelText: 'No, Go Back'
+  });
+
+  if (!doubleConfirm) return;
+
+  // Reminders are delivered from the server, so they have to be deleted there too
+  try {
+    const response = await fetch('/api/reminders', { method: 'DELETE' });
+    if (!response.ok) throw new Error('Reminder API request failed');
+  } catch (error) {
+    showAlert('Could not delete your reminders. Please try again.', 'error', 'Clear Failed');
+    return;
+  }
+
+  localStorage.removeItem('symptomHistory');
+  localStorage.removeItem('reminders');
+  localStorage.removeItem('reminderPending');
+  localStorage.removeItem('appSettings');
+  localStorage.removeItem('userProfile');
+
+  // Reset to defaults
+  updateDataStats();
+
+  // Reload settings with defaults
+  const defaultSettings = {
+    theme: 'light',
+    compactMode: false,
+    autoSave: true
+  };
+  localStorage.setItem('appSettings', JSON.stringify(defaultSettings));
+
+  loadSettings();
+  loadUserProfile();
+  showAlert('All data has been cleared successfully. The page will reload in a moment.', 'success', 'Data Cleared');
+
+  // Reload page to reset everything
+  setTimeout(() => location.reload(), 2000);
+}
+
+// ============== UTILITY FUNCTIONS ==============
+function setLastUpdated() {
+  const date = new Date();
+  const formatted = date.toLocaleDateString('en-US', { 
+    year: 'numeric', 
+    month: 'long', 
+    day: 'numeric' 
+  });
+  document.getElementById('lastUpdated').textContent = formatted;
+}
+
+// ============== EVENT LISTENERS ==============
+document.getElementById('themeSelect').addEventListener('change', saveSettings);
+
+document.getElementById('compactModeToggle').addEventListener('change', saveSettings);
+
+document.getElementById('autoSaveToggle').addEventListener('change', saveSettings);
+
+document.getElementById('exportDataBtn').addEventListener('click', exportData);
+
+document.getElementById('clearDataBtn').addEventListener('click', clearAllData);
+
+document.getElementById('exportHistoryBtn').addEventListener('click', exportHistory);
+
+document.getElementById('importHistoryBtn').addEventListener('click', () => {
+  document.getElementById('importHistoryFile').click();
+});
+
+document.getElementById('importHistoryFile').addEventListener('change', (e) => {
+  const file = e.target.files[0];
+  e.target.value = '';
+  if (file) importHistory(file);
+});
+
+// Add event listeners for height and weight to update BMI
+document.addEventListener('DOMContentLoaded', () => {
+  const heightInput = document.getElementById('userHeight');
+  const weightInput = document.getElementById('userWeight');
+
+  if (heightInput) {
+    heightInput.addEventListener('input', updateBMIDisplay);
+  }
+
+  if (weightInput) {
+    weightInput.addEventListener('input', updateBMIDisplay);
+  }
+
+  // Load everything
+  loadUserProfile();
+  loadSettings();
+  updateDataStats();
+  setLastUpdated();
+  lucide.createIcons();
+});
+
+// Apply settings on page load (for navigation between pages)
+window.addEventListener('load', () => {
+  const settings = JSON.parse(localStorage.getItem('appSettings') || '{}');
+  if (settings.theme) {
+    applyTheme(settings.theme);
+  }
+  if (settings.compactMode) {
+    applyCompactMode(settings.compactMode);
+  }
+});
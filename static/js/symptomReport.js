@@ -0,0 +1,157 @@
+// Initialize Lucide icons
+lucide.createIcons();
+
+document.querySelectorAll('.emoji-btn').forEach(btn => 
+  btn.addEventListener('click', function() {
+    document.querySelectorAll('.emoji-btn').forEach(b => b.classList.remove('selected'));
+    this.classList.add('selected');
+  })
+);
+
+document.querySelectorAll('.yn-grid').forEach(row => 
+  row.querySelectorAll('.yn-btn').forEach(btn => {
+    btn.onclick = () => {
+      row.querySelectorAll('.yn-btn').forEach(b => b.classList.remove('selected'));
+      btn.classList.add('selected');
+      const severityDiv = document.getElementById(row.id.replace('-row', '-severity'));
+      if (severityDiv) {
+        severityDiv.style.display = btn.getAttribute('data-value') === 'Yes' ? 'block' : 'none';
+      }
+    };
+  })
+);
+
+function getTodayDate() {
+  const t = new Date();
+  return `${t.getFullYear()}-${String(t.getMonth() + 1).padStart(2,'0')}-${String(t.getDate()).padStart(2,'0')}`;
+}
+
+function formatDate(d) {
+  const date = new Date(d + 'T00:00:00');
+  return date.toLocaleDateString(undefined, { year: 'numeric', month: 'long', day: 'numeric' });
+}
+
+function saveSymptoms(data) {
+  const today = getTodayDate();
+  let history = JSON.parse(localStorage.getItem('symptomHistory') || '{}');
+  history[today] = data;
+  localStorage.setItem('symptomHistory', JSON.stringify(history));
+}
+
+function loadSymptoms() {
+  return JSON.parse(localStorage.getItem('symptomHistory') || '{}');
+}
+
+document.getElementById('symptomForm').addEventListener('submit', function(e) {
+  e.preventDefault();
+
+  const selectedFeeling = document.querySelector('.emoji-btn.selected');
+  const feeling = selectedFeeling ? selectedFeeling.getAttribute('data-value') : null;
+
+  const data = {
+    feeling: feeling,
+    fever: null,
+    feverSeverity: null,
+    cough: null,
+    coughSeverity: null,
+    fatigue: null,
+    fatigueSeverity: null,
+    other: document.getElementById('other').value.trim()
+  };
+
+  const feverBtn = document.querySelector('#fever-row .yn-btn.selected');
+  if (feverBtn) {
+    data.fever = feverBtn.getAttribute('data-value');
+    if (data.fever === 'Yes') data.feverSeverity = document.getElementById('fever_severity').value;
+  }
+
+  const coughBtn = document.querySelector('#cough-row .yn-btn.selected');
+  if (coughBtn) {
+    data.cough = coughBtn.getAttribute('data-value');
+    if (data.cough === 'Yes') data.coughSeverity = document.getElementById('cough_severity').value;
+  }
+
+  const fatigueBtn = document.querySelector('#fatigue-row .yn-btn.selected');
+  if (fatigueBtn) {
+    data.fatigue = fatigueBtn.getAttribute('data-value');
+    if (data.fatigue === 'Yes') data.fatigueSeverity = document.getElementById('fatigue_severity').value;
+  }
+
+  saveSymptoms(data);
+
+  const toast = document.getElementById('successToast');
+  toast.style.display = 'flex';
+  lucide.createIcons(); // Re-initialize icons in toast
+  setTimeout(() => { toast.style.display = 'none'; }, 3000);
+
+  document.querySelectorAll('.emoji-btn, .yn-btn').forEach(b => b.classList.remove('selected'));
+  document.querySelectorAll('.severity-select').forEach(c => c.style.display = 'none');
+  document.getElementById('other').value = '';
+
+  window.dispatchEvent(new Event('storage'));
+});
+
+function openHistoryModal() {
+  const modal = document.getElementById('historyModal');
+  const body = document.getElementById('historyBody');
+  const history = loadSymptoms();
+
+  if (Object.keys(history).length === 0) {
+    body.innerHTML = '<div class="empty-state">No symptom history available yet. Submit your first entry to get started!</div>';
+  } else {
+    let html = '';
+    Object.keys(history).sort().reverse().forEach(date => {
+      const d = history[date];
+      html += `<div class="history-item">`;
+      html += `<div class="history-date">${formatDate(date)}</div>`;
+      if (d.feeling) html += `<div class="history-detail"><strong>Overall Feeling:</strong> ${d.feeling}</div>`;
+      if (d.fever) html += `<div class="history-detail"><strong>Fever:</strong> ${d.fever === 'Yes' ? d.feverSeverity : 'None'}</div>`;
+      if (d.cough) html += `<div class="history-detail"><strong>Cough:</strong> ${d.cough === 'Yes' ? d.coughSeverity : 'None'}</div>`;
+      if (d.fatigue) html += `<div class="history-detail"><strong>Fatigue:</strong> ${d.fatigue === 'Yes' ? d.fatigueSeverity : 'None'}</div>`;
+      if (d.other) html += `<div class="history-detail"><strong>Other:</strong> ${d.other}</div>`;
+      html += `</div>`;
+    });
+    body.innerHTML = html;
+  }
+
+  modal.style.display = 'flex';
+}
+
+function closeHistoryModal() {
+  document.getElementById('historyModal').style.display = 'none';
+}
+
+function exportToPDF() {
+  const { jsPDF } = window.jspdf;
+  const doc = new jsPDF();
+  const history = loadSymptoms();
+
+  doc.setFontSize(20);
+  doc.text('Symptom History Report', 20, 20);
+  doc.setFontSize(12);
+
+  let y = 40;
+  if (Object.keys(history).length === 0) {
+    doc.text('No symptom history available.', 20, y);
+  } else {
+    Object.keys(history).sort().reverse().forEach(date => {
+      const d = history[date];
+      doc.setFontSize(14);
+      doc.text(formatDate(date), 20, y);
+      y += 10;
+      doc.setFontSize(11);
+      if (d.feeling) { doc.text(`Overall Feeling: ${d.feeling}`, 25, y); y += 7; }
+      if (d.fever) { doc.text(`Fever: ${d.fever === 'Yes' ? d.feverSeverity : 'None'}`, 25, y); y += 7; }
+      if (d.cough) { doc.text(`Cough: ${d.cough === 'Yes' ? d.coughSeverity : 'None'}`, 25, y); y += 7; }
+      if (d.fatigue) { doc.text(`Fatigue: ${d.fatigue === 'Yes' ? d.fatigueSeverity : 'None'}`, 25, y); y += 7; }
+      if (d.other) { doc.text(`Other: ${d.other}`, 25, y); y += 7; }
+      y += 5;
+      if (y > 270) {
+        doc.addPage();
+        y = 20;
+      }
+    });
+  }
+
+  doc.save('symptom-history.pdf');
+}
@@ -0,0 +1,731 @@
+// Initialize Lucide icons
+lucide.createIcons();
+
+const uploadBtn = document.getElementById("upload-btn");
+const captureBtn = document.getElementById("capture-btn");
+const video = document.getElementById("camera-feed");
+const img = document.getElementById("uploaded-image");
+const placeholder = document.getElementById("placeholder");
+const canvas = document.getElementById("snapshot");
+const resultsContent = document.getElementById("resultsContent");
+
+let stream = null;
+let capturing = false;
+let currentImageData = null;
+
+uploadBtn.addEventListener("click", () => {
+  const input = document.createElement("input");
+  input.type = "file";
+  // EXPLICITLY ADD .jfif
+  input.accept = ".jpg,.jpeg,.jfif,.jpe,.png,.gif,.bmp,.webp,.svg,.tif,.tiff,.heic,.heif,image/*";
+
+  input.onchange = async e => {
+    const file = e.target.files[0];
+    if (!file) return;
+
+    const fileName = file.name.toLowerCase();
+
+    // HANDLE JFIF EXPLICITLY
+    if (fileName.endsWith('.jfif')) {
+      console.log('JFIF file detected, forcing JPEG conversion...');
+      // Force treat as JPEG
+      const jpegBlob = new Blob([file], { type: 'image/jpeg' });
+      const reader = new FileReader();
+      reader.onload = ev => {
+        showUploadedImage(ev.target.result);
+        identifyFood(ev.target.result);
+      };
+      reader.readAsDataURL(jpegBlob);
+      return;
+    }
+
+    // Rest of your existing code for HEIC and other formats...
+
+    if (file.type === "image/heic" || file.name.endsWith(".heic") || file.name.endsWith(".heif")) {
+      try {
+        const converted = await heic2any({
+          blob: file,
+          toType: "image/jpeg",
+          quality: 0.9
+        });
+        // Convert blob to file
+        const convertedFile = new File([converted], "converted.jpg", { type: "image/jpeg" });
+
+        // Show preview
+        const reader = new FileReader();
+        reader.onload = ev => {
+          showUploadedImage(ev.target.result);
+        };
+        reader.readAsDataURL(convertedFile);
+
+        // Send file directly
+        identifyFood(convertedFile);
+      } catch (err) {
+        console.error(err);
+        showError('Could not convert HEIC image. Try exporting it as JPEG or PNG.');
+      }
+    } else {
+      // Show preview
+      const reader = new FileReader();
+      reader.onload = ev => {
+        showUploadedImage(ev.target.result);
+      };
+      reader.readAsDataURL(file);
+
+      // Send file directly
+      identifyFood(file);
+    }
+  };
+  input.click();
+});
+
+function showUploadedImage(dataUrl) {
+  currentImageData = dataUrl;
+  img.src = dataUrl;
+  img.style.display = "block";
+  video.style.display = "none";
+  canvas.style.display = "none";
+  placeholder.style.display = "none";
+}
+
+captureBtn.addEventListener("click", async () => {
+  if (!capturing) {
+    try {
+      stream = await navigator.mediaDevices.getUserMedia({ video: true });
+      video.srcObject = stream;
+      video.style.display = "block";
+      img.style.display = "none";
+      canvas.style.display = "none";
+      placeholder.style.display = "none";
+      capturing = true;
+      captureBtn.innerHTML = '<i data-lucide="camera" class="action-btn-icon"></i><span>Snap Photo</span>';
+      lucide.createIcons();
+
+      showPlaceholder();
+    } catch (err) {
+      showError('Camera access denied or not available. Please enable camera permissions in your browser.');
+    }
+  } else {
+    const context = canvas.getContext("2d");
+    const w = video.videoWidth;
+    const h = video.videoHeight;
+    canvas.width = w;
+    canvas.height = h;
+    context.drawImage(video, 0, 0, w, h);
+
+    stream.getTracks().forEach(track => track.stop());
+    stream = null;
+
+    video.style.display = "none";
+    canvas.style.display = "block";
+    captureBtn.innerHTML = '<i data-lucide="camera" class="action-btn-icon"></i><span>Take Photo</span>';
+    lucide.createIcons();
+    capturing = false;
+
+    // Convert canvas to blob and then to file
+    canvas.toBlob((blob) => {
+      const file = new File([blob], "camera-capture.jpg", { type: "image/jpeg" });
+      identifyFood(file);
+    }, 'image/jpeg', 0.9);
+  }
+});
+
+function showPlaceholder() {
+  resultsContent.innerHTML = '<p style="color: #94a3b8; font-style: italic; text-align: center; padding: 20px;">Upload or capture an image to identify the food</p>';
+}
+
+function showLoading() {
+  resultsContent.innerHTML = `
+    <div class="loading-spinner">
+      <div class="spinner"></div>
+      <div class="loading-text">Analyzing food with AI...</div>
+    </div>
+  `;
+}
+
+function showError(message, debugInfo = null) {
+  let html = `
+    <div class="error-message">
+      <i data-lucide="alert-circle" class="error-icon"></i>
+      <div>${message}</div>
+    </div>
+  `;
+
+  if (debugInfo) {
+    html += `<div class="debug-info">${debugInfo}</div>`;
+  }
+
+  resultsContent.innerHTML = html;
+  lucide.createIcons();
+}
+
+async function identifyFood(imageFile) {
+  showLoading();
+
+  try {
+    // Get selected nutritional needs
+    const selectedNeeds = Array.from(document.querySelectorAll('input[name="need"]:checked'))
+      .map(cb => cb.value);
+
+    console.log('Sending request to Flask backend...');
+    console.log('Selected nutritional needs:', selectedNeeds);
+    console.log('Image file:', imageFile.name, 'Size:', imageFile.size, 'Type:', imageFile.type);
+
+    const formData = new FormData();
+    formData.append("image", imageFile);
+    formData.append("nutritional_needs", JSON.stringify(selectedNeeds));
+
+    const response = await fetch('/upload', {
+        method: 'POST',
+        body: formData
+    });
+
+
+    console.log('Response status:', response.status);
+
+    const data = await response.json();
+    console.log('==================== FULL API RESPONSE ====================');
+    console.log('Full response:', JSON.stringify(data, null, 2));
+    console.log('===========================================================');
+
+    if (!response.ok) {
+      let errorMsg = 'API request failed';
+      if (data.error) {
+        errorMsg = data.error;
+      }
+      throw new Error(errorMsg);
+    }
+
+    if (!data.outputs || !data.outputs[0] || !data.outputs[0].data || !data.outputs[0].data.concepts) {
+      throw new Error('Invalid API response format');
+    }
+
+    const concepts = data.outputs[0].data.concepts;
+
+    console.log('==================== CONCEPTS CHECK ====================');
+    console.log('Number of concepts:', concepts.length);
+    concepts.forEach((c, i) => {
+      console.log(`Concept ${i}: ${c.name}`);
+      console.log(`  - Has gemini_advice property:`, 'gemini_advice' in c);
+      console.log(`  - gemini_advice value:`, c.gemini_advice);
+      console.log(`  - gemini_advice type:`, typeof c.gemini_advice);
+    });
+    console.log('=======================================================');
+
+    if (concepts.length === 0) {
+      showError('No food detected in the image. Please try another image with clearer food items.');
+      return;
+    }
+
+    console.log('Food concepts found:', concepts);
+
+    // Only show the TOP result (index 0)
+    const topConcept = concepts[0];
+    const foodName = topConcept.name;
+    const confidence = Math.round(topConcept.value * 100);
+
+    console.log(`Processing top concept: ${foodName}`);
+    console.log(`Has gemini_advice:`, !!topConcept.gemini_advice);
+    if (topConcept.gemini_advice) {
+      console.log(`Gemini advice: ${topConcept.gemini_advice.substring(0, 50)}...`);
+    }
+
+    // Use real nutrition data if available
+    let nutritionData;
+    if (topConcept.nutrition && typeof topConcept.nutrition === 'object') {
+      const n = topConcept.nutrition;
+      nutritionData = {
+        calories: Math.round(n.calories || 0),
+        protein: `${Math.round(n.protein_g || 0)}g`,
+        carbs: `${Math.round(n.carbohydrates_total_g || 0)}g`,
+        fat: `${Math.round(n.fat_total_g || 0)}g`,
+        fiber: `${Math.round(n.fiber_g || 0)}g`,
+        sodium: `${Math.round(n.sodium_mg || 0)}mg`,
+        sugar: `${Math.round(n.sugar_g || 0)}g`,
+        servingSize: `${Math.round(n.serving_size_g || 100)}g`,
+        tags: generateTags(n),
+        hasRealData: true
+      };
+    } else {
+      // Fallback to estimates
+      nutritionData = estimateNutrition(foodName);
+      nutritionData.hasRealData = false;
+    }
+
+    const food = {
+      name: foodName.charAt(0).toUpperCase() + foodName.slice(1),
+      confidence: confidence,
+      category: 'Food',
+      geminiAdvice: topConcept.gemini_advice || null,
+      ...nutritionData
+    };
+
+    console.log('Final food object:', food);
+
+    displayFoodResult(food);
+
+  } catch (error) {
+    console.error('Food identification error:', error);
+    const errorMessage = error.message || 'Failed to identify food';
+    showError('Failed to identify food. Check console for details.', errorMessage);
+  }
+}
+
+function generateTags(nutrition) {
+  const tags = [];
+
+  if (!nutrition || typeof nutrition !== 'object') {
+    return tags;
+  }
+
+  const sodium = parseFloat(nutrition.sodium_mg) || 0;
+  const protein = parseFloat(nutrition.protein_g) || 0;
+  const sugar = parseFloat(nutrition.sugar_g) || 0;
+  const fiber = parseFloat(nutrition.fiber_g) || 0;
+
+  if (sodium < 140) tags.push('Low Sodium');
+  if (protein > 10) tags.push('High Protein');
+  if (sugar < 5) tags.push('Low Sugar');
+  if (fiber > 5) tags.push('High Fiber');
+
+  return tags;
+}
+
+function displayFoodResult(food) {
+  if (!food) {
+    showError('No food detected in the image. Please try another image.');
+    return;
+  }
+
+  console.log('Displaying food result:', food);
+  console.log('Food has geminiAdvice:', !!food.geminiAdvice);
+
+  let html = `
+    <div class="food-result">
+      <div class="food-name">
+        <span>${food.name}</span>
+        <span class="confidence-badge">${food.confidence}%</span>
+        ${food.hasRealData ? '<span style="font-size: 0.7rem; background: linear-gradient(135deg, #dbeafe 0%, #bfdbfe 100%); color: #1e40af; padding: 4px 8px; border-radius: 8px; font-weight: 700; margin-left: 4px;">Verified Data</span>' : ''}
+      </div>
+      <div class="food-info">
+        <strong>Category:</strong> ${food.category || 'Food'}
+      </div>
+
+      ${food.servingSize ? `
+        <div class="food-info" style="margin-top: 8px;">
+          <strong>Serving Size:</strong> ${food.servingSize}
+        </div>
+      ` : ''}
+
+      ${food.calories ? `
+        <div class="nutrition-grid">
+          <div class="nutrition-item">
+            <div class="nutrition-label">Calories</div>
+            <div class="nutrition-value">${food.calories}</div>
+          </div>
+          <div class="nutrition-item">
+            <div class="nutrition-label">Protein</div>
+            <div class="nutrition-value">${food.protein || 'N/A'}</div>
+          </div>
+          <div class="nutrition-item">
+            <div class="nutrition-label">Carbs</div>
+            <div class="nutrition-value">${food.carbs || 'N/A'}</div>
+          </div>
+          <div class="nutrition-item">
+            <div class="nutrition-label">Fat</div>
+            <div class="nutrition-value">${food.fat || 'N/A'}</div>
+          </div>
+        </div>
+      ` : ''}
+
+      ${food.fiber ? `
+        <div style="margin-top: 12px; padding: 10px; background: white; border-radius: 10px; border: 2px solid #e2e8f0;">
+          <div style="display: grid; grid-template-columns: repeat(3, 1fr); gap: 8px; text-align: center;">
+            <div>
+              <div class="nutrition-label">Fiber</div>
+              <div style="font-weight: 700; color: #0f172a;">${food.fiber}</div>
+            </div>
+            <div>
+              <div class="nutrition-label">Sodium</div>
+              <div style="font-weight: 700; color: #0f172a;">${food.sodium}</div>
+            </div>
+            <div>
+              <div class="nutrition-label">Sugar</div>
+              <div style="font-weight: 700; color: #0f172a;">${food.sugar}</div>
+            </div>
+          </div>
+        </div>
+      ` : ''}
+
+      ${food.tags && food.tags.length > 0 ? `
+        <div class="food-info" style="margin-top: 12px;">
+          <strong>Tags:</strong> ${food.tags.join(', ')}
+        </div>
+      ` : ''}
+
+      <button id="override-btn" class="override-btn" style="margin-top: 16px; width: 100%; padding: 12px; background: linear-gradient(135deg, #8b5cf6 0%, #7c3aed 100%); color: white; border: none; border-radius: 10px; font-weight: 700; cursor: pointer; display: flex; align-items: center; justify-content: center; gap: 8px; transition: all 0.3s ease;">
+        <i data-lucide="edit-3" style="width: 18px; height: 18px;"></i>
+        <span>Override Detection</span>
+      </button>
+
+      <div id="override-section" style="display: none; margin-top: 16px; padding: 16px; background: #f8fafc; border-radius: 10px; border: 2px solid #e2e8f0;">
+        <div style="margin-bottom: 12px; font-weight: 700; color: #0f172a; display: flex; align-items: center; gap: 8px;">
+          <i data-lucide="search" style="width: 18px; height: 18px; color: #8b5cf6;"></i>
+          <span>Select Different Food</span>
+        </div>
+        <input type="text" id="food-search" placeholder="Search for a food..." style="width: 100%; padding: 10px 12px; border: 2px solid #e2e8f0; border-radius: 8px; font-size: 0.9375rem; margin-bottom: 8px; font-family: inherit;">
+        <div id="food-dropdown" style="max-height: 200px; overflow-y: auto; background: white; border: 2px solid #e2e8f0; border-radius: 8px; display: none;">
+          <!-- Dropdown items will be inserted here -->
+        </div>
+        <button id="cancel-override-btn" style="margin-top: 8px; width: 100%; padding: 8px; background: #e2e8f0; color: #475569; border: none; border-radius: 8px; font-weight: 600; cursor: pointer; transition: all 0.2s ease;">
+          Cancel
+        </button>
+      </div>
+    </div>
+  `;
+
+  resultsContent.innerHTML = html;
+  lucide.createIcons();
+
+  // Initialize override functionality
+  initializeOverride();
+
+  // Update banner with AI advice
+  updateInfoBanner(food);
+}
+
+function estimateNutrition(foodName) {
+  const name = foodName.toLowerCase();
+
+  if (name.includes('chicken') || name.includes('meat') || name.includes('fish') || name.includes('egg') || name.includes('beef') || name.includes('pork')) {
+    return {
+      calories: 200,
+      protein: '30g',
+      carbs: '0g',
+      fat: '8g',
+      fiber: '0g',
+      sodium: '70mg',
+      sugar: '0g',
+      tags: ['High Protein', 'Low Carb']
+    };
+  }
+
+  if (name.includes('salad') || name.includes('vegetable') || name.includes('broccoli') || name.includes('lettuce') || name.includes('spinach') || name.includes('kale')) {
+    return {
+      calories: 50,
+      protein: '3g',
+      carbs: '10g',
+      fat: '0.5g',
+      fiber: '4g',
+      sodium: '25mg',
+      sugar: '2g',
+      tags: ['Vegetarian', 'High Fiber', 'Low Sodium', 'Gluten Free', 'Low Sugar']
+    };
+  }
+
+  if (name.includes('fruit') || name.includes('apple') || name.includes('banana') || name.includes('berry') || name.includes('orange') || name.includes('grape')) {
+    return {
+      calories: 80,
+      protein: '1g',
+      carbs: '20g',
+      fat: '0g',
+      fiber: '3g',
+      sodium: '0mg',
+      sugar: '15g',
+      tags: ['Vegetarian', 'High Fiber', 'Low Sodium', 'Gluten Free']
+    };
+  }
+
+  if (name.includes('pasta') || name.includes('bread') || name.includes('noodle') || name.includes('spaghetti') || name.includes('pizza')) {
+    return {
+      calories: 350,
+      protein: '12g',
+      carbs: '70g',
+      fat: '2g',
+      fiber: '3g',
+      sodium: '400mg',
+      sugar: '5g',
+      tags: ['Contains Gluten']
+    };
+  }
+
+  if (name.includes('rice') || name.includes('quinoa') || name.includes('oat')) {
+    return {
+      calories: 200,
+      protein: '5g',
+      carbs: '45g',
+      fat: '1g',
+      fiber: '2g',
+      sodium: '5mg',
+      sugar: '0g',
+      tags: ['Gluten Free', 'Vegetarian']
+    };
+  }
+
+  return {
+    calories: 150,
+    protein: '5g',
+    carbs: '20g',
+    fat: '5g',
+    fiber: '2g',
+    sodium: '100mg',
+    sugar: '3g',
+    tags: []
+  };
+}
+
+function updateInfoBanner(food) {
+  const infoBanner = document.querySelector('.info-banner');
+  if (!infoBanner || !food) return;
+
+  // Display AI advice in the banner if available
+  if (food.geminiAdvice) {
+    infoBanner.innerHTML = `
+      <div style="display: flex; align-items: start; gap: 16px; text-align: left;">
+        <div style="flex-shrink: 0; width: 48px; height: 48px; background: linear-gradient(135deg, #10b981 0%, #059669 100%); border-radius: 50%; display: flex; align-items: center; justify-content: center;">
+          <i data-lucide="sparkles" style="width: 24px; height: 24px; color: white;"></i>
+        </div>
+        <div style="flex: 1;">
+          <h3 style="color: #065f46; font-size: 1.125rem; font-weight: 800; margin: 0 0 8px 0; letter-spacing: -0.02em;">
+            AI Health Insight for ${food.name}
+          </h3>
+          <p style="color: #064e3b; font-size: 1rem; line-height: 1.7; margin: 0;">
+            ${food.geminiAdvice}
+          </p>
+        </div>
+      </div>
+    `;
+    lucide.createIcons();
+    return;
+  }
+
+  // Fallback to nutritional compatibility message
+  const selectedNeeds = Array.from(document.querySelectorAll('input[name="need"]:checked'))
+    .map(cb => cb.value);
+
+  if (selectedNeeds.length === 0) {
+    infoBanner.textContent = `Based on the analysis, this is ${food.name} with approximately ${food.calories || 'unknown'} calories.`;
+    return;
+  }
+
+  const matches = [];
+  const mismatches = [];
+
+  selectedNeeds.forEach(need => {
+    if (food.tags && food.tags.some(tag => tag.toLowerCase().includes(need.toLowerCase()))) {
+      matches.push(need);
+    } else {
+      mismatches.push(need);
+    }
+  });
+
+  let message = '';
+  if (matches.length > 0 && mismatches.length === 0) {
+    message = `✓ Great choice! This ${food.name} aligns perfectly with your nutritional goals: ${matches.join(', ')}.`;
+  } else if (matches.length > 0) {
+    message = `This ${food.name} meets some of your goals (${matches.join(', ')}) but may not align with: ${mismatches.join(', ')}.`;
+  } else {
+    message = `⚠️ Note: This ${food.name} may not align with your selected nutritional needs: ${mismatches.join(', ')}.`;
+  }
+
+  infoBanner.textContent = message;
+}
+
+// Initialize
+showPlaceholder();
+
+// ============== OVERRIDE FUNCTIONALITY ==============
+
+let availableFoods = [];
+let currentFoodData = null;
+
+// Fetch available foods when page loads
+async function loadFoodList() {
+  try {
+    const response = await fetch('/api/food-list');
+    const data = await response.json();
+    if (data.success) {
+      availableFoods = data.foods;
+      console.log(`Loaded ${availableFoods.length} food items`);
+    }
+  } catch (error) {
+    console.error('Error loading food list:', error);
+  }
+}
+
+// Setup override button event listener
+function setupOverrideButton() {
+  const overrideBtn = document.getElementById('override-btn');
+  const overrideSection = document.getElementById('override-section');
+  const cancelBtn = document.getElementById('cancel-override-btn');
+  const foodSearch = document.getElementById('food-search');
+  const foodDropdown = document.getElementById('food-dropdown');
+
+  if (!overrideBtn) return;
+
+  overrideBtn.addEventListener('click', () => {
+    overrideSection.style.display = 'block';
+    overrideBtn.style.display = 'none';
+    foodSearch.focus();
+  });
+
+  cancelBtn.addEventListener('click', () => {
+    overrideSection.style.display = 'none';
+    overrideBtn.style.display = 'flex';
+    foodSearch.value = '';
+    foodDropdown.style.display = 'none';
+    foodDropdown.innerHTML = '';
+  });
+
+  // Render a list of food names into the dropdown
+  function renderFoodDropdown(foods) {
+    if (foods.length === 0) {
+      foodDropdown.innerHTML = '<div style="padding: 12px; color: #94a3b8; text-align: center;">No matching foods found</div>';
+      foodDropdown.style.display = 'block';
+      return;
+    }
+
+    foodDropdown.innerHTML = foods.map(food => `
+      <div class="food-dropdown-item" data-food="${food}" style="padding: 10px 12px; cursor: pointer; transition: all 0.2s ease; border-bottom: 1px solid #f1f5f9;">
+        ${food.split(' ').map(word => word.charAt(0).toUpperCase() + word.slice(1)).join(' ')}
+      </div>
+    `).join('');
+
+    foodDropdown.style.display = 'block';
+
+    // Add hover effects
+    const items = foodDropdown.querySelectorAll('.food-dropdown-item');
+    items.forEach(item => {
+      item.addEventListener('mouseenter', function() {
+        this.style.background = '#f8fafc';
+        this.style.color = '#8b5cf6';
+        this.style.fontWeight = '700';
+      });
+
+      item.addEventListener('mouseleave', function() {
+        this.style.background = 'white';
+        this.style.color = '#0f172a';
+        this.style.fontWeight = '600';
+      });
+
+      item.addEventListener('click', function() {
+        const selectedFood = this.dataset.food;
+        overrideWithFood(selectedFood);
+      });
+    });
+  }
+
+  // Search functionality: ranked, typo-tolerant matches from the server,
+  // falling back to a plain substring filter if the request fails
+  let searchTimer = null;
+  let searchController = null;
+
+  foodSearch.addEventListener('input', (e) => {
+    const searchTerm = e.target.value.toLowerCase().trim();
+    clearTimeout(searchTimer);
+
+    if (searchTerm.length === 0) {
+      if (searchController) searchController.abort();
+      foodDropdown.style.display = 'none';
+      foodDropdown.innerHTML = '';
+      return;
+    }
+
+    searchTimer = setTimeout(async () => {
+      if (searchController) searchController.abort();
+      searchController = new AbortController();
+      try {
+        const response = await fetch(`/api/food-search?q=${encodeURIComponent(searchTerm)}&limit=20`, {
+          signal: searchController.signal
+        });
+        const data = await response.json();
+        if (!data.success) throw new Error(data.error || 'Search failed');
+        renderFoodDropdown(data.results.map(result => result.name));
+      } catch (error) {
+        if (error.name === 'AbortError') return;
+        console.error('Food search error:', error);
+        renderFoodDropdown(availableFoods.filter(food => 
+          food.toLowerCase().includes(searchTerm)
+        ).slice(0, 20)); // Limit to 20 results
+      }
+    }, 120);
+  });
+
+  // Close dropdown when clicking outside
+  document.addEventListener('click', (e) => {
+    if (!foodSearch.contains(e.target) && !foodDropdown.contains(e.target)) {
+      foodDropdown.style.display = 'none';
+    }
+  });
+}
+
+async function overrideWithFood(foodName) {
+  console.log(`Overriding with: ${foodName}`);
+
+  // Show loading state
+  showLoading();
+
+  try {
+    // Get selected nutritional needs
+    const selectedNeeds = Array.from(document.querySelectorAll('input[name="need"]:checked'))
+      .map(cb => cb.value);
+
+    const response = await fetch('/api/override-food', {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({
+        food_name: foodName,
+        nutritional_needs: selectedNeeds
+      })
+    });
+
+    const data = await response.json();
+
+    if (!response.ok) {
+      throw new Error(data.error || 'Failed to override food');
+    }
+
+    if (!data.success || !data.food) {
+      throw new Error('Invalid response from server');
+    }
+
+    // Extract nutrition data
+    const foodData = data.food;
+    const nutrition = foodData.nutrition;
+
+    const food = {
+      name: foodData.name,
+      confidence: 100, // Manual override is 100% confidence
+      category: 'Food',
+      geminiAdvice: foodData.gemini_advice || null,
+      calories: Math.round(nutrition.calories || 0),
+      protein: `${Math.round(nutrition.protein_g || 0)}g`,
+      carbs: `${Math.round(nutrition.carbohydrates_total_g || 0)}g`,
+      fat: `${Math.round(nutrition.fat_total_g || 0)}g`,
+      fiber: `${Math.round(nutrition.fiber_g || 0)}g`,
+      sodium: `${Math.round(nutrition.sodium_mg || 0)}mg`,
+      sugar: `${Math.round(nutrition.sugar_g || 0)}g`,
+      servingSize: `${Math.round(nutrition.serving_size_g || 100)}g`,
+      tags: generateTags(nutrition),
+      hasRealData: true
+    };
+
+    console.log('Override successful, displaying result:', food);
+
+    displayFoodResult(food);
+
+  } catch (error) {
+    console.error('Override error:', error);
+    showError(`Failed to override: ${error.message}`);
+  }
+}
+
+// Call after displaying food results
+function initializeOverride() {
+  setupOverrideButton();
+}
+
+// Load food list on page load
+loadFoodList();
@@ -0,0 +1,121 @@
+lucide.createIcons();
+
+// Check if survey has been completed
+function checkSurveyAndNavigate() {
+  const userProfile = localStorage.getItem('userProfile');
+  if (!userProfile) {
+    // Show survey modal
+    document.getElementById('surveyModal').style.display = 'flex';
+    lucide.createIcons(); // Re-initialize icons in modal
+  } else {
+    // Go directly to home
+    window.location.href = '/home';
+  }
+}
+
+// Handle survey form submission
+document.getElementById('surveyForm').addEventListener('submit', function(e) {
+  e.preventDefault();
+
+  const age = document.getElementById('surveyAge').value;
+
+  if (!age) {
+    alert('Please enter your age to continue.');
+    return;
+  }
+
+  // Get gender
+  const genderRadio = document.querySelector('input[name="gender"]:checked');
+  const gender = genderRadio ? genderRadio.value : null;
+
+  // Get physical measurements
+  const height = document.getElementById('surveyHeight').value;
+  const weight = document.getElementById('surveyWeight').value;
+
+  // Calculate BMI if both height and weight are provided
+  let bmi = null;
+  if (height && weight) {
+    const heightInMeters = parseFloat(height) / 100;
+    bmi = (parseFloat(weight) / (heightInMeters * heightInMeters)).toFixed(1);
+  }
+
+  // Get selected conditions
+  const conditionCheckboxes = document.querySelectorAll('input[name="condition"]:checked');
+  const selectedConditions = Array.from(conditionCheckboxes).map(cb => cb.value);
+
+  // Get medications
+  const medications = document.getElementById('surveyMedications').value.trim();
+
+  // Get allergies
+  const allergies = document.getElementById('surveyAllergies').value.trim();
+
+  // Get diet type
+  const diet = document.getElementById('surveyDiet').value;
+
+  // Get exercise level
+  const exerciseLevel = document.getElementById('surveyExercise').value;
+
+  // Get smoking status
+  const smokingRadio = document.querySelector('input[name="smoking"]:checked');
+  const smokingStatus = smokingRadio ? smokingRadio.value : null;
+
+  // Get family history
+  const familyHistory = document.getElementById('surveyFamilyHistory').value.trim();
+
+  // Get goals
+  const goals = document.getElementById('surveyGoals').value.trim();
+
+  // Get other conditions
+  const otherConditions = document.getElementById('surveyOtherConditions').value.trim();
+
+  // Save to localStorage
+  const userProfile = {
+    age: age,
+    gender: gender,
+    height: height || null,
+    weight: weight || null,
+    bmi: bmi,
+    conditions: selectedConditions,
+    medications: medications,
+    allergies: allergies,
+    diet: diet,
+    exerciseLevel: exerciseLevel,
+    smokingStatus: smokingStatus,
+    familyHistory: familyHistory,
+    goals: goals,
+    otherConditions: otherConditions,
+    completedAt: new Date().toISOString(),
+    skipped: false
+  };
+
+  localStorage.setItem('userProfile', JSON.stringify(userProfile));
+
+  // Navigate to home
+  window.location.href = '/home';
+});
+
+// Skip survey function
+function skipSurvey() {
+  // Save minimal profile to indicate survey was offered
+  const userProfile = {
+    age: null,
+    gender: null,
+    height: null,
+    weight: null,
+    bmi: null,
+    conditions: [],
+    medications: '',
+    allergies: '',
+    diet: '',
+    exerciseLevel: '',
+    smokingStatus: null,
+    familyHistory: '',
+    goals: '',
+    otherConditions: '',
+    skipped: true,
+    completedAt: new Date().toISOString()
+  };
+
+  localStorage.setItem('userProfile', JSON.stringify(userProfile));
+  window.location.href = '/home';
+}